@@ -0,0 +1,327 @@
+"""Serve the API from a single asyncio event loop.
+
+    python -m api.aserve --host 0.0.0.0 --port 8000 --max-in-flight 8
+
+Each connection costs a coroutine rather than a thread, so one small process
+can hold thousands of idle keep-alive clients. Requests are parsed on the event
+loop and routed through ``api.index.dispatch`` on the bounded storage pool of
+``app.acrud``, which caps how many storage operations run at once.
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+import traceback
+from email.utils import formatdate
+from http import HTTPStatus
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+from api.index import STREAM_CHUNK_SIZE, Request, Response, _json_response, dispatch
+from app import acrud
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_IDLE_TIMEOUT = 5.0
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+
+class BadRequest(Exception):
+    """A request that cannot be parsed; answered, then the connection closes."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _read_piece(stream: Iterator[bytes]) -> bytes:
+    # Runs on the storage pool: pulls roughly one chunk's worth of the body.
+    buffer = bytearray()
+    for piece in stream:
+        buffer += piece
+        if len(buffer) >= STREAM_CHUNK_SIZE:
+            break
+    return bytes(buffer)
+
+
+class AsyncServer:
+    """HTTP/1.1 keep-alive server for the API routes on an asyncio loop."""
+
+    def __init__(
+        self,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        quiet: bool = False,
+    ):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.quiet = quiet
+        self.stopping = False
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._idle: Set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._serve_connection,
+            self.host,
+            self.port,
+            limit=MAX_HEADER_BYTES,
+            backlog=128,
+        )
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def stop(self) -> None:
+        """Stop accepting, close idle connections and let busy ones finish."""
+        self.stopping = True
+        self._server.close()
+        for writer in list(self._idle):
+            writer.close()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._tasks.add(asyncio.current_task())
+        try:
+            keep_alive = True
+            while keep_alive and not self.stopping:
+                self._idle.add(writer)
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), self.idle_timeout
+                    )
+                except asyncio.LimitOverrunError:
+                    error = BadRequest(431, "Request headers too large")
+                    await self._write_error(writer, error)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, OSError):
+                    break
+                finally:
+                    self._idle.discard(writer)
+
+                try:
+                    request, version, keep_alive = await self._read_request(
+                        head, reader
+                    )
+                except BadRequest as exc:
+                    await self._write_error(writer, exc)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, OSError):
+                    break
+
+                response = await self._respond(request)
+                keep_alive = await self._write(
+                    writer, response, version, keep_alive and not self.stopping
+                )
+                self._log(writer, request, version, response.status)
+        except ConnectionError:
+            pass
+        finally:
+            self._tasks.discard(asyncio.current_task())
+            writer.close()
+
+    async def _read_request(
+        self, head: bytes, reader: asyncio.StreamReader
+    ) -> Tuple[Request, str, bool]:
+        lines = head.decode("latin-1").split("\r\n")
+        request_line = lines[0].split()
+        if len(request_line) != 3:
+            raise BadRequest(400, "Bad request line")
+        method, target, version = request_line
+        if version not in ("HTTP/1.0", "HTTP/1.1"):
+            raise BadRequest(505, "HTTP version not supported")
+        if method == "HEAD":
+            # No route answers HEAD, and the error body it would get must not
+            # be mistaken for the next response, so refuse it and close.
+            raise BadRequest(501, "Unsupported method HEAD")
+
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, separator, value = line.partition(":")
+            if not separator:
+                raise BadRequest(400, "Bad header line")
+            headers[name.strip().lower()] = value.strip()
+
+        if "transfer-encoding" in headers:
+            raise BadRequest(411, "Content-Length is required")
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise BadRequest(400, "Bad Content-Length") from None
+        if length < 0:
+            raise BadRequest(400, "Bad Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise BadRequest(413, "Request body too large")
+
+        body = b""
+        if length:
+            body = await asyncio.wait_for(reader.readexactly(length), self.idle_timeout)
+
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            keep_alive = "close" not in connection
+        else:
+            keep_alive = "keep-alive" in connection
+        return Request(method, target, headers, body), version, keep_alive
+
+    async def _respond(self, request: Request) -> Response:
+        try:
+            return await acrud.run(dispatch, request)
+        except Exception:
+            traceback.print_exc()
+            return _json_response(500, {"error": "Internal server error"})
+
+    def _head(
+        self, response: Response, extra: Iterable[Tuple[str, str]] = ()
+    ) -> bytes:
+        try:
+            reason = HTTPStatus(response.status).phrase
+        except ValueError:
+            reason = ""
+        lines = [
+            f"HTTP/1.1 {response.status} {reason}",
+            "Server: crud-api",
+            f"Date: {formatdate(usegmt=True)}",
+        ]
+        lines.extend(f"{name}: {value}" for name, value in response.headers)
+        lines.extend(f"{name}: {value}" for name, value in extra)
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _write(
+        self,
+        writer: asyncio.StreamWriter,
+        response: Response,
+        version: str,
+        keep_alive: bool,
+    ) -> bool:
+        """Send a response and return whether the connection stays open."""
+        if response.stream is not None and version != "HTTP/1.1":
+            # HTTP/1.0 has no chunked encoding; closing the connection ends the body.
+            keep_alive = False
+
+        extra = []
+        if not keep_alive:
+            extra.append(("Connection", "close"))
+        elif version == "HTTP/1.0":
+            extra.append(("Connection", "keep-alive"))
+
+        if response.stream is None:
+            if response.status not in (204, 304):
+                extra.append(("Content-Length", str(len(response.body))))
+            writer.write(self._head(response, extra) + response.body)
+            await writer.drain()
+            return keep_alive
+
+        chunked = version == "HTTP/1.1"
+        if chunked:
+            extra.append(("Transfer-Encoding", "chunked"))
+        writer.write(self._head(response, extra))
+        try:
+            while True:
+                data = await acrud.run(_read_piece, response.stream)
+                if not data:
+                    break
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data) if chunked else data)
+                # Waiting for the socket to drain is the backpressure: a slow
+                # client stops the body being produced any faster than it reads.
+                await writer.drain()
+        except Exception:
+            # The status line is already out; an unfinished body is the only
+            # signal left, so drop the connection.
+            traceback.print_exc()
+            return False
+
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        return keep_alive
+
+    async def _write_error(
+        self, writer: asyncio.StreamWriter, error: BadRequest
+    ) -> None:
+        response = _json_response(error.status, {"error": error.message})
+        try:
+            await self._write(writer, response, "HTTP/1.1", keep_alive=False)
+        except OSError:
+            pass
+
+    def _log(
+        self, writer: asyncio.StreamWriter, request: Request, version: str, status: int
+    ) -> None:
+        if self.quiet:
+            return
+        peer = writer.get_extra_info("peername") or ("-",)
+        print(
+            f"{peer[0]} - - [{formatdate(localtime=True)}] "
+            f'"{request.method} {request.target} {version}" {status} -',
+            file=sys.stderr,
+        )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve the CRUD API with asyncio.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=acrud.max_in_flight(),
+        help="Storage operations run at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="Seconds before an idle keep-alive connection is closed",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Disable the access log")
+    return parser
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = AsyncServer(args.host, args.port, args.idle_timeout, args.quiet)
+    await server.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    host, port = server.address
+    print(
+        f"Serving on http://{host}:{port} with {args.max_in_flight} storage slots",
+        flush=True,
+    )
+    await stop.wait()
+    await server.stop()
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.max_in_flight < 1:
+        parser.error("--max-in-flight must be at least 1")
+
+    acrud.configure(args.max_in_flight)
+    try:
+        asyncio.run(_serve(args))
+    finally:
+        acrud.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,168 +1,661 @@
-import json
+import time
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
 from http.server import BaseHTTPRequestHandler
-from typing import Any, Dict, Optional
-from urllib.parse import urlparse
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from app import cache, codec, crud, metrics, profiling
+from app.config import env_flag
+from app.utils import generate_slug
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Streamed bodies are written in chunks of roughly this size, so a long listing
+# costs a few hundred socket writes rather than one per item.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Known routes, for metric labels; any other path is counted as "other".
+_ROUTE_LABELS = frozenset(
+    (
+        "/api",
+        "/api/favicon.ico",
+        "/api/items",
+        "/api/items/batch",
+        "/api/items/suggest",
+        "/api/items/{id}",
+        "/api/metrics",
+    )
+)
+
+_JSON_HEADERS = [
+    ("Content-Type", "application/json"),
+    ("Access-Control-Allow-Origin", "*"),
+    ("Access-Control-Allow-Methods", "GET,POST,PUT,PATCH,DELETE,OPTIONS"),
+    ("Access-Control-Allow-Headers", "Content-Type, If-None-Match, If-Modified-Since"),
+]
+
+# Connect to storage at import time rather than on the first request.
+if env_flag("CRUD_WARM_UP"):
+    crud.warm_up()
+
+
+class Request:
+    """An HTTP request as the routes see it, whichever server received it."""
+
+    def __init__(
+        self,
+        method: str,
+        target: str,
+        headers: Optional[Dict[str, str]] = None,
+        body: bytes = b"",
+    ):
+        url = urlparse(target)
+        self.method = method
+        self.target = target
+        self.path = url.path
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        # Header names are lowercased so lookups do not depend on the client.
+        self.headers = {name.lower(): value for name, value in (headers or {}).items()}
+        self.body = body
+
+    @property
+    def parts(self) -> List[str]:
+        parts = [part for part in self.path.split("/") if part]
 
-from app import crud
-
-
-def _item_to_dict(item) -> Dict[str, Any]:
-    return item.to_dict()
-
-
-class handler(BaseHTTPRequestHandler):
-    def _send_no_content(self) -> None:
-        self.send_response(204)
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.end_headers()
+        if parts and parts[0] == "api":
+            parts = parts[1:]
+        if parts and parts[0] == "index.py":
+            parts = parts[1:]
 
-    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
-        body = json.dumps(payload).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Methods", "GET,POST,PUT,PATCH,DELETE,OPTIONS")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.send_header("Content-Length", str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
+        return parts
 
-    def _read_json(self) -> Optional[Dict[str, Any]]:
-        length = int(self.headers.get("Content-Length", 0))
-        if length == 0:
+    def json(self) -> Optional[Dict[str, Any]]:
+        """Parse the body as a JSON object; None if it is anything else."""
+        if not self.body:
             return {}
 
         try:
-            payload = json.loads(self.rfile.read(length).decode("utf-8"))
-        except json.JSONDecodeError:
+            payload = codec.loads(self.body)
+        except ValueError:
             return None
 
         return payload if isinstance(payload, dict) else None
 
-    def _path_parts(self):
-        path = urlparse(self.path).path
-        parts = [part for part in path.split("/") if part]
 
-        if parts and parts[0] == "api":
-            parts = parts[1:]
-        if parts and parts[0] == "index.py":
-            parts = parts[1:]
+class Response:
+    """A status, headers and either a complete body or a stream of pieces."""
 
-        return parts
+    def __init__(
+        self,
+        status: int,
+        body: bytes = b"",
+        headers: Optional[List[Tuple[str, str]]] = None,
+        stream: Optional[Iterator[bytes]] = None,
+    ):
+        self.status = status
+        self.body = body
+        self.headers = list(headers or [])
+        self.stream = stream
 
-    def do_OPTIONS(self):
-        self._send_json(200, {"ok": True})
 
-    def do_GET(self):
-        parts = self._path_parts()
+class HTTPError(Exception):
+    """Raised by a route to answer with a JSON error instead."""
 
-        if parts == ["favicon.ico"]:
-            self._send_no_content()
-            return
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
 
-        if not parts:
-            self._send_json(
-                200,
-                {
-                    "name": "CRUD API",
-                    "routes": [
-                        "GET /api/items",
-                        "POST /api/items",
-                        "GET /api/items/{id}",
-                        "PUT /api/items/{id}",
-                        "PATCH /api/items/{id}",
-                        "DELETE /api/items/{id}",
-                    ],
-                    "storage": crud.get_storage_status(),
-                },
-            )
-            return
 
-        if parts == ["items"]:
-            items = [_item_to_dict(item) for item in crud.get_items()]
-            self._send_json(200, {"items": items, "total": len(items)})
-            return
+def _item_to_dict(item) -> Dict[str, Any]:
+    return item.to_dict()
+
 
-        if len(parts) == 2 and parts[0] == "items":
+@metrics.timed(metrics.STEP_SECONDS, "serialize", phase="serialize")
+def _json_response(status: int, payload: Dict[str, Any]) -> Response:
+    return Response(status, codec.dumps(payload), _JSON_HEADERS)
+
+
+def _json_stream_response(status: int, pieces: Iterable[bytes]) -> Response:
+    """Stream a JSON body of unknown length.
+
+    The first piece is produced here, before any response bytes can be sent,
+    so a failure to start the body still surfaces as an ordinary error.
+    """
+    pieces = iter(pieces)
+    first = next(pieces, b"")
+    return Response(status, headers=_JSON_HEADERS, stream=chain((first,), pieces))
+
+
+def _cached(
+    key: cache.CacheKey, version: Any, respond: Callable[[], Response]
+) -> Response:
+    """Serve a 200 body from the response cache, or build and cache it.
+
+    A hit costs a dict lookup: no storage read and no JSON encoding.
+    """
+    body = cache.responses.get(key, version)
+    if body is not None:
+        return Response(200, body, _JSON_HEADERS)
+
+    response = respond()
+    if response.status == 200 and response.stream is None:
+        cache.responses.put(key, version, response.body)
+    return response
+
+
+def _http_date(timestamp: Optional[str]) -> Optional[str]:
+    if not timestamp:
+        return None
+    try:
+        moment = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return formatdate(moment.timestamp(), usegmt=True)
+
+
+def _has_validators(request: Request) -> bool:
+    return (
+        "if-none-match" in request.headers or "if-modified-since" in request.headers
+    )
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[str]) -> bool:
+    """Evaluate If-None-Match, or failing that If-Modified-Since."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        # A "-0000" zone parses as naive; it still means UTC.
+        since = since.replace(tzinfo=timezone.utc)
+    if since > datetime.now(timezone.utc):
+        # RFC 9110: a date later than the server's clock is invalid.
+        return False
+    return parsedate_to_datetime(last_modified) <= since
+
+
+def _conditional(
+    request: Request,
+    version: Any,
+    modified_at: Optional[str],
+    respond: Callable[[], Response],
+) -> Response:
+    """Answer 304 if the client's copy is at ``version``, else call ``respond``.
+
+    The version comes from a cheap lookup, so an unchanged resource costs no
+    storage read or serialization at all.
+    """
+    etag = f'"{version}"'
+    last_modified = _http_date(modified_at)
+    validators = [("ETag", etag), ("Cache-Control", "no-cache")]
+    if last_modified:
+        validators.append(("Last-Modified", last_modified))
+
+    if _not_modified(request, etag, last_modified):
+        headers = [("Access-Control-Allow-Origin", "*"), *validators]
+        return Response(304, headers=headers)
+
+    response = respond()
+    if response.status == 200:
+        response.headers.extend(validators)
+    return response
+
+
+def _store_tag(version: int, modified_at: Optional[str]) -> str:
+    """Identify a store state by its version counter and last write time.
+
+    The counter alone starts over when a data file is deleted and written
+    afresh, or on another instance with its own store, so two different states
+    can share a number; the time tells them apart.
+    """
+    if not modified_at:
+        return f"{version}-0"
+    return f"{version}-{''.join(char for char in modified_at if char.isdigit())}"
+
+
+def _encode_item_listing(records: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode ``{"items": [...], "total": n}`` piece by piece from raw records."""
+    total = 0
+    opening = b'{"items":['
+    for record in records:
+        encoded = codec.dumps(record)
+        # The opening bracket goes out with the first item, so storage errors on
+        # the first fetch surface before any response bytes are sent.
+        yield opening + encoded if total == 0 else b"," + encoded
+        total += 1
+    if total == 0:
+        yield opening
+    yield b'],"total":%d}' % total
+
+
+def _batch_result_to_dict(result, success_status: int) -> Dict[str, Any]:
+    if result.ok:
+        payload = {"id": result.id, "status": success_status}
+        if result.item is not None:
+            payload["item"] = _item_to_dict(result.item)
+        return payload
+
+    status = 404 if result.not_found else 400
+    return {"id": result.id, "status": status, "error": result.error}
+
+
+def _request_object(request: Request) -> Dict[str, Any]:
+    data = request.json()
+    if data is None:
+        raise HTTPError(400, "Request body must be a JSON object")
+    return data
+
+
+def _page_size(query: Dict[str, str]) -> int:
+    try:
+        limit = int(query.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPError(400, f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def _options(request: Request) -> Response:
+    return _json_response(200, {"ok": True})
+
+
+def _get(request: Request) -> Response:
+    parts = request.parts
+
+    if parts == ["favicon.ico"]:
+        return Response(204, headers=[("Access-Control-Allow-Origin", "*")])
+
+    if not parts:
+        return _json_response(
+            200,
+            {
+                "name": "CRUD API",
+                "routes": [
+                    "GET /api/items",
+                    "GET /api/items?limit={n}&cursor={next_cursor}",
+                    "GET /api/items?q={query}",
+                    "GET /api/items/suggest?prefix={prefix}&limit={n}",
+                    "POST /api/items",
+                    "POST /api/items/batch",
+                    "GET /api/items/{id}",
+                    "PUT /api/items/{id}",
+                    "PATCH /api/items/{id}",
+                    "DELETE /api/items/{id}",
+                    "GET /api/metrics",
+                ],
+                "storage": crud.get_storage_status(),
+                "cache": cache.responses.stats(),
+            },
+        )
+
+    if parts == ["metrics"]:
+        return _metrics()
+
+    if parts == ["items"] or parts == ["items", "suggest"]:
+        # Every listing changes exactly when the store version does.
+        version, modified_at = crud.get_store_version()
+        return _conditional(
+            request,
+            _store_tag(version, modified_at),
+            modified_at,
+            lambda: _list_items(request, (version, modified_at)),
+        )
+
+    if len(parts) == 2 and parts[0] == "items":
+        key = (cache.ITEMS, parts[1])
+        if key not in cache.responses and not _has_validators(request):
+            # Nothing to revalidate, so read the item once and take its ETag
+            # from the document rather than looking its version up first.
             item = crud.get_item_by_id(parts[1])
             if item is None:
-                self._send_json(404, {"error": "Item not found"})
-                return
-
-            self._send_json(200, {"item": _item_to_dict(item)})
-            return
-
-        self._send_json(404, {"error": "Route not found"})
-
-    def do_POST(self):
-        parts = self._path_parts()
-        if parts != ["items"]:
-            self._send_json(404, {"error": "Route not found"})
-            return
-
-        data = self._read_json()
-        if data is None:
-            self._send_json(400, {"error": "Request body must be a JSON object"})
-            return
-
-        try:
-            item = crud.create_item(data.get("name"), data.get("description"))
-        except ValueError as exc:
-            self._send_json(400, {"error": str(exc)})
-            return
-
-        self._send_json(201, {"item": _item_to_dict(item)})
+                return _json_response(404, {"error": "Item not found"})
+            version = item.updated_at or item.created_at
+            return _conditional(
+                request,
+                version,
+                version,
+                lambda: _cached(key, version, lambda: _item_response(item)),
+            )
+        version = crud.get_item_version(parts[1])
+        if version is None:
+            return _json_response(404, {"error": "Item not found"})
+        return _conditional(
+            request,
+            version,
+            version,
+            lambda: _cached(key, version, lambda: _get_item(parts[1])),
+        )
+
+    return _json_response(404, {"error": "Route not found"})
+
+
+def _metrics() -> Response:
+    if not metrics.ENABLED:
+        return _json_response(404, {"error": "Metrics are disabled"})
+    headers = [
+        ("Content-Type", "text/plain; version=0.0.4; charset=utf-8"),
+        ("Cache-Control", "no-store"),
+    ]
+    return Response(200, metrics.render().encode("utf-8"), headers)
+
+
+def _list_items(request: Request, version: Any) -> Response:
+    query = request.query
+    if request.parts == ["items", "suggest"]:
+        route = _suggest_items
+    elif "q" in query:
+        route = _search_items
+    elif "limit" in query or "cursor" in query:
+        route = _list_items_page
+    else:
+        # The full listing is streamed and may be any size, so it is not cached.
+        return _json_stream_response(200, _encode_item_listing(crud.iter_records()))
+
+    key = (cache.LISTS, (request.path, tuple(sorted(query.items()))))
+    return _cached(key, version, lambda: route(query))
+
+
+def _get_item(item_id: str) -> Response:
+    item = crud.get_item_by_id(item_id)
+    if item is None:
+        return _json_response(404, {"error": "Item not found"})
+    return _item_response(item)
+
+
+def _item_response(item) -> Response:
+    return _json_response(200, {"item": _item_to_dict(item)})
+
+
+def _search_items(query: Dict[str, str]) -> Response:
+    items = crud.search_items(query["q"], _page_size(query))
+    return _json_response(
+        200, {"items": [_item_to_dict(item) for item in items], "total": len(items)}
+    )
+
+
+def _suggest_items(query: Dict[str, str]) -> Response:
+    if "prefix" not in query:
+        raise HTTPError(400, "prefix is required")
+
+    limit = _page_size({"limit": query.get("limit", "10")})
+    suggestions = [
+        {"id": item.id, "name": item.name, "slug": generate_slug(item.name)}
+        for item in crud.suggest_items(query["prefix"], limit)
+    ]
+    return _json_response(200, {"suggestions": suggestions})
+
+
+def _list_items_page(query: Dict[str, str]) -> Response:
+    limit = _page_size(query)
+    try:
+        items, next_cursor = crud.get_items_page(limit, query.get("cursor") or None)
+    except ValueError as exc:
+        raise HTTPError(400, str(exc)) from None
+
+    return _json_response(
+        200,
+        {
+            "items": [_item_to_dict(item) for item in items],
+            "total": crud.count_items(),
+            "next_cursor": next_cursor,
+        },
+    )
+
+
+def _post(request: Request) -> Response:
+    parts = request.parts
+    if parts == ["items", "batch"]:
+        return _batch(request)
+
+    if parts != ["items"]:
+        return _json_response(404, {"error": "Route not found"})
+
+    data = _request_object(request)
+    try:
+        item = crud.create_item(data.get("name"), data.get("description"))
+    except ValueError as exc:
+        raise HTTPError(400, str(exc)) from None
+
+    return _json_response(201, {"item": _item_to_dict(item)})
+
+
+def _batch(request: Request) -> Response:
+    data = _request_object(request)
+
+    creates = data.get("create", [])
+    updates = data.get("update", [])
+    deletes = data.get("delete", [])
+    if not all(isinstance(value, list) for value in (creates, updates, deletes)):
+        raise HTTPError(400, "create, update and delete must be lists")
+    if not all(isinstance(item_id, str) for item_id in deletes):
+        raise HTTPError(400, "delete must be a list of item IDs")
+
+    return _json_response(
+        200,
+        {
+            "create": [
+                _batch_result_to_dict(result, 201)
+                for result in crud.create_items(creates)
+            ],
+            "update": [
+                _batch_result_to_dict(result, 200)
+                for result in crud.update_items(updates)
+            ],
+            "delete": [
+                _batch_result_to_dict(result, 200)
+                for result in crud.delete_items(deletes)
+            ],
+        },
+    )
+
+
+def _update_item(request: Request) -> Response:
+    parts = request.parts
+    if len(parts) != 2 or parts[0] != "items":
+        return _json_response(404, {"error": "Route not found"})
+
+    data = _request_object(request)
+    if "name" not in data and "description" not in data:
+        raise HTTPError(400, "Provide name, description, or both")
+    if ("name" in data and data["name"] is None) or (
+        "description" in data and data["description"] is None
+    ):
+        raise HTTPError(400, "Fields cannot be null")
+
+    expected_updated_at = data.get("expected_updated_at")
+    if expected_updated_at is not None and not isinstance(expected_updated_at, str):
+        raise HTTPError(400, "expected_updated_at must be a string")
+
+    try:
+        item = crud.update_item(
+            parts[1],
+            name=data.get("name"),
+            description=data.get("description"),
+            expected_updated_at=expected_updated_at,
+        )
+    except crud.ConflictError as exc:
+        raise HTTPError(409, str(exc)) from None
+    except ValueError as exc:
+        raise HTTPError(400, str(exc)) from None
+
+    if item is None:
+        return _json_response(404, {"error": "Item not found"})
+
+    return _json_response(200, {"item": _item_to_dict(item)})
+
+
+def _delete(request: Request) -> Response:
+    parts = request.parts
+    if len(parts) != 2 or parts[0] != "items":
+        return _json_response(404, {"error": "Route not found"})
+
+    if not crud.delete_item(parts[1]):
+        return _json_response(404, {"error": "Item not found"})
+
+    return _json_response(200, {"message": "Item deleted successfully"})
+
+
+ROUTES: Dict[str, Callable[[Request], Response]] = {
+    "GET": _get,
+    "POST": _post,
+    "PUT": _update_item,
+    "PATCH": _update_item,
+    "DELETE": _delete,
+    "OPTIONS": _options,
+}
+
+
+def _route_label(request: Request) -> str:
+    parts = request.parts
+    if len(parts) == 2 and parts[0] == "items" and parts[1] not in ("batch", "suggest"):
+        parts = ["items", "{id}"]
+    label = "/".join(["/api", *parts])
+    return label if label in _ROUTE_LABELS else "other"
+
+
+def dispatch(request: Request) -> Response:
+    """Route a request to its handler and return the response to send.
+
+    With profiling on (see ``app.profiling``) the response carries a
+    ``Server-Timing`` header, and sampled requests are profiled.
+    """
+    if not profiling.ENABLED:
+        return _measured(request)
+
+    label = f"{request.method} {request.path}"
+    response, phases = profiling.measure(
+        lambda: _measured(request), label, profiling.sampled()
+    )
+    response.headers.append(("Server-Timing", profiling.server_timing(phases)))
+    # Lets browser devtools on other origins show the breakdown too.
+    response.headers.append(("Timing-Allow-Origin", "*"))
+    return response
+
+
+def _measured(request: Request) -> Response:
+    if not metrics.ENABLED:
+        return _dispatch(request)
+
+    route = _route_label(request)
+    started = time.perf_counter()
+    status = "500"
+    try:
+        response = _dispatch(request)
+        status = str(response.status)
+    finally:
+        metrics.HTTP_SECONDS.observe(
+            time.perf_counter() - started, request.method, route
+        )
+        metrics.HTTP_REQUESTS.inc(request.method, route, status)
+    if response.stream is None:
+        metrics.HTTP_RESPONSE_BYTES.inc(route, amount=len(response.body))
+    return response
+
+
+def _dispatch(request: Request) -> Response:
+    route = ROUTES.get(request.method)
+    if route is None:
+        return _json_response(501, {"error": f"Unsupported method {request.method}"})
+
+    try:
+        return route(request)
+    except HTTPError as exc:
+        return _json_response(exc.status, {"error": exc.message})
 
-    def do_PUT(self):
-        self._update_item()
 
-    def do_PATCH(self):
-        self._update_item()
+class handler(BaseHTTPRequestHandler):
+    def _request(self) -> Request:
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length > 0 else b""
+        return Request(self.command, self.path, dict(self.headers.items()), body)
 
-    def _update_item(self):
-        parts = self._path_parts()
-        if len(parts) != 2 or parts[0] != "items":
-            self._send_json(404, {"error": "Route not found"})
+    def _send(self, response: Response) -> None:
+        if response.stream is not None:
+            self._send_stream(response)
             return
 
-        data = self._read_json()
-        if data is None:
-            self._send_json(400, {"error": "Request body must be a JSON object"})
-            return
+        self.send_response(response.status)
+        for name, value in response.headers:
+            self.send_header(name, value)
+        if response.status not in (204, 304):
+            self.send_header("Content-Length", str(len(response.body)))
+        self.end_headers()
+        if response.body:
+            self.wfile.write(response.body)
+
+    def _send_stream(self, response: Response) -> None:
+        """Send a body of unknown length as it is produced.
+
+        HTTP/1.1 clients get chunked transfer encoding and keep their connection;
+        HTTP/1.0 clients get a body terminated by closing the connection.
+        """
+        chunked = (
+            self.protocol_version >= "HTTP/1.1" and self.request_version >= "HTTP/1.1"
+        )
+
+        self.send_response(response.status)
+        for name, value in response.headers:
+            self.send_header(name, value)
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
 
-        if "name" not in data and "description" not in data:
-            self._send_json(400, {"error": "Provide name, description, or both"})
-            return
-        if ("name" in data and data["name"] is None) or (
-            "description" in data and data["description"] is None
-        ):
-            self._send_json(400, {"error": "Fields cannot be null"})
-            return
+        def write(data: bytes) -> None:
+            if chunked:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            else:
+                self.wfile.write(data)
 
+        buffer = bytearray()
         try:
-            item = crud.update_item(
-                parts[1],
-                name=data.get("name"),
-                description=data.get("description"),
-            )
-        except ValueError as exc:
-            self._send_json(400, {"error": str(exc)})
+            for piece in response.stream:
+                buffer += piece
+                if len(buffer) >= STREAM_CHUNK_SIZE:
+                    write(bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                write(bytes(buffer))
+            if chunked:
+                self.wfile.write(b"0\r\n\r\n")
+        except Exception:
+            # The status line is already out, so the only way left to signal a
+            # failure is to drop the connection before the body is complete.
+            self.close_connection = True
+            raise
+
+    def _handle(self) -> None:
+        if self.headers.get("Transfer-Encoding"):
+            # Bodies are read by Content-Length only. An unread chunked body
+            # would be parsed as the next request, so the connection must close.
+            response = _json_response(411, {"error": "Content-Length is required"})
+            response.headers.append(("Connection", "close"))
+            self._send(response)
             return
 
-        if item is None:
-            self._send_json(404, {"error": "Item not found"})
-            return
-
-        self._send_json(200, {"item": _item_to_dict(item)})
-
-    def do_DELETE(self):
-        parts = self._path_parts()
-        if len(parts) != 2 or parts[0] != "items":
-            self._send_json(404, {"error": "Route not found"})
-            return
-
-        if not crud.delete_item(parts[1]):
-            self._send_json(404, {"error": "Item not found"})
-            return
+        self._send(dispatch(self._request()))
 
-        self._send_json(200, {"message": "Item deleted successfully"})
+    do_GET = _handle
+    do_POST = _handle
+    do_PUT = _handle
+    do_PATCH = _handle
+    do_DELETE = _handle
+    do_OPTIONS = _handle
@@ -0,0 +1,297 @@
+"""Run the API as a standalone HTTP/1.1 server.
+
+    python -m api.serve --host 0.0.0.0 --port 8000 --threads 16
+    python -m api.serve --workers 4 --max-requests 10000
+
+Vercel imports ``api/index.py`` directly; this module is for running the same
+handler anywhere else, behind a load balancer that reuses connections. With
+``--workers`` the listening socket is shared by that many forked processes, so
+JSON encoding and decoding is no longer limited to one core by the GIL.
+"""
+
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer
+from typing import Dict, Iterable, Optional
+
+from api.index import handler
+from app import crud
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_THREADS = 16
+# Seconds a kept-alive connection may sit idle before its thread is freed.
+DEFAULT_IDLE_TIMEOUT = 5.0
+# A worker that dies sooner than this after starting is restarted only after
+# the same delay, so a worker that cannot start does not spin the supervisor.
+RESTART_DELAY = 1.0
+
+
+class KeepAliveHandler(handler):
+    """The API handler speaking HTTP/1.1 with persistent connections."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle's
+    # algorithm holds the body back until the client acknowledges the headers.
+    disable_nagle_algorithm = True
+    quiet = False
+
+    def end_headers(self) -> None:
+        # While shutting down, finish the current request but not the next.
+        if not self.close_connection and self.server.stopping.is_set():
+            self.send_header("Connection", "close")
+        super().end_headers()
+
+    def handle_one_request(self) -> None:
+        super().handle_one_request()
+        if self.raw_requestline:
+            self.server.count_request()
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that handles connections on a fixed pool of threads.
+
+    When every thread is busy the accept loop stops taking connections, so
+    excess clients wait in the listen backlog instead of piling up threads.
+    """
+
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        server_address,
+        handler_class,
+        threads: int = DEFAULT_THREADS,
+        max_requests: int = 0,
+    ):
+        super().__init__(server_address, handler_class)
+        self.threads = threads
+        self.max_requests = max_requests
+        self.requests = 0
+        self.stopping = threading.Event()
+        self._count_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(threads)
+        self._pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="api")
+
+    def process_request(self, request, client_address) -> None:
+        while not self._slots.acquire(timeout=0.5):
+            if self.stopping.is_set():
+                self.shutdown_request(request)
+                return
+        self._pool.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def count_request(self) -> None:
+        """Count a handled request, stopping the server at ``max_requests``."""
+        with self._count_lock:
+            self.requests += 1
+            done = self.requests == self.max_requests
+        if done:
+            self.stop()
+
+    def stop(self) -> None:
+        """Shut down from any thread, including the one running serve_forever."""
+        # shutdown() waits for serve_forever to return, so it must not run on
+        # the thread that serve_forever (or a signal handler on it) is using.
+        self.stopping.set()
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def shutdown(self) -> None:
+        """Stop accepting connections; in-flight requests run to completion."""
+        self.stopping.set()
+        super().shutdown()
+
+    def server_close(self) -> None:
+        super().server_close()
+        # Open connections finish their current request and close; idle ones
+        # are dropped once the idle timeout expires.
+        self._pool.shutdown(wait=True)
+
+
+def make_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    threads: int = DEFAULT_THREADS,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    quiet: bool = False,
+    max_requests: int = 0,
+) -> PooledHTTPServer:
+    """Bind a pooled keep-alive server for the API without starting it."""
+    if threads < 1:
+        raise ValueError("threads must be at least 1")
+
+    handler_class = type(
+        "ServedHandler", (KeepAliveHandler,), {"timeout": idle_timeout, "quiet": quiet}
+    )
+    return PooledHTTPServer(
+        (host, port), handler_class, threads=threads, max_requests=max_requests
+    )
+
+
+def _run_worker(server: PooledHTTPServer) -> None:
+    """Serve requests in a forked child until stopped or recycled."""
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: server.stop())
+    crud.reset_after_fork()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def serve_prefork(server: PooledHTTPServer, workers: int) -> None:
+    """Fork ``workers`` children accepting on the server's socket and supervise them.
+
+    A worker that exits, whether it crashed or reached ``max_requests``, is
+    replaced. SIGTERM or SIGINT is passed on to the workers, and this returns
+    once they have all finished their in-flight requests.
+    """
+    children: Dict[int, float] = {}
+    stopping = False
+
+    def spawn() -> None:
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                _run_worker(server)
+            except BaseException:
+                traceback.print_exc()
+                status = 1
+            finally:
+                os._exit(status)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+
+        started = children.pop(pid, None)
+        if stopping or started is None:
+            continue
+
+        code = os.waitstatus_to_exitcode(status)
+        if code != 0:
+            print(
+                f"Worker {pid} exited with status {code}; restarting",
+                file=sys.stderr,
+            )
+        if time.monotonic() - started < RESTART_DELAY:
+            time.sleep(RESTART_DELAY)
+        if not stopping:
+            spawn()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Serve the CRUD API over HTTP/1.1.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=DEFAULT_THREADS,
+        help="Connections handled at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        help="Seconds before an idle keep-alive connection is closed",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Fork this many worker processes sharing the socket (default: none)",
+    )
+    parser.add_argument(
+        "--max-requests",
+        type=int,
+        default=0,
+        help="Restart a worker after it has served this many requests",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Disable the access log")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 0 or args.max_requests < 0:
+        parser.error("--workers and --max-requests cannot be negative")
+    if args.max_requests and not args.workers:
+        parser.error("--max-requests needs --workers")
+    if args.workers and not hasattr(os, "fork"):
+        parser.error("--workers needs a platform with os.fork")
+
+    server = make_server(
+        args.host,
+        args.port,
+        args.threads,
+        args.idle_timeout,
+        args.quiet,
+        args.max_requests,
+    )
+    host, port = server.server_address[:2]
+
+    if args.workers:
+        print(
+            f"Serving on http://{host}:{port} with {args.workers} workers"
+            f" of {args.threads} threads",
+            flush=True,
+        )
+        try:
+            serve_prefork(server, args.workers)
+        finally:
+            server.server_close()
+        return 0
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: server.stop())
+
+    print(f"Serving on http://{host}:{port} with {args.threads} threads", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
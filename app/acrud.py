@@ -0,0 +1,162 @@
+"""Async versions of the ``app.crud`` operations, for asyncio servers.
+
+Every backend is reached through blocking calls (file I/O, sqlite3, pymongo),
+so each operation runs on a small thread pool. A per-loop semaphore caps how
+many are in flight: past the cap, callers wait as cheap coroutines on the event
+loop instead of as threads, and the storage backend sees a bounded load no
+matter how many connections the server holds open.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from app import crud
+from app.models import BatchResult, Item
+
+
+T = TypeVar("T")
+
+DEFAULT_MAX_IN_FLIGHT = 8
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_MAX_IN_FLIGHT = 0
+_LIMITS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+_LOCK = threading.Lock()
+
+
+def max_in_flight() -> int:
+    """Storage operations allowed at once, from ``CRUD_ASYNC_MAX_IN_FLIGHT``."""
+    if _MAX_IN_FLIGHT:
+        return _MAX_IN_FLIGHT
+    value = os.environ.get("CRUD_ASYNC_MAX_IN_FLIGHT")
+    return int(value) if value else DEFAULT_MAX_IN_FLIGHT
+
+
+def configure(limit: int) -> None:
+    """Set the in-flight cap, replacing the pool on the next operation."""
+    global _EXECUTOR, _MAX_IN_FLIGHT
+
+    if limit < 1:
+        raise ValueError("The in-flight limit must be at least 1")
+    with _LOCK:
+        executor = _EXECUTOR
+        _EXECUTOR = None
+        _MAX_IN_FLIGHT = limit
+        _LIMITS.clear()
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+
+    if _EXECUTOR is None:
+        with _LOCK:
+            if _EXECUTOR is None:
+                _EXECUTOR = ThreadPoolExecutor(
+                    max_workers=max_in_flight(), thread_name_prefix="crud"
+                )
+    return _EXECUTOR
+
+
+def _limit(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    semaphore = _LIMITS.get(loop)
+    if semaphore is None:
+        semaphore = _LIMITS[loop] = asyncio.Semaphore(max_in_flight())
+    return semaphore
+
+
+async def run(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking call on the storage pool once an in-flight slot is free."""
+    loop = asyncio.get_running_loop()
+    async with _limit(loop):
+        return await loop.run_in_executor(_executor(), partial(func, *args, **kwargs))
+
+
+def shutdown() -> None:
+    """Stop the storage pool after the operations already submitted finish."""
+    global _EXECUTOR
+
+    with _LOCK:
+        executor = _EXECUTOR
+        _EXECUTOR = None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def get_storage_status() -> Dict[str, Any]:
+    return await run(crud.get_storage_status)
+
+
+async def create_item(name: str, description: str) -> Item:
+    return await run(crud.create_item, name, description)
+
+
+async def get_items(limit: Optional[int] = None, offset: int = 0) -> List[Item]:
+    return await run(crud.get_items, limit, offset)
+
+
+async def iter_items(batch_size: int = 500) -> AsyncIterator[Item]:
+    """Yield every item, fetching ``batch_size`` at a time on the storage pool."""
+    items = crud.iter_items()
+    while True:
+        batch = await run(lambda: list(islice(items, batch_size)))
+        if not batch:
+            return
+        for item in batch:
+            yield item
+
+
+async def get_items_page(
+    limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Item], Optional[str]]:
+    return await run(crud.get_items_page, limit, cursor)
+
+
+async def search_items(query: str, limit: Optional[int] = None) -> List[Item]:
+    return await run(crud.search_items, query, limit)
+
+
+async def suggest_items(prefix: str, limit: int = 10) -> List[Item]:
+    return await run(crud.suggest_items, prefix, limit)
+
+
+async def count_items() -> int:
+    return await run(crud.count_items)
+
+
+async def get_item_by_id(item_id: str) -> Optional[Item]:
+    return await run(crud.get_item_by_id, item_id)
+
+
+async def update_item(
+    item_id: str,
+    name: Optional[str] = None,
+    description: Optional[str] = None,
+    expected_updated_at: Optional[str] = None,
+) -> Optional[Item]:
+    return await run(crud.update_item, item_id, name, description, expected_updated_at)
+
+
+async def delete_item(item_id: str) -> bool:
+    return await run(crud.delete_item, item_id)
+
+
+async def create_items(records: List[Dict[str, Any]]) -> List[BatchResult]:
+    return await run(crud.create_items, records)
+
+
+async def update_items(updates: List[Dict[str, Any]]) -> List[BatchResult]:
+    return await run(crud.update_items, updates)
+
+
+async def delete_items(item_ids: List[str]) -> List[BatchResult]:
+    return await run(crud.delete_items, item_ids)
@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from app import metrics
+
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# Rough per-entry cost of the key, tuple and dict slot on top of the body.
+ENTRY_OVERHEAD = 200
+
+ITEMS = "item"
+LISTS = "list"
+
+CacheKey = Tuple[str, Hashable]
+
+
+class ByteCache:
+    """LRU cache of encoded response bodies with a memory cap in bytes.
+
+    Keys are ``(group, name)`` pairs so a whole group, such as every cached
+    listing, can be dropped at once. Each entry records the version it was
+    built from; a lookup with a different version is a miss and drops the
+    entry, so a write made by another process can never be served stale.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        # One entry may use at most an eighth of the cache, so a single large
+        # listing cannot flush every hot item.
+        self.max_entry_bytes = max_bytes // 8
+        self._entries: "OrderedDict[CacheKey, Tuple[Any, bytes]]" = OrderedDict()
+        self._groups: Dict[str, Set[CacheKey]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: CacheKey) -> bool:
+        return key in self._entries
+
+    def get(self, key: CacheKey, version: Any) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: CacheKey, version: Any, body: bytes) -> None:
+        size = len(body) + ENTRY_OVERHEAD
+        if size > self.max_entry_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (version, body)
+            self._groups.setdefault(key[0], set()).add(key)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def discard(self, key: CacheKey) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def discard_group(self, group: str) -> None:
+        with self._lock:
+            for key in list(self._groups.get(group, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self._bytes = 0
+
+    def _remove(self, key: CacheKey) -> None:
+        _, body = self._entries.pop(key)
+        self._groups[key[0]].discard(key)
+        self._bytes -= len(body) + ENTRY_OVERHEAD
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TTLCache:
+    """LRU cache of values that also expire ``ttl`` seconds after being stored.
+
+    For read-through use, take a ``token()`` before reading the source and pass
+    it to ``put``: the value is then dropped if anything was invalidated while
+    the read was in flight, since it may predate that write.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def token(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any, token: Optional[int] = None) -> None:
+        with self._lock:
+            if token is not None and token != self._generation:
+                return
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _max_bytes() -> int:
+    value = os.environ.get("CRUD_RESPONSE_CACHE_BYTES")
+    return DEFAULT_MAX_BYTES if value is None else int(value)
+
+
+# Encoded API responses. CRUD_RESPONSE_CACHE_BYTES=0 turns caching off.
+responses = ByteCache(_max_bytes())
+metrics.register_cache("responses", responses.stats)
+
+
+def invalidate(item_ids: Iterable[str] = ()) -> None:
+    """Drop cached responses for the given items and every cached listing."""
+    for item_id in item_ids:
+        responses.discard((ITEMS, str(item_id)))
+    responses.discard_group(LISTS)
@@ -0,0 +1,111 @@
+"""Serialization for HTTP bodies and the file store.
+
+``CRUD_JSON_CODEC`` picks the JSON implementation:
+
+- ``json`` (default): the standard library, without whitespace
+- ``fast``: orjson when it is installed, otherwise the standard library
+
+``CRUD_STORE_FORMAT`` picks how the JSON store writes its snapshot: ``json``
+(default) or ``binary``, a marshal dump behind a magic header that loads
+several times faster than JSON. Snapshots are recognised by their first bytes
+when read, so switching formats needs no migration and old ``db.json`` files,
+indented or not, still open.
+"""
+
+import json
+import marshal
+import os
+from functools import lru_cache
+from typing import Any, Callable, Union
+
+
+STORE_FORMATS = ("json", "binary")
+
+# Not valid UTF-8, so no JSON document can start with it.
+BINARY_MAGIC = b"\xffCRUD-marshal-1\n"
+# marshal format 4 has been stable since Python 3.4.
+_MARSHAL_VERSION = 4
+
+
+class Codec:
+    """A named pair of functions between Python values and JSON bytes."""
+
+    def __init__(
+        self,
+        name: str,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[Union[bytes, str]], Any],
+    ):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return f"Codec({self.name!r})"
+
+
+# Built once: json.dumps with options makes a new encoder on every call.
+_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def _stdlib_dumps(value: Any) -> bytes:
+    return _ENCODER.encode(value).encode("utf-8")
+
+
+STDLIB = Codec("json", _stdlib_dumps, json.loads)
+
+
+@lru_cache(maxsize=None)
+def get_codec(name: str = "json") -> Codec:
+    """Return the codec called ``name``; ``fast`` falls back to the stdlib one."""
+    if name == "json":
+        return STDLIB
+    if name == "fast":
+        try:
+            import orjson
+        except ImportError:
+            return STDLIB
+        return Codec("orjson", orjson.dumps, orjson.loads)
+    raise ValueError(f"Unknown JSON codec {name!r}; use 'json' or 'fast'")
+
+
+def current() -> Codec:
+    """The codec selected by ``CRUD_JSON_CODEC``."""
+    return get_codec(os.environ.get("CRUD_JSON_CODEC") or "json")
+
+
+def dumps(value: Any) -> bytes:
+    """Encode ``value`` as compact UTF-8 JSON."""
+    return current().dumps(value)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON; raises ``ValueError`` if ``data`` is not valid JSON."""
+    return current().loads(data)
+
+
+def store_format() -> str:
+    """The snapshot format selected by ``CRUD_STORE_FORMAT``."""
+    name = os.environ.get("CRUD_STORE_FORMAT") or "json"
+    if name not in STORE_FORMATS:
+        choices = ", ".join(STORE_FORMATS)
+        raise ValueError(f"CRUD_STORE_FORMAT must be one of {choices}")
+    return name
+
+
+def encode_snapshot(value: Any, kind: str = "json") -> bytes:
+    """Encode a snapshot as ``kind``, one of ``STORE_FORMATS``."""
+    if kind == "binary":
+        return BINARY_MAGIC + marshal.dumps(value, _MARSHAL_VERSION)
+    return dumps(value)
+
+
+def decode_snapshot(data: bytes) -> Any:
+    """Decode a snapshot written in either format.
+
+    marshal is not meant for untrusted input; the store file is local state
+    written by this app, like the JSON it replaces.
+    """
+    if data.startswith(BINARY_MAGIC):
+        return marshal.loads(data[len(BINARY_MAGIC) :])
+    return loads(data)
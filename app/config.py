@@ -0,0 +1,25 @@
+"""Helpers for reading settings from the environment.
+
+This module imports nothing from the app, so any module can use it without
+creating an import cycle.
+"""
+
+import os
+
+_TRUE = ("1", "true", "yes", "on")
+_FALSE = ("0", "false", "no", "off")
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Read an on/off setting.
+
+    ``1``, ``true``, ``yes`` and ``on`` turn it on and ``0``, ``false``, ``no``
+    and ``off`` turn it off, in any case. Anything else, including an unset or
+    empty variable, gives ``default``.
+    """
+    value = os.environ.get(name, "").strip().lower()
+    if value in _TRUE:
+        return True
+    if value in _FALSE:
+        return False
+    return default
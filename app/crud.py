@@ -1,17 +1,39 @@
-import json
+import base64
 import os
+import re
 import tempfile
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from uuid import uuid4
-
-from app.models import Item
-from app.utils import validate_item_data
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from app import cache, codec, metrics, mongo
+from app.config import env_flag
+from app.models import BatchResult, Item
+from app.search import tokenize
+from app.utils import generate_slug, validate_item_data, validate_item_update
+
+# Only the selected backend's module is imported, on first use, so a cold start
+# does not pay for the others (pymongo is likewise imported by app.mongo).
+if TYPE_CHECKING:
+    from app.json_store import JsonStore, SortKey
+    from app.sqlite_store import SqliteStore
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
-_MONGO_CLIENT = None
+_JSON_STORE: Optional["JsonStore"] = None
+_SQLITE_STORE: Optional["SqliteStore"] = None
 
 if os.environ.get("CRUD_DB_PATH"):
     DB_PATH = os.environ["CRUD_DB_PATH"]
@@ -20,25 +42,73 @@ elif os.environ.get("VERCEL") or os.environ.get("VERCEL_ENV"):
 else:
     DB_PATH = str(PROJECT_ROOT / "data" / "db.json")
 
+T = TypeVar("T")
+
+
+# Fields returned from MongoDB when building an Item; leaves out slug and scores.
+_ITEM_PROJECTION = {"name": 1, "description": 1, "created_at": 1, "updated_at": 1}
+
+
+class ConflictError(Exception):
+    """Raised when an update's ``expected_updated_at`` no longer matches."""
+
 
 def _mongodb_uri() -> Optional[str]:
-    return os.environ.get("MONGODB_URI") or os.environ.get("CRUD_MONGODB_URI")
+    return mongo.uri()
+
+
+def _journal_enabled() -> bool:
+    return env_flag("CRUD_JOURNAL")
+
+
+def _sqlite_path() -> str:
+    if os.environ.get("CRUD_SQLITE_PATH"):
+        return os.environ["CRUD_SQLITE_PATH"]
+    return str(Path(DB_PATH).with_suffix(".sqlite3"))
+
+
+def _on_vercel() -> bool:
+    return bool(os.environ.get("VERCEL") or os.environ.get("VERCEL_ENV"))
+
+
+def _storage_backend() -> str:
+    """Pick the backend: MongoDB when a URI is set, then SQLite, then the JSON file."""
+    if _mongodb_uri():
+        return "mongodb"
+
+    requested = os.environ.get("CRUD_STORAGE", "").strip().lower()
+    if requested == "sqlite" or os.environ.get("CRUD_SQLITE_PATH"):
+        return "sqlite"
+
+    return "json-file"
 
 
 def get_storage_status() -> Dict[str, Any]:
     """Describe the currently selected storage backend."""
-    if _mongodb_uri():
+    backend = _storage_backend()
+    if backend == "mongodb":
         return {
             "backend": "mongodb",
             "persistent": True,
             "source": "MONGODB_URI or CRUD_MONGODB_URI",
+            **mongo.status(),
+        }
+
+    if backend == "sqlite":
+        return {
+            "backend": "sqlite",
+            "persistent": not _on_vercel(),
+            "path": _sqlite_path(),
+            "journal_mode": "wal",
         }
 
-    if os.environ.get("VERCEL") or os.environ.get("VERCEL_ENV"):
+    if _on_vercel():
         return {
             "backend": "json-file",
             "persistent": False,
             "path": DB_PATH,
+            "journal": _journal_enabled(),
+            "format": codec.store_format(),
             "note": "Configure MONGODB_URI for durable MongoDB Atlas storage.",
         }
 
@@ -46,37 +116,91 @@ def get_storage_status() -> Dict[str, Any]:
         "backend": "json-file",
         "persistent": True,
         "path": DB_PATH,
+        "journal": _journal_enabled(),
+        "format": codec.store_format(),
     }
 
 
 def _mongo_collection():
-    global _MONGO_CLIENT
-
-    try:
-        from pymongo import MongoClient
-        from pymongo.errors import ConfigurationError
-    except ImportError as exc:
-        raise RuntimeError(
-            "MongoDB storage requires pymongo. Run `pip install -r requirements.txt`."
-        ) from exc
-
-    if _MONGO_CLIENT is None:
-        _MONGO_CLIENT = MongoClient(_mongodb_uri(), serverSelectionTimeoutMS=5000)
-
-    database_name = os.environ.get("MONGODB_DATABASE") or os.environ.get(
-        "CRUD_MONGODB_DATABASE"
+    return mongo.get_collection()
+
+
+def _touch_mongo_version() -> None:
+    # MongoDB has no store-wide change counter, so writes made through this
+    # module keep one in a meta document. That costs one extra round trip per
+    # write, and the two writes are not atomic: if the process dies between
+    # them, listing ETags stay stale until the next write bumps the counter.
+    # Item ETags do not depend on it; they come from the item's own timestamps.
+    mongo.get_meta_collection().update_one(
+        {"_id": "items"},
+        {
+            "$inc": {"version": 1},
+            "$set": {"modified_at": datetime.now(timezone.utc).isoformat()},
+        },
+        upsert=True,
     )
-    if database_name:
-        database = _MONGO_CLIENT[database_name]
+
+
+def warm_up() -> None:
+    """Open the selected backend ahead of the first request.
+
+    For MongoDB this connects the client and ensures indexes; for the file
+    backends it opens the database so the first read is already cached.
+    """
+    backend = _storage_backend()
+    if backend == "mongodb":
+        mongo.warm_up()
+    elif backend == "sqlite":
+        _sqlite_store().connection()
     else:
-        try:
-            database = _MONGO_CLIENT.get_default_database()
-        except ConfigurationError:
-            database = _MONGO_CLIENT["crud_app"]
+        _load_db()
+
+
+def reset_after_fork() -> None:
+    """Drop storage handles a forked worker inherited from its parent.
 
-    collection = database["items"]
-    collection.create_index("created_at")
-    return collection
+    The MongoDB client and SQLite connections are not fork-safe, so the child
+    opens its own on first use. The JSON store's cache can stay: every read
+    re-checks the file signature, and the shared pages cost no extra memory.
+    """
+    global _SQLITE_STORE
+
+    mongo.reset(close=False)
+    _SQLITE_STORE = None
+
+
+def _find_mongo_item(item_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch one item document, through the read-through cache when enabled."""
+    item_cache = mongo.item_cache()
+    if item_cache is None:
+        return _mongo_collection().find_one({"_id": str(item_id)}, _ITEM_PROJECTION)
+
+    document = item_cache.get(str(item_id))
+    if document is None:
+        token = item_cache.token()
+        document = _mongo_collection().find_one(
+            {"_id": str(item_id)}, _ITEM_PROJECTION
+        )
+        if document is not None:
+            item_cache.put(str(item_id), document, token)
+    return document
+
+
+def _forget_mongo_items(item_ids: Iterable[str]) -> None:
+    item_cache = mongo.item_cache()
+    if item_cache is not None:
+        for item_id in item_ids:
+            item_cache.discard(str(item_id))
+
+
+def _record_from_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": str(document["_id"]),
+        "name": document["name"],
+        "description": document["description"],
+        "created_at": document["created_at"],
+        "updated_at": document.get("updated_at"),
+    }
 
 
 def _item_from_document(document: Dict[str, Any]) -> Item:
@@ -89,62 +213,122 @@ def _item_from_document(document: Dict[str, Any]) -> Item:
     )
 
 
-def _empty_db() -> Dict[str, List[Dict[str, Any]]]:
-    return {"items": []}
+def _document_from_item(item: Item) -> Dict[str, Any]:
+    document = item.to_dict()
+    document["_id"] = document.pop("id")
+    document["slug"] = generate_slug(item.name)
+    return document
+
+
+def _json_store() -> "JsonStore":
+    global _JSON_STORE
+
+    # DB_PATH may be reassigned at runtime (tests do this), so the cached store
+    # is tied to the path and mode it was opened with.
+    journal = _journal_enabled()
+    group_commit = float(os.environ.get("CRUD_GROUP_COMMIT_MS") or 0) / 1000
+    snapshot_format = codec.store_format()
+    if (
+        _JSON_STORE is None
+        or _JSON_STORE.path != DB_PATH
+        or _JSON_STORE.journal != journal
+        or _JSON_STORE.group_commit != group_commit
+        or _JSON_STORE.snapshot_format != snapshot_format
+    ):
+        from app.json_store import (
+            DEFAULT_COMPACT_BYTES,
+            DEFAULT_COMPACT_RATIO,
+            JsonStore,
+        )
 
+        _JSON_STORE = JsonStore(
+            DB_PATH,
+            journal=journal,
+            compact_bytes=int(
+                os.environ.get("CRUD_JOURNAL_COMPACT_BYTES", DEFAULT_COMPACT_BYTES)
+            ),
+            compact_ratio=float(
+                os.environ.get("CRUD_JOURNAL_COMPACT_RATIO", DEFAULT_COMPACT_RATIO)
+            ),
+            group_commit=group_commit,
+            snapshot_format=snapshot_format,
+        )
+    return _JSON_STORE
 
-def _load_db() -> Dict[str, List[Dict[str, Any]]]:
-    path = Path(DB_PATH)
-    if not path.exists():
-        return _empty_db()
 
-    with path.open("r", encoding="utf-8") as file:
-        data = json.load(file)
+def _sqlite_store() -> "SqliteStore":
+    global _SQLITE_STORE
 
-    if "items" not in data or not isinstance(data["items"], list):
-        return _empty_db()
+    path = _sqlite_path()
+    if _SQLITE_STORE is None or _SQLITE_STORE.path != path:
+        from app.sqlite_store import SqliteStore
 
-    return data
+        _SQLITE_STORE = SqliteStore(path)
+    return _SQLITE_STORE
 
 
-def _save_db(data: Dict[str, List[Dict[str, Any]]]) -> None:
-    path = Path(DB_PATH)
-    path.parent.mkdir(parents=True, exist_ok=True)
+def _load_db() -> "JsonStore":
+    return _json_store().load()
 
-    with path.open("w", encoding="utf-8") as file:
-        json.dump(data, file, indent=2)
 
+def _mutate_db(apply: Callable[["JsonStore"], T]) -> T:
+    """Run a read-modify-write on the JSON store under its file lock."""
+    return _json_store().mutate(apply)
+
+
+def _new_id() -> str:
+    from uuid import uuid4
+
+    return str(uuid4())
+
+
+def _strip(value: Any) -> Any:
+    return value.strip() if isinstance(value, str) else value
 
-def _find_item_index(items: List[Dict[str, Any]], item_id: str) -> Optional[int]:
-    for index, item in enumerate(items):
-        if str(item.get("id")) == str(item_id):
-            return index
-    return None
 
+def _apply_changes(
+    item: Item, name: Optional[str], description: Optional[str]
+) -> Item:
+    """Validate the merged fields and apply them to ``item`` in place."""
+    new_name = item.name if name is None else _strip(name)
+    new_description = item.description if description is None else _strip(description)
+
+    errors = validate_item_data({"name": new_name, "description": new_description})
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    item.name = new_name
+    item.description = new_description
+    item.updated_at = datetime.now(timezone.utc).isoformat()
+    return item
 
+
+@metrics.operation
 def create_item(name: str, description: str) -> Item:
     """Create and persist a new item."""
     errors = validate_item_data({"name": name, "description": description})
     if errors:
         raise ValueError("; ".join(errors))
 
-    if _mongodb_uri():
-        item = Item.create(str(uuid4()), name.strip(), description.strip())
-        document = item.to_dict()
-        document["_id"] = document.pop("id")
-        _mongo_collection().insert_one(document)
-        return item
+    item = Item.create(_new_id(), name.strip(), description.strip())
+    backend = _storage_backend()
+    if backend == "mongodb":
+        _mongo_collection().insert_one(_document_from_item(item))
+        _touch_mongo_version()
+    elif backend == "sqlite":
+        _sqlite_store().insert(item.to_dict())
+    else:
+        _mutate_db(lambda db: db.put(item.to_dict()))
 
-    db = _load_db()
-    item = Item.create(str(uuid4()), name.strip(), description.strip())
-    db["items"].append(item.to_dict())
-    _save_db(db)
+    cache.invalidate()
     return item
 
 
+@metrics.operation
 def get_items(limit: Optional[int] = None, offset: int = 0) -> List[Item]:
     """Return all items, optionally sliced for simple pagination."""
-    if _mongodb_uri():
+    backend = _storage_backend()
+    if backend == "mongodb":
         cursor = _mongo_collection().find().sort("created_at", -1)
         if offset:
             cursor = cursor.skip(offset)
@@ -153,99 +337,673 @@ def get_items(limit: Optional[int] = None, offset: int = 0) -> List[Item]:
 
         return [_item_from_document(document) for document in cursor]
 
-    items = [Item.from_dict(item) for item in _load_db()["items"]]
+    if backend == "sqlite":
+        records = _sqlite_store().records(limit, offset)
+        return [Item.from_dict(record) for record in records]
+
+    stop = None if limit is None else offset + limit
+    records = _load_db().records(offset, stop)
+    return [Item.from_dict(record) for record in records]
+
+
+def _encode_cursor(key: "SortKey") -> str:
+    raw = codec.dumps(list(key))
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> "SortKey":
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = codec.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor") from None
+    if not isinstance(created_at, str) or not isinstance(item_id, str):
+        raise ValueError("Invalid cursor")
+    return created_at, item_id
+
+
+@metrics.operation
+def get_items_page(
+    limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Item], Optional[str]]:
+    """Return one page of items ordered by creation time, oldest first.
+
+    ``cursor`` is the opaque ``next_cursor`` value from the previous page. The
+    page is found by seeking to that position, so later pages cost the same as
+    the first. The returned cursor is None on the last page.
+    """
+    if limit < 1:
+        raise ValueError("Limit must be a positive integer")
+    after = _decode_cursor(cursor) if cursor else None
+
+    backend = _storage_backend()
+    if backend == "mongodb":
+        query: Dict[str, Any] = {}
+        if after is not None:
+            query = {
+                "$or": [
+                    {"created_at": {"$gt": after[0]}},
+                    {"created_at": after[0], "_id": {"$gt": after[1]}},
+                ]
+            }
+        documents = list(
+            _mongo_collection()
+            .find(query)
+            .sort([("created_at", 1), ("_id", 1)])
+            .limit(limit + 1)
+        )
+        items = [_item_from_document(document) for document in documents[:limit]]
+        next_key = None
+        if len(documents) > limit:
+            next_key = (items[-1].created_at, items[-1].id)
+    else:
+        store = _sqlite_store() if backend == "sqlite" else _load_db()
+        records, next_key = store.page(limit, after)
+        items = [Item.from_dict(record) for record in records]
+
+    return items, _encode_cursor(next_key) if next_key else None
+
+
+@metrics.operation
+def search_items(query: str, limit: Optional[int] = None) -> List[Item]:
+    """Return items matching every term of ``query``, best matches first.
+
+    Name matches rank above description matches. The JSON and SQLite backends
+    match terms anywhere inside a word; MongoDB uses its text index, which
+    matches whole (stemmed) words only.
+    """
+    if limit is not None and limit < 1:
+        raise ValueError("Limit must be a positive integer")
+
+    backend = _storage_backend()
+    if backend == "mongodb":
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        # Quoted terms are ANDed together by MongoDB text search.
+        cursor = _mongo_collection().find(
+            {"$text": {"$search": " ".join(f'"{term}"' for term in terms)}},
+            {"score": {"$meta": "textScore"}},
+        )
+        cursor = cursor.sort([("score", {"$meta": "textScore"})])
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return [_item_from_document(document) for document in cursor]
+
+    store = _sqlite_store() if backend == "sqlite" else _load_db()
+    return [Item.from_dict(record) for record in store.search(query, limit)]
 
-    if offset:
-        items = items[offset:]
-    if limit is not None:
-        items = items[:limit]
 
-    return items
+@metrics.operation
+def suggest_items(prefix: str, limit: int = 10) -> List[Item]:
+    """Return up to ``limit`` items whose name slug starts with ``prefix``.
 
+    ``prefix`` is normalised with ``generate_slug``, so "Hello W" finds
+    "hello-world". Results are ordered by slug.
+    """
+    if limit < 1:
+        raise ValueError("Limit must be a positive integer")
 
+    backend = _storage_backend()
+    if backend == "mongodb":
+        slug = generate_slug(prefix)
+        if not slug:
+            return []
+
+        # An anchored, case-sensitive regex is answered from the slug index.
+        cursor = (
+            _mongo_collection()
+            .find({"slug": {"$regex": "^" + re.escape(slug)}})
+            .sort([("slug", 1), ("_id", 1)])
+            .limit(limit)
+        )
+        return [_item_from_document(document) for document in cursor]
+
+    store = _sqlite_store() if backend == "sqlite" else _load_db()
+    return [Item.from_dict(record) for record in store.suggest(prefix, limit)]
+
+
+def migrate_slugs() -> int:
+    """Give items stored before autocomplete existed their slug.
+
+    Returns how many items were updated. Only MongoDB needs this run once: the
+    SQLite store fills the column when it opens an old database, and the JSON
+    store derives slugs from names as it indexes them.
+    """
+    if _storage_backend() != "mongodb":
+        return 0
+
+    updated = mongo.backfill_slugs(_mongo_collection())
+    if updated:
+        _touch_mongo_version()
+        cache.invalidate()
+    return updated
+
+
+@metrics.operation
+def count_items() -> int:
+    """Return the number of stored items without reading them.
+
+    MongoDB answers from collection metadata, so the count is an estimate.
+    """
+    backend = _storage_backend()
+    if backend == "mongodb":
+        return _mongo_collection().estimated_document_count()
+    if backend == "sqlite":
+        return _sqlite_store().count()
+    return len(_load_db())
+
+
+@metrics.operation
+def get_store_version() -> Tuple[int, Optional[str]]:
+    """Return a counter that grows with every write, and the time of the last one.
+
+    Both are cheap to read, so a caller can check whether anything changed
+    before fetching items. The time is an ISO string, or None if unknown.
+    """
+    backend = _storage_backend()
+    if backend == "mongodb":
+        document = mongo.get_meta_collection().find_one({"_id": "items"})
+        if document is None:
+            return 0, None
+        return document.get("version", 0), document.get("modified_at")
+
+    if backend == "sqlite":
+        return _sqlite_store().version()
+
+    store = _load_db()
+    return store.version, store.modified_at
+
+
+@metrics.operation
+def get_item_version(item_id: str) -> Optional[str]:
+    """Return an item's ``updated_at``, or ``created_at`` if it was never updated.
+
+    Returns None when the item does not exist. MongoDB fetches only the two
+    timestamps, not the whole document.
+    """
+    backend = _storage_backend()
+    if backend == "mongodb":
+        if mongo.item_cache() is not None:
+            record = _find_mongo_item(item_id)
+        else:
+            record = _mongo_collection().find_one(
+                {"_id": str(item_id)}, {"created_at": 1, "updated_at": 1}
+            )
+    elif backend == "sqlite":
+        record = _sqlite_store().get(item_id)
+    else:
+        record = _load_db().get(item_id)
+    return _record_version(record) if record else None
+
+
+def iter_records() -> Iterator[Dict[str, Any]]:
+    """Yield every item as a plain record in listing order.
+
+    Records have the shape of ``Item.to_dict()`` and come straight from the
+    backend, with no ``Item`` built in between, so large listings can be
+    serialized without the extra copies. They may be shared with the store's
+    cache and must not be modified.
+
+    MongoDB and SQLite rows are fetched in batches as the caller consumes them.
+    The iterator does not depend on the thread that started it, so it can be
+    resumed from any thread of a pool.
+    """
+    backend = _storage_backend()
+    if backend == "mongodb":
+        cursor = (
+            _mongo_collection()
+            .find({}, _ITEM_PROJECTION)
+            .sort("created_at", -1)
+            .batch_size(500)
+        )
+        for document in cursor:
+            yield _record_from_document(document)
+        return
+
+    if backend == "sqlite":
+        yield from _sqlite_store().iter_records()
+        return
+
+    # The JSON store is already in memory; records() hands back a list of
+    # references, so a concurrent write cannot change it while it is walked.
+    yield from _load_db().records()
+
+
+def iter_items() -> Iterator[Item]:
+    """Yield every item in listing order without building the whole list."""
+    for record in iter_records():
+        yield Item.from_dict(record)
+
+
+@metrics.operation
 def get_item_by_id(item_id: str) -> Optional[Item]:
     """Return one item by ID, or None when it does not exist."""
-    if _mongodb_uri():
-        document = _mongo_collection().find_one({"_id": str(item_id)})
+    backend = _storage_backend()
+    if backend == "mongodb":
+        document = _find_mongo_item(item_id)
         return _item_from_document(document) if document else None
 
-    db = _load_db()
-    index = _find_item_index(db["items"], item_id)
-    if index is None:
+    if backend == "sqlite":
+        record = _sqlite_store().get(item_id)
+    else:
+        record = _load_db().get(item_id)
+    if record is None:
         return None
-    return Item.from_dict(db["items"][index])
+    return Item.from_dict(record)
+
 
+def _record_version(record: Dict[str, Any]) -> str:
+    return record.get("updated_at") or record["created_at"]
 
+
+@metrics.operation
 def update_item(
     item_id: str,
     name: Optional[str] = None,
     description: Optional[str] = None,
+    expected_updated_at: Optional[str] = None,
 ) -> Optional[Item]:
-    """Update an existing item."""
-    if _mongodb_uri():
+    """Update an existing item.
+
+    With ``expected_updated_at`` the update only applies if the item's
+    ``updated_at`` (or ``created_at``, if it was never updated) still has that
+    value; otherwise ``ConflictError`` is raised. Returns None when the item
+    does not exist.
+    """
+    backend = _storage_backend()
+    if backend == "mongodb":
         from pymongo import ReturnDocument
 
-        collection = _mongo_collection()
-        document = collection.find_one({"_id": str(item_id)})
-        if not document:
-            return None
+        # Validate the incoming fields on their own so the update needs no prior
+        # read, then apply it in one round trip.
+        changes = {}
+        if name is not None:
+            changes["name"] = _strip(name)
+        if description is not None:
+            changes["description"] = _strip(description)
 
-        new_name = document["name"] if name is None else name.strip()
-        new_description = (
-            document["description"] if description is None else description.strip()
-        )
-
-        errors = validate_item_data({"name": new_name, "description": new_description})
+        errors = validate_item_update(changes)
         if errors:
             raise ValueError("; ".join(errors))
 
+        if "name" in changes:
+            changes["slug"] = generate_slug(changes["name"])
+        changes["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+        query: Dict[str, Any] = {"_id": str(item_id)}
+        if expected_updated_at is not None:
+            query["$or"] = [
+                {"updated_at": expected_updated_at},
+                {"updated_at": None, "created_at": expected_updated_at},
+            ]
+
+        collection = _mongo_collection()
         updated_document = collection.find_one_and_update(
-            {"_id": str(item_id)},
-            {
-                "$set": {
-                    "name": new_name,
-                    "description": new_description,
-                    "updated_at": datetime.now(timezone.utc).isoformat(),
-                }
-            },
+            query,
+            {"$set": changes},
+            projection=_ITEM_PROJECTION,
             return_document=ReturnDocument.AFTER,
         )
+        if updated_document is None:
+            # Only a failed precondition needs a second look, to tell a stale
+            # version apart from a missing item.
+            if expected_updated_at is not None and collection.find_one(
+                {"_id": str(item_id)}, {"_id": 1}
+            ):
+                raise ConflictError("Item was modified by another request")
+            return None
 
+        _touch_mongo_version()
+        _forget_mongo_items([item_id])
+        cache.invalidate([item_id])
         return _item_from_document(updated_document)
 
-    db = _load_db()
-    index = _find_item_index(db["items"], item_id)
-    if index is None:
-        return None
+    def apply(db: Any) -> Optional[Item]:
+        record = db.get(item_id)
+        if record is None:
+            return None
 
-    item = Item.from_dict(db["items"][index])
-    new_name = item.name if name is None else name.strip()
-    new_description = item.description if description is None else description.strip()
+        if expected_updated_at not in (None, _record_version(record)):
+            raise ConflictError("Item was modified by another request")
 
-    errors = validate_item_data({"name": new_name, "description": new_description})
-    if errors:
-        raise ValueError("; ".join(errors))
+        return _apply_changes(Item.from_dict(record), name, description)
 
-    item.name = new_name
-    item.description = new_description
-    item.updated_at = datetime.now(timezone.utc).isoformat()
+    if backend == "sqlite":
+        store = _sqlite_store()
+        item = apply(store)
+        if item is None:
+            return None
+        if not store.update(item.to_dict(), expected_version=expected_updated_at):
+            if expected_updated_at is not None and store.get(item_id) is not None:
+                raise ConflictError("Item was modified by another request")
+            return None
+        cache.invalidate([item_id])
+        return item
+
+    def apply_and_put(db: "JsonStore") -> Optional[Item]:
+        item = apply(db)
+        if item is not None:
+            db.put(item.to_dict())
+        return item
 
-    db["items"][index] = item.to_dict()
-    _save_db(db)
+    # Checking the version under the store's lock makes the comparison and the
+    # write one atomic step, even across processes.
+    item = _mutate_db(apply_and_put)
+    if item is not None:
+        cache.invalidate([item_id])
     return item
 
 
+@metrics.operation
 def delete_item(item_id: str) -> bool:
     """Delete an item by ID."""
-    if _mongodb_uri():
-        result = _mongo_collection().delete_one({"_id": str(item_id)})
-        return result.deleted_count > 0
+    backend = _storage_backend()
+    if backend == "mongodb":
+        deleted = _mongo_collection().delete_one({"_id": str(item_id)}).deleted_count
+        if deleted:
+            _touch_mongo_version()
+            _forget_mongo_items([item_id])
+    elif backend == "sqlite":
+        deleted = _sqlite_store().delete(item_id)
+    else:
+        deleted = _mutate_db(lambda db: db.remove(item_id))
+
+    if deleted:
+        cache.invalidate([item_id])
+    return bool(deleted)
+
+
+def _build_items(
+    records: Iterable[Any],
+) -> Tuple[List[BatchResult], List[Tuple[int, Item]]]:
+    """Validate records and build items for the valid ones.
+
+    Returns a result per record and ``(result index, item)`` for each item to
+    store.
+    """
+    results: List[BatchResult] = []
+    pending: List[Tuple[int, Item]] = []
+
+    for record in records:
+        if not isinstance(record, dict):
+            results.append(BatchResult(error="Record must be an object"))
+            continue
+
+        errors = validate_item_data(record)
+        if errors:
+            results.append(BatchResult(error="; ".join(errors)))
+            continue
 
-    db = _load_db()
-    index = _find_item_index(db["items"], item_id)
-    if index is None:
-        return False
+        item = Item.create(
+            _new_id(), record["name"].strip(), record["description"].strip()
+        )
+        pending.append((len(results), item))
+        results.append(BatchResult(id=item.id, item=item))
+
+    return results, pending
+
+
+@metrics.operation
+def create_items(records: Iterable[Dict[str, Any]]) -> List[BatchResult]:
+    """Create many items with a single write to the storage backend.
+
+    Every record is validated before anything is written. Invalid records are
+    reported in their result and skipped; the rest are stored together.
+    """
+    results, pending = _build_items(records)
+    if not pending:
+        return results
+
+    backend = _storage_backend()
+    if backend == "mongodb":
+        from pymongo.errors import BulkWriteError
+
+        try:
+            _mongo_collection().insert_many(
+                [_document_from_item(item) for _, item in pending], ordered=False
+            )
+        except BulkWriteError as exc:
+            for error in exc.details.get("writeErrors", []):
+                position, item = pending[error["index"]]
+                results[position] = BatchResult(
+                    id=item.id, error=error.get("errmsg", "Write failed")
+                )
+        _touch_mongo_version()
+        cache.invalidate()
+        return results
+
+    if backend == "sqlite":
+        _sqlite_store().insert_many([item.to_dict() for _, item in pending])
+        cache.invalidate()
+        return results
+
+    def put_all(db: "JsonStore") -> None:
+        for _, item in pending:
+            db.put(item.to_dict())
+
+    _mutate_db(put_all)
+    cache.invalidate()
+    return results
+
+
+def _batches(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(records)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_items(
+    records: Iterable[Any], batch_size: int = 10000
+) -> Iterator[List[BatchResult]]:
+    """Create items from a stream of records, yielding each batch's results.
+
+    Records are validated and converted ``batch_size`` at a time as they are
+    read, so the input may be any length. MongoDB and SQLite store each batch
+    as it goes, so an interrupted import keeps the batches already yielded.
+    The JSON file is written once, after the stream is exhausted, instead of
+    once per batch.
+    """
+    batches = _batches(records, batch_size)
+    backend = _storage_backend()
+    if backend == "mongodb":
+        for batch in batches:
+            yield create_items(batch)
+        return
+
+    if backend == "sqlite":
+        # One transaction per batch, so the write lock is never held while the
+        # next batch is still being read from the input.
+        for batch in batches:
+            results, pending = _build_items(batch)
+            _sqlite_store().bulk_insert([item.to_dict() for _, item in pending])
+            cache.invalidate()
+            yield results
+        return
+
+    # The JSON store keeps every record in memory anyway; holding the new ones
+    # until the end turns one snapshot rewrite per batch into a single write.
+    new_records: List[Dict[str, Any]] = []
+    for batch in batches:
+        results, pending = _build_items(batch)
+        new_records.extend(item.to_dict() for _, item in pending)
+        yield results
+
+    if new_records:
+
+        def put_all(db: "JsonStore") -> None:
+            for record in new_records:
+                db.put(record)
+
+        _mutate_db(put_all)
+        cache.invalidate()
+
+
+def _check_update(update: Any) -> Optional[str]:
+    if not isinstance(update, dict) or not update.get("id"):
+        return "Each update must be an object with an id"
+    if "name" not in update and "description" not in update:
+        return "Provide name, description, or both"
+    if update.get("name", "") is None or update.get("description", "") is None:
+        return "Fields cannot be null"
+    return None
 
-    del db["items"][index]
-    _save_db(db)
-    return True
+
+@metrics.operation
+def update_items(updates: Iterable[Dict[str, Any]]) -> List[BatchResult]:
+    """Update many items, validating each one and writing them together.
+
+    Each update is a dict with an ``id`` and a new ``name``, ``description``, or
+    both. Updates naming an unknown ID are reported as not found.
+    """
+    results: List[BatchResult] = []
+    pending: List[Tuple[int, Dict[str, Any]]] = []
+
+    for update in updates:
+        error = _check_update(update)
+        if error:
+            item_id = update.get("id") if isinstance(update, dict) else None
+            results.append(BatchResult(id=item_id, error=error))
+            continue
+
+        pending.append((len(results), update))
+        results.append(BatchResult(id=str(update["id"])))
+
+    if not pending:
+        return results
+
+    def merge(
+        position: int, update: Dict[str, Any], current: Optional[Item]
+    ) -> Optional[Item]:
+        if current is None:
+            results[position].error = "Item not found"
+            results[position].not_found = True
+            return None
+        try:
+            item = _apply_changes(current, update.get("name"), update.get("description"))
+        except ValueError as exc:
+            results[position].error = str(exc)
+            return None
+        results[position].item = item
+        return item
+
+    backend = _storage_backend()
+    if backend == "mongodb":
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+
+        collection = _mongo_collection()
+        ids = list({str(update["id"]) for _, update in pending})
+        current = {
+            document["_id"]: _item_from_document(document)
+            for document in collection.find({"_id": {"$in": ids}})
+        }
+
+        operations = []
+        positions = []
+        for position, update in pending:
+            # Later updates to the same ID build on the earlier ones.
+            item = merge(position, update, current.get(str(update["id"])))
+            if item is None:
+                continue
+            current[item.id] = Item.from_dict(item.to_dict())
+            operations.append(
+                UpdateOne(
+                    {"_id": item.id},
+                    {
+                        "$set": {
+                            "name": item.name,
+                            "description": item.description,
+                            "slug": generate_slug(item.name),
+                            "updated_at": item.updated_at,
+                        }
+                    },
+                )
+            )
+            positions.append(position)
+
+        if operations:
+            try:
+                collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as exc:
+                for error in exc.details.get("writeErrors", []):
+                    result = results[positions[error["index"]]]
+                    result.item = None
+                    result.error = error.get("errmsg", "Write failed")
+            _touch_mongo_version()
+            _forget_mongo_items(current)
+            cache.invalidate(result.id for result in results if result.item)
+        return results
+
+    if backend == "sqlite":
+        store = _sqlite_store()
+        staged: Dict[str, Dict[str, Any]] = {}
+        changed = []
+        positions = []
+        for position, update in pending:
+            record = staged.get(str(update["id"])) or store.get(update["id"])
+            item = merge(position, update, Item.from_dict(record) if record else None)
+            if item is not None:
+                staged[item.id] = item.to_dict()
+                changed.append(staged[item.id])
+                positions.append(position)
+
+        for position, updated in zip(positions, store.update_many(changed)):
+            if not updated:
+                results[position] = BatchResult(
+                    id=results[position].id, error="Item not found", not_found=True
+                )
+        cache.invalidate(result.id for result in results if result.item)
+        return results
+
+    def apply(db: "JsonStore") -> None:
+        for position, update in pending:
+            record = db.get(update["id"])
+            item = merge(position, update, Item.from_dict(record) if record else None)
+            if item is not None:
+                db.put(item.to_dict())
+
+    _mutate_db(apply)
+    cache.invalidate(result.id for result in results if result.item)
+    return results
+
+
+@metrics.operation
+def delete_items(item_ids: Iterable[str]) -> List[BatchResult]:
+    """Delete many items with a single write, reporting IDs that did not exist."""
+    ids = [str(item_id) for item_id in item_ids]
+    if not ids:
+        return []
+
+    backend = _storage_backend()
+    if backend == "mongodb":
+        collection = _mongo_collection()
+        existing = {
+            document["_id"]
+            for document in collection.find({"_id": {"$in": ids}}, {"_id": 1})
+        }
+        if existing:
+            collection.delete_many({"_id": {"$in": list(existing)}})
+            _touch_mongo_version()
+            _forget_mongo_items(existing)
+
+        deleted = []
+        for item_id in ids:
+            deleted.append(item_id in existing)
+            existing.discard(item_id)
+    elif backend == "sqlite":
+        deleted = _sqlite_store().delete_many(ids)
+    else:
+        deleted = _mutate_db(lambda db: [db.remove(item_id) for item_id in ids])
+
+    cache.invalidate(item_id for item_id, removed in zip(ids, deleted) if removed)
+    return [
+        BatchResult(id=item_id)
+        if removed
+        else BatchResult(id=item_id, error="Item not found", not_found=True)
+        for item_id, removed in zip(ids, deleted)
+    ]
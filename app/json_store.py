@@ -0,0 +1,524 @@
+import os
+from datetime import datetime, timezone
+import tempfile
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from app import codec, metrics
+from app.search import SearchIndex, SlugIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies.
+    fcntl = None
+
+
+FileSignature = Tuple[int, int, int]
+SortKey = Tuple[str, str]
+T = TypeVar("T")
+
+DEFAULT_COMPACT_BYTES = 8 * 1024 * 1024
+DEFAULT_COMPACT_RATIO = 1.0
+# Below this size the journal is never compacted for ratio reasons alone,
+# otherwise a small snapshot would be rewritten after every few writes.
+MIN_RATIO_COMPACT_BYTES = 64 * 1024
+
+
+def sort_key(record: Dict[str, Any]) -> SortKey:
+    """Key used for keyset pagination: creation time, then ID as a tie-breaker."""
+    return (record.get("created_at") or "", str(record.get("id")))
+
+
+class _Mutation:
+    """A queued call to ``JsonStore.mutate`` waiting for its group commit."""
+
+    __slots__ = ("apply", "result", "error", "done")
+
+    def __init__(self, apply: Callable[["JsonStore"], Any]):
+        self.apply = apply
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class JsonStore:
+    """Keep a JSON file database in memory and reload it only when the file changes.
+
+    The file is identified by its modification time, size and inode. As long as
+    none of those move, reads are served from the parsed copy held in memory.
+    Records are indexed by ID in an insertion-ordered dict, so lookups, updates
+    and deletes are constant-time while listings keep the on-disk order.
+
+    With ``journal=True`` each save appends the pending mutations to
+    ``<path>.journal`` as one compact JSON line apiece instead of rewriting the
+    snapshot. Loading replays the journal over the snapshot, and once the journal
+    grows past ``compact_bytes`` or ``compact_ratio`` times the snapshot size it is
+    folded into a new snapshot. Snapshots are always written to a temporary file
+    and renamed into place, so a crash never leaves a torn database. They are
+    compact JSON, or with ``snapshot_format="binary"`` the faster binary format
+    of ``app.codec``; either is recognised when read.
+
+    For keyset pagination the store also keeps a sorted list of
+    ``(created_at, id)`` keys, built on first use. New items usually sort last
+    and are appended. Deleted keys are left in place and skipped while paging
+    until enough of them pile up to be worth a rebuild. A full-text
+    ``SearchIndex`` and a ``SlugIndex`` for name autocomplete are likewise built
+    on first use and kept up to date by every put and remove after that.
+
+    Writes go through ``mutate``, which takes an exclusive ``fcntl`` lock on
+    ``<path>.lock`` and then a thread lock while it reloads, applies and saves, so
+    concurrent threads and processes sharing the file never lose an update. With
+    ``group_commit`` set to a number of seconds, mutations arriving within that
+    window are applied together and persisted with a single save and fsync.
+
+    Every put and remove bumps ``version``, a counter saved with the snapshot
+    (each journal entry replayed adds one), so readers can tell whether anything
+    changed without comparing records.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        journal: bool = False,
+        compact_bytes: int = DEFAULT_COMPACT_BYTES,
+        compact_ratio: float = DEFAULT_COMPACT_RATIO,
+        group_commit: float = 0.0,
+        snapshot_format: str = "json",
+    ):
+        self.path = path
+        self.journal = journal
+        self.journal_path = path + ".journal"
+        self.lock_path = path + ".lock"
+        self.compact_bytes = compact_bytes
+        self.compact_ratio = compact_ratio
+        self.group_commit = group_commit
+        self.snapshot_format = snapshot_format
+        self._items: Optional[Dict[str, Dict[str, Any]]] = None
+        self._signature: Optional[Tuple[Optional[FileSignature], ...]] = None
+        self._pending: List[Dict[str, Any]] = []
+        self._snapshot_bytes = 0
+        self._journal_bytes = 0
+        # (offset, prefix) for the next append when the journal ends mid-line.
+        self._journal_tail: Optional[Tuple[int, bytes]] = None
+        self._order: Optional[List[SortKey]] = None
+        self._stale_keys = 0
+        self._search: Optional[SearchIndex] = None
+        self._slugs: Optional[SlugIndex] = None
+        self._version = 0
+        self._lock = threading.RLock()
+        self._queue: List[_Mutation] = []
+        self._queue_lock = threading.Lock()
+        self._leader = False
+
+    @staticmethod
+    def _stat(path: str) -> Optional[FileSignature]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _file_signature(self) -> Tuple[Optional[FileSignature], ...]:
+        if self.journal:
+            return (self._stat(self.path), self._stat(self.journal_path))
+        return (self._stat(self.path),)
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "json", "load")
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        path = Path(self.path)
+        items: Dict[str, Dict[str, Any]] = {}
+        self._snapshot_bytes = 0
+        self._journal_bytes = 0
+        self._journal_tail = None
+        self._version = 0
+
+        if path.exists():
+            raw = path.read_bytes()
+            data = codec.decode_snapshot(raw)
+            self._snapshot_bytes = len(raw)
+            if metrics.ENABLED:
+                metrics.STORAGE_BYTES.inc("json", "read", amount=len(raw))
+
+            if isinstance(data.get("items"), list):
+                items = {str(record.get("id")): record for record in data["items"]}
+            self._version = int(data.get("version") or 0)
+
+        if self.journal:
+            self._replay_journal(items)
+
+        return items
+
+    def _replay_journal(self, items: Dict[str, Dict[str, Any]]) -> None:
+        path = Path(self.journal_path)
+        if not path.exists():
+            return
+
+        # Replaying is idempotent, so a journal left behind by a compaction that
+        # crashed after renaming the snapshot still yields the right state.
+        with path.open("rb") as file:
+            data = file.read()
+        lines = data.split(b"\n")
+
+        for number, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                entry = codec.loads(line)
+            except ValueError:
+                if number == len(lines) - 1:
+                    # A torn final line from an interrupted append. The next
+                    # append cuts it off, so it never ends up mid-journal.
+                    self._journal_tail = (len(data) - len(line), b"")
+                    break
+                raise
+
+            if entry["op"] == "put":
+                items[str(entry["item"]["id"])] = entry["item"]
+            elif entry["op"] == "delete":
+                items.pop(str(entry["id"]), None)
+            self._version += 1
+
+        if self._journal_tail is None and data and not data.endswith(b"\n"):
+            # A complete entry that lost its newline: start the next on a new line.
+            self._journal_tail = (len(data), b"\n")
+        self._journal_bytes = path.stat().st_size
+        if metrics.ENABLED:
+            metrics.STORAGE_BYTES.inc("json", "read", amount=self._journal_bytes)
+
+    def invalidate(self) -> None:
+        """Forget the cached copy so the next load re-reads the file."""
+        with self._lock:
+            self._items = None
+            self._signature = None
+            self._pending = []
+            self._order = None
+            self._search = None
+            self._slugs = None
+
+    def load(self) -> "JsonStore":
+        """Refresh the store, re-parsing the file only if another writer changed it."""
+        # Stat before reading: if the file changes mid-read, the stored signature
+        # is older than the data and the next load simply reads it again.
+        with self._lock:
+            signature = self._file_signature()
+            if self._items is None or signature != self._signature:
+                self._items = self._read()
+                self._signature = signature
+                self._pending = []
+                self._order = None
+                self._search = None
+                self._slugs = None
+        return self
+
+    def _loaded(self) -> Dict[str, Dict[str, Any]]:
+        # Accessors work on the copy already in memory; only load() goes back to
+        # the file, so a sequence of puts cannot be lost to a mid-way reload.
+        if self._items is None:
+            self.load()
+        return self._items
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+    def records(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Return stored records in insertion order, optionally sliced.
+
+        The list is taken under the lock, so callers can walk it while other
+        threads keep writing.
+        """
+        with self._lock:
+            return list(islice(self._loaded().values(), start, stop))
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        return self._loaded().get(str(item_id))
+
+    @property
+    def version(self) -> int:
+        """Number of mutations applied to the store so far."""
+        self._loaded()
+        return self._version
+
+    @property
+    def modified_at(self) -> Optional[str]:
+        """ISO time the snapshot or journal was last written, if either exists."""
+        with self._lock:
+            self._loaded()
+            times = [stat[0] for stat in self._signature or () if stat is not None]
+        if not times:
+            return None
+        return datetime.fromtimestamp(max(times) / 1e9, timezone.utc).isoformat()
+
+    def put(self, record: Dict[str, Any]) -> None:
+        """Insert a record, or replace it in place when the ID already exists."""
+        items = self._loaded()
+        item_id = str(record["id"])
+        previous = items.get(item_id)
+        items[item_id] = record
+        self._pending.append({"op": "put", "item": record})
+        self._version += 1
+
+        if self._order is not None:
+            key = sort_key(record)
+            if previous is None or sort_key(previous) != key:
+                if previous is not None:
+                    self._stale_keys += 1
+                self._insert_key(key)
+
+        if self._search is not None:
+            self._index_text(self._search, item_id, record)
+        if self._slugs is not None:
+            self._slugs.add(item_id, record.get("name") or "")
+
+    def remove(self, item_id: str) -> bool:
+        if self._loaded().pop(str(item_id), None) is None:
+            return False
+        self._pending.append({"op": "delete", "id": str(item_id)})
+        self._version += 1
+
+        if self._search is not None:
+            self._search.remove(str(item_id))
+        if self._slugs is not None:
+            self._slugs.remove(str(item_id))
+
+        if self._order is not None:
+            self._stale_keys += 1
+            if self._stale_keys > 1024 and self._stale_keys > len(self._order) // 2:
+                self._order = None
+        return True
+
+    def _insert_key(self, key: SortKey) -> None:
+        order = self._order
+        if not order or key > order[-1]:
+            order.append(key)
+            return
+
+        index = bisect_left(order, key)
+        if index < len(order) and order[index] == key:
+            # A stale key for a record that has come back.
+            self._stale_keys -= 1
+        else:
+            order.insert(index, key)
+
+    def _ordered_keys(self) -> List[SortKey]:
+        if self._order is None:
+            self._order = sorted(sort_key(record) for record in self._loaded().values())
+            self._stale_keys = 0
+        return self._order
+
+    @staticmethod
+    def _index_text(index: SearchIndex, item_id: str, record: Dict[str, Any]) -> None:
+        index.add(item_id, record.get("name") or "", record.get("description") or "")
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return records matching every term of ``query``, best matches first."""
+        with self._lock:
+            items = self._loaded()
+            if self._search is None:
+                index = SearchIndex()
+                for item_id, record in items.items():
+                    self._index_text(index, item_id, record)
+                self._search = index
+
+            return [items[item_id] for item_id in self._search.search(query, limit)]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` records whose name slug starts with ``prefix``."""
+        with self._lock:
+            items = self._loaded()
+            if self._slugs is None:
+                self._slugs = SlugIndex.build(
+                    (item_id, record.get("name") or "")
+                    for item_id, record in items.items()
+                )
+
+            return [items[item_id] for item_id in self._slugs.suggest(prefix, limit)]
+
+    def page(
+        self, limit: int, after: Optional[SortKey] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[SortKey]]:
+        """Return up to ``limit`` records ordered by ``(created_at, id)``.
+
+        Only records sorting after ``after`` are returned. The second value is
+        the key to resume from, or None when there are no more records.
+        """
+        with self._lock:
+            items = self._loaded()
+            order = self._ordered_keys()
+            start = bisect_right(order, after) if after is not None else 0
+
+            page: List[Dict[str, Any]] = []
+            for index in range(start, len(order)):
+                key = order[index]
+                record = items.get(key[1])
+                if record is None or sort_key(record) != key:
+                    continue
+                if len(page) == limit:
+                    return page, sort_key(page[-1])
+                page.append(record)
+
+        return page, None
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on ``<path>.lock`` against other processes."""
+        if fcntl is None:
+            yield
+            return
+
+        Path(self.lock_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as file:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+    def mutate(self, apply: Callable[["JsonStore"], T]) -> T:
+        """Apply a read-modify-write to the latest data and persist it.
+
+        ``apply`` receives the store, freshly reloaded under the locks, and
+        changes it with ``put`` and ``remove``; its return value is passed back.
+        It should raise before changing anything, since in group-commit mode a
+        half-applied mutation fails every mutation committed alongside it.
+        """
+        mutation = _Mutation(apply)
+        if self.group_commit <= 0:
+            self._commit([mutation])
+        else:
+            with self._queue_lock:
+                self._queue.append(mutation)
+                leader = not self._leader
+                self._leader = True
+
+            if leader:
+                # The first caller waits out the window, then commits whatever
+                # has queued up behind it; the others just wait for the result.
+                time.sleep(self.group_commit)
+                with self._queue_lock:
+                    batch, self._queue = self._queue, []
+                    self._leader = False
+                self._commit(batch)
+            mutation.done.wait()
+
+        if mutation.error is not None:
+            raise mutation.error
+        return mutation.result
+
+    def _commit(self, batch: List[_Mutation]) -> None:
+        try:
+            # The file lock comes first: while another process holds it, this
+            # thread waits without the in-process lock, so reads go on serving
+            # the copy in memory.
+            with self._file_lock(), self._lock:
+                self.load()
+                for mutation in batch:
+                    pending = len(self._pending)
+                    try:
+                        mutation.result = mutation.apply(self)
+                    except Exception as exc:
+                        mutation.error = exc
+                        if len(self._pending) != pending:
+                            raise
+                if self._pending:
+                    self.save()
+        except Exception as exc:
+            self.invalidate()
+            for mutation in batch:
+                if mutation.error is None:
+                    mutation.error = exc
+        finally:
+            for mutation in batch:
+                mutation.done.set()
+
+    def _needs_compaction(self) -> bool:
+        if self._journal_bytes >= self.compact_bytes:
+            return True
+        return (
+            self._journal_bytes >= MIN_RATIO_COMPACT_BYTES
+            and self._journal_bytes > self.compact_ratio * self._snapshot_bytes
+        )
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "json", "save")
+    def save(self) -> None:
+        """Persist pending mutations, as journal entries or as a new snapshot.
+
+        Call this through ``mutate``, which holds the locks it relies on.
+        """
+        try:
+            if self.journal:
+                self._append_journal()
+                if self._needs_compaction():
+                    self.compact()
+            else:
+                self._write_snapshot()
+        except Exception:
+            self.invalidate()
+            raise
+
+        self._pending = []
+        self._signature = self._file_signature()
+
+    def compact(self) -> None:
+        """Fold the journal into a fresh snapshot and drop it."""
+        self._write_snapshot()
+        try:
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        self._journal_bytes = 0
+        self._journal_tail = None
+        self._signature = self._file_signature()
+
+    def _append_journal(self) -> None:
+        if not self._pending:
+            return
+
+        Path(self.journal_path).parent.mkdir(parents=True, exist_ok=True)
+        lines = b"".join(codec.dumps(entry) + b"\n" for entry in self._pending)
+
+        with open(self.journal_path, "ab") as file:
+            if self._journal_tail is not None:
+                offset, prefix = self._journal_tail
+                file.truncate(offset)
+                lines = prefix + lines
+                self._journal_bytes = offset
+                self._journal_tail = None
+            file.write(lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+        self._journal_bytes += len(lines)
+        if metrics.ENABLED:
+            metrics.STORAGE_BYTES.inc("json", "written", amount=len(lines))
+
+    def _write_snapshot(self) -> None:
+        path = Path(self.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=str(path.parent), prefix=path.name + ".", suffix=".tmp"
+        )
+        try:
+            snapshot = {"version": self._version, "items": list(self._loaded().values())}
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(codec.encode_snapshot(snapshot, self.snapshot_format))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        self._snapshot_bytes = path.stat().st_size
+        if metrics.ENABLED:
+            metrics.STORAGE_BYTES.inc("json", "written", amount=self._snapshot_bytes)
@@ -1,7 +1,17 @@
 import argparse
-from typing import Iterable, Optional
+import csv
+import io
+import sys
+from collections import deque
+from contextlib import contextmanager
+from typing import IO, Any, Deque, Iterable, Iterator, Optional, Tuple
 
-from app import crud
+from app import codec, crud
+
+
+DEFAULT_BATCH_SIZE = 10000
+FORMATS = ("jsonl", "csv")
+EXPORT_FIELDS = ("id", "name", "description", "created_at", "updated_at")
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -14,6 +24,10 @@ def build_parser() -> argparse.ArgumentParser:
 
     subparsers.add_parser("list", help="List all items")
 
+    search_parser = subparsers.add_parser("search", help="Search item names and descriptions")
+    search_parser.add_argument("--query", required=True)
+    search_parser.add_argument("--limit", type=int)
+
     get_parser = subparsers.add_parser("get", help="Get an item by ID")
     get_parser.add_argument("--id", required=True)
 
@@ -25,6 +39,28 @@ def build_parser() -> argparse.ArgumentParser:
     delete_parser = subparsers.add_parser("delete", help="Delete an item")
     delete_parser.add_argument("--id", required=True)
 
+    import_parser = subparsers.add_parser(
+        "import", help="Create items from a JSONL or CSV file or stdin"
+    )
+    import_parser.add_argument("--file", default="-", help="Input path, or - for stdin")
+    import_parser.add_argument("--format", choices=FORMATS)
+    import_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    import_parser.add_argument(
+        "--quiet", action="store_true", help="Only report failed records"
+    )
+
+    export_parser = subparsers.add_parser(
+        "export", help="Write every item as JSONL or CSV to a file or stdout"
+    )
+    export_parser.add_argument(
+        "--file", default="-", help="Output path, or - for stdout"
+    )
+    export_parser.add_argument("--format", choices=FORMATS)
+
+    subparsers.add_parser(
+        "migrate-slugs", help="Backfill slugs for items stored before autocomplete"
+    )
+
     return parser
 
 
@@ -36,6 +72,143 @@ def _print_item(item) -> None:
         print(f"  updated: {item.updated_at}")
 
 
+def _format(path: str, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+@contextmanager
+def _open(path: str, mode: str, stdio: Any) -> Iterator[IO[bytes]]:
+    """Open ``path`` in binary ``mode``, or use ``stdio`` for ``-``."""
+    if path == "-":
+        yield stdio.buffer
+        return
+    with open(path, mode) as file:
+        yield file
+
+
+Record = Tuple[int, Any]
+
+
+def _read_jsonl(stream: IO[bytes]) -> Iterator[Record]:
+    """Yield ``(line number, record)``; unparseable lines give an error string."""
+    loads = codec.current().loads
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, loads(line)
+        except ValueError:
+            yield number, "Invalid JSON"
+
+
+def _read_csv(stream: IO[bytes]) -> Iterator[Record]:
+    """Yield ``(line number, row)`` for each row under the header line."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    finally:
+        # Leave the underlying stream open for the caller.
+        text.detach()
+
+
+def _report_failure(number: int, error: str) -> None:
+    print(f"line {number}: {error}", file=sys.stderr)
+
+
+def import_items(
+    records: Iterable[Record], batch_size: int, quiet: bool = False
+) -> Tuple[int, int]:
+    """Create items from ``(line number, record)`` pairs, a batch at a time.
+
+    Failed records are reported by line number as they are found. Returns the
+    number of items created and of records rejected.
+    """
+    created = failed = 0
+    numbers: Deque[int] = deque()
+
+    def parsed() -> Iterator[Any]:
+        nonlocal failed
+        for number, record in records:
+            if isinstance(record, str):
+                failed += 1
+                _report_failure(number, record)
+                continue
+            numbers.append(number)
+            yield record
+
+    # crud reads exactly one batch before yielding its results, so the line
+    # numbers of that batch are the ones at the front of the queue.
+    for results in crud.import_items(parsed(), batch_size):
+        for result in results:
+            number = numbers.popleft()
+            if result.ok:
+                created += 1
+            else:
+                failed += 1
+                _report_failure(number, result.error)
+        if not quiet:
+            # JSON imports only write after the last batch, so progress counts
+            # accepted records rather than stored ones.
+            print(f"{created} accepted, {failed} rejected so far", file=sys.stderr)
+    return created, failed
+
+
+def export_items(stream: IO[bytes], fmt: str) -> int:
+    """Write every item to ``stream`` and return how many were written.
+
+    Records are streamed from the store one at a time, so memory use does not
+    grow with the number of items.
+    """
+    count = 0
+    if fmt == "csv":
+        text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        writer.writerow(EXPORT_FIELDS)
+        for record in crud.iter_records():
+            writer.writerow([record.get(field) for field in EXPORT_FIELDS])
+            count += 1
+        # Leave the underlying stream open for the caller.
+        text.flush()
+        text.detach()
+        return count
+
+    dumps = codec.current().dumps
+    for record in crud.iter_records():
+        stream.write(dumps(record) + b"\n")
+        count += 1
+    stream.flush()
+    return count
+
+
+def _import(args: argparse.Namespace) -> int:
+    if args.batch_size < 1:
+        print("Error: --batch-size must be at least 1.")
+        return 1
+
+    fmt = _format(args.file, args.format)
+    with _open(args.file, "rb", sys.stdin) as stream:
+        records = _read_csv(stream) if fmt == "csv" else _read_jsonl(stream)
+        created, failed = import_items(records, args.batch_size, args.quiet)
+
+    print(f"Imported {created} items, {failed} failed")
+    return 1 if failed else 0
+
+
+def _export(args: argparse.Namespace) -> int:
+    fmt = _format(args.file, args.format)
+    with _open(args.file, "wb", sys.stdout) as stream:
+        count = export_items(stream, fmt)
+
+    # Keep stdout clean when it carries the export itself.
+    summary = sys.stderr if args.file == "-" else sys.stdout
+    print(f"Exported {count} items", file=summary)
+    return 0
+
+
 def main(argv: Optional[Iterable[str]] = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
@@ -56,6 +229,16 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
                 _print_item(item)
             return 0
 
+        if args.command == "search":
+            items = crud.search_items(args.query, args.limit)
+            if not items:
+                print("No matching items.")
+                return 0
+
+            for item in items:
+                _print_item(item)
+            return 0
+
         if args.command == "get":
             item = crud.get_item_by_id(args.id)
             if item is None:
@@ -86,6 +269,16 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
             print(f"Deleted item {args.id}")
             return 0
 
+        if args.command == "import":
+            return _import(args)
+
+        if args.command == "export":
+            return _export(args)
+
+        if args.command == "migrate-slugs":
+            print(f"Backfilled {crud.migrate_slugs()} slugs")
+            return 0
+
     except ValueError as exc:
         print(f"Error: {exc}")
         return 1
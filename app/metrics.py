@@ -0,0 +1,325 @@
+"""Counters and latency histograms, served in Prometheus text format.
+
+Metrics are on unless ``CRUD_METRICS=0``. The setting is read once at import:
+when it is off, ``timed`` and ``operation`` hand back the undecorated function
+and every other hook is skipped behind ``if metrics.ENABLED``, so disabled
+metrics cost nothing on the request path. The wrappers stay in place while
+``app.profiling`` is on, since they also feed its per-request breakdown.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from app import profiling
+from app.config import env_flag
+
+F = TypeVar("F", bound=Callable[..., Any])
+Labels = Tuple[str, ...]
+
+ENABLED = env_flag("CRUD_METRICS", default=True)
+
+# Seconds; spans a cached read (tens of microseconds) to a slow remote call.
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+_REGISTRY: List["_Metric"] = []
+# Cache name -> a function returning its stats() dict, or None while unused.
+_CACHES: Dict[str, Callable[[], Optional[Dict[str, Any]]]] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, label_names: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        _REGISTRY.append(self)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A total that only goes up, per combination of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: Iterable[str] = ()):
+        super().__init__(name, help, label_names)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {value}"
+
+
+class Histogram(_Metric):
+    """Observations counted into latency buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, label_names)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series: Dict[Labels, List[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            snapshot = sorted(
+                (labels, list(series[0]), series[1], series[2])
+                for labels, series in self._series.items()
+            )
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(
+                    self.label_names + ("le",), labels + (_format_value(bound),)
+                )
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            label_text = _format_labels(self.label_names, labels)
+            yield f"{self.name}_sum{label_text} {total!r}"
+            yield f"{self.name}_count{label_text} {count}"
+
+
+class Callback(_Metric):
+    """Values read from elsewhere (such as a cache's counters) at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        kind: str,
+        label_names: Iterable[str],
+        collect: Callable[[], Iterable[Tuple[Labels, float]]],
+    ):
+        super().__init__(name, help, label_names)
+        self.kind = kind
+        self._collect = collect
+
+    def _samples(self) -> Iterator[str]:
+        for labels, value in self._collect():
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {value}"
+
+
+def timed(
+    histogram: Histogram, *labels: str, phase: Optional[str] = None
+) -> Callable[[F], F]:
+    """Decorate a function to observe how long each call takes.
+
+    With ``phase``, the time is also charged to that phase of the request
+    being profiled.
+    """
+
+    def decorate(func: F) -> F:
+        if not ENABLED and not (phase and profiling.ENABLED):
+            return func
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                if ENABLED:
+                    histogram.observe(elapsed, *labels)
+                if phase is not None and profiling.ENABLED:
+                    profiling.add(phase, elapsed)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def operation(func: F) -> F:
+    """Time a CRUD operation under its function name and count its errors.
+
+    The time is charged to the ``storage`` phase of a profiled request.
+    """
+    if not ENABLED and not profiling.ENABLED:
+        return func
+
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            if ENABLED:
+                OPERATION_ERRORS.inc(name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if ENABLED:
+                OPERATION_SECONDS.observe(elapsed, name)
+            if profiling.ENABLED:
+                profiling.add("storage", elapsed)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def register_cache(name: str, stats: Callable[[], Optional[Dict[str, Any]]]) -> None:
+    """Export a cache's ``stats()`` counters under ``cache="<name>"``."""
+    _CACHES[name] = stats
+
+
+def _cache_stat(field: str) -> Callable[[], Iterator[Tuple[Labels, float]]]:
+    def collect() -> Iterator[Tuple[Labels, float]]:
+        for name, stats in sorted(_CACHES.items()):
+            values = stats()
+            if values is not None:
+                yield (name,), values[field]
+
+    return collect
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+OPERATION_SECONDS = Histogram(
+    "crud_operation_seconds", "Time spent in each app.crud operation.", ("operation",)
+)
+OPERATION_ERRORS = Counter(
+    "crud_operation_errors_total",
+    "app.crud operations that raised an exception.",
+    ("operation",),
+)
+STORAGE_SECONDS = Histogram(
+    "crud_storage_seconds",
+    "Time spent in storage primitives such as loading or saving the JSON file.",
+    ("backend", "primitive"),
+)
+STORAGE_BYTES = Counter(
+    "crud_storage_bytes_total",
+    "Bytes read from or written to storage files.",
+    ("backend", "direction"),
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "crud_mongodb_command_seconds",
+    "Round-trip time of MongoDB commands, as reported by the driver.",
+    ("command",),
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "crud_mongodb_command_failures_total", "MongoDB commands that failed.", ("command",)
+)
+STEP_SECONDS = Histogram(
+    "crud_step_seconds",
+    "Time spent validating input and serializing responses.",
+    ("step",),
+)
+HTTP_REQUESTS = Counter(
+    "crud_http_requests_total",
+    "API requests by method, route and status.",
+    ("method", "route", "status"),
+)
+HTTP_SECONDS = Histogram(
+    "crud_http_request_seconds",
+    "Time to produce an API response, before any streamed body is sent.",
+    ("method", "route"),
+)
+HTTP_RESPONSE_BYTES = Counter(
+    "crud_http_response_bytes_total",
+    "Bytes of non-streamed API response bodies.",
+    ("route",),
+)
+
+for _field, _kind, _help in (
+    ("hits", "counter", "Cache lookups that were served from the cache."),
+    ("misses", "counter", "Cache lookups that fell through to storage."),
+    ("evictions", "counter", "Cache entries evicted to stay within the limit."),
+    ("entries", "gauge", "Entries currently cached."),
+    ("hit_ratio", "gauge", "Hits as a fraction of all cache lookups."),
+):
+    _suffix = "_total" if _kind == "counter" else ""
+    Callback(
+        f"crud_cache_{_field}{_suffix}", _help, _kind, ("cache",), _cache_stat(_field)
+    )
@@ -3,9 +3,12 @@ from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Item:
-    """A single item managed by the CRUD app."""
+    """A single item managed by the CRUD app.
+
+    Slotted, so an instance carries no per-instance ``__dict__``.
+    """
 
     id: str
     name: str
@@ -40,3 +43,17 @@ class Item:
             "created_at": self.created_at,
             "updated_at": self.updated_at,
         }
+
+
+@dataclass(slots=True)
+class BatchResult:
+    """Outcome of one record in a bulk create, update or delete."""
+
+    id: Optional[str] = None
+    item: Optional[Item] = None
+    error: Optional[str] = None
+    not_found: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
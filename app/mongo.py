@@ -0,0 +1,336 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from app import metrics
+from app.cache import TTLCache
+from app.config import env_flag
+from app.utils import generate_slug
+
+
+_CLIENT = None
+_COLLECTION = None
+_INDEXES_READY = False
+_ITEM_CACHE: Optional[TTLCache] = None
+_WATCHER: Optional[threading.Thread] = None
+_WATCH_ERROR: Optional[str] = None
+_LOCK = threading.Lock()
+
+DEFAULT_CACHE_TTL = 30.0
+# Documents updated per bulk write when backfilling slugs.
+SLUG_BATCH_SIZE = 1000
+
+# Environment variable -> (MongoClient option, type). Anything left unset keeps
+# the driver default, except the server selection timeout, which stays short so
+# a misconfigured URI fails fast.
+_POOL_SETTINGS = {
+    "CRUD_MONGODB_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "CRUD_MONGODB_MIN_POOL_SIZE": ("minPoolSize", int),
+    "CRUD_MONGODB_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "CRUD_MONGODB_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "CRUD_MONGODB_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    "CRUD_MONGODB_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "CRUD_MONGODB_SOCKET_TIMEOUT_MS": ("socketTimeoutMS", int),
+    "CRUD_MONGODB_READ_PREFERENCE": ("readPreference", str),
+}
+
+
+def uri() -> Optional[str]:
+    return os.environ.get("MONGODB_URI") or os.environ.get("CRUD_MONGODB_URI")
+
+
+def _setting(variable: str, kind: type, default: Any) -> Any:
+    value = os.environ.get(variable)
+    if not value:
+        return default
+    try:
+        return kind(value)
+    except ValueError:
+        raise RuntimeError(f"{variable} must be {kind.__name__}") from None
+
+
+def client_options() -> Dict[str, Any]:
+    """Build MongoClient keyword arguments from the environment."""
+    options: Dict[str, Any] = {"serverSelectionTimeoutMS": 5000}
+    for variable, (option, kind) in _POOL_SETTINGS.items():
+        value = _setting(variable, kind, None)
+        if value is not None:
+            options[option] = value
+    return options
+
+
+def _import_pymongo():
+    try:
+        import pymongo
+    except ImportError as exc:
+        raise RuntimeError(
+            "MongoDB storage requires pymongo. Run `pip install -r requirements.txt`."
+        ) from exc
+    return pymongo
+
+
+def get_client():
+    """Return the process-wide MongoClient, creating it on first use."""
+    global _CLIENT
+
+    if _CLIENT is None:
+        pymongo = _import_pymongo()
+        with _LOCK:
+            if _CLIENT is None:
+                options = client_options()
+                if metrics.ENABLED:
+                    options["event_listeners"] = [_command_timer()]
+                _CLIENT = pymongo.MongoClient(uri(), **options)
+    return _CLIENT
+
+
+def _command_timer():
+    """A driver listener that records how long each MongoDB command takes."""
+    from pymongo import monitoring
+
+    class CommandTimer(monitoring.CommandListener):
+        def started(self, event) -> None:
+            pass
+
+        def succeeded(self, event) -> None:
+            metrics.MONGO_COMMAND_SECONDS.observe(
+                event.duration_micros / 1e6, event.command_name
+            )
+
+        def failed(self, event) -> None:
+            metrics.MONGO_COMMAND_SECONDS.observe(
+                event.duration_micros / 1e6, event.command_name
+            )
+            metrics.MONGO_COMMAND_FAILURES.inc(event.command_name)
+
+    return CommandTimer()
+
+
+def _database(client):
+    database_name = os.environ.get("MONGODB_DATABASE") or os.environ.get(
+        "CRUD_MONGODB_DATABASE"
+    )
+    if database_name:
+        return client[database_name]
+
+    from pymongo.errors import ConfigurationError
+
+    try:
+        return client.get_default_database()
+    except ConfigurationError:
+        return client["crud_app"]
+
+
+# name -> (keys, options) for every index the CRUD queries rely on.
+_INDEXES = {
+    "created_at_1": ([("created_at", 1)], {}),
+    "created_at_1__id_1": ([("created_at", 1), ("_id", 1)], {}),
+    "items_text": (
+        [("name", "text"), ("description", "text")],
+        {"weights": {"name": 10, "description": 1}},
+    ),
+    "slug_1__id_1": ([("slug", 1), ("_id", 1)], {}),
+}
+
+
+def ensure_indexes(collection) -> None:
+    """Create the indexes the CRUD queries rely on.
+
+    Existing indexes are listed first, so on a cold start against a prepared
+    database this costs one round trip instead of one per index.
+    """
+    existing = collection.index_information()
+    for name, (keys, options) in _INDEXES.items():
+        if name not in existing:
+            collection.create_index(keys, name=name, **options)
+
+
+def backfill_slugs(collection) -> int:
+    """Give items stored before autocomplete existed their slug.
+
+    Returns how many documents were updated. Slugs are computed per name in
+    Python, so missing documents are read and written back in bulk batches.
+    This is a one-off migration, run by ``python -m app.main migrate-slugs``.
+    """
+    updated = 0
+    batch = []
+    for document in collection.find({"slug": {"$exists": False}}, {"name": 1}):
+        batch.append((document["_id"], generate_slug(document.get("name", ""))))
+        if len(batch) >= SLUG_BATCH_SIZE:
+            updated += _write_slugs(collection, batch)
+            batch = []
+    if batch:
+        updated += _write_slugs(collection, batch)
+    return updated
+
+
+def _write_slugs(collection, slugs) -> int:
+    from pymongo import UpdateOne
+
+    collection.bulk_write(
+        [
+            UpdateOne({"_id": item_id}, {"$set": {"slug": slug}})
+            for item_id, slug in slugs
+        ],
+        ordered=False,
+    )
+    return len(slugs)
+
+
+def get_collection():
+    """Return the cached items collection, ensuring indexes once per process.
+
+    Set ``CRUD_MONGODB_ENSURE_INDEXES=0`` when the indexes are managed outside
+    the app and the startup round trips should be skipped entirely.
+    """
+    global _COLLECTION, _INDEXES_READY
+
+    collection = _COLLECTION
+    if collection is not None:
+        return collection
+
+    client = get_client()
+    with _LOCK:
+        if _COLLECTION is None:
+            collection = _database(client)["items"]
+            ensure = env_flag("CRUD_MONGODB_ENSURE_INDEXES", default=True)
+            if not _INDEXES_READY and ensure:
+                ensure_indexes(collection)
+            _INDEXES_READY = True
+            _COLLECTION = collection
+    return _COLLECTION
+
+
+def get_meta_collection():
+    """Return the collection holding the store version document."""
+    return _database(get_client())["meta"]
+
+
+def item_cache() -> Optional[TTLCache]:
+    """Return the read-through cache of item documents, or None if it is off.
+
+    ``CRUD_MONGODB_CACHE_SIZE`` turns it on and caps the number of documents;
+    ``CRUD_MONGODB_CACHE_TTL`` is how many seconds a document may be served
+    before it is read again. Local writes drop their documents at once. With
+    ``CRUD_MONGODB_CACHE_WATCH=1`` a change stream also drops documents changed
+    by other processes, where the deployment supports change streams.
+    """
+    cache = _configured_cache()
+    if cache is None:
+        return None
+    if _WATCHER is None and env_flag("CRUD_MONGODB_CACHE_WATCH"):
+        _start_watcher(cache)
+    return cache
+
+
+def _item_cache_stats() -> Optional[Dict[str, Any]]:
+    cache = _ITEM_CACHE
+    return cache.stats() if cache is not None else None
+
+
+metrics.register_cache("mongodb_items", _item_cache_stats)
+
+
+def _configured_cache() -> Optional[TTLCache]:
+    global _ITEM_CACHE
+
+    size = _setting("CRUD_MONGODB_CACHE_SIZE", int, 0)
+    if size <= 0:
+        return None
+
+    if _ITEM_CACHE is None:
+        ttl = _setting("CRUD_MONGODB_CACHE_TTL", float, DEFAULT_CACHE_TTL)
+        with _LOCK:
+            if _ITEM_CACHE is None:
+                _ITEM_CACHE = TTLCache(size, ttl)
+    return _ITEM_CACHE
+
+
+def _start_watcher(cache: TTLCache) -> None:
+    global _WATCHER
+
+    with _LOCK:
+        if _WATCHER is not None:
+            return
+        _WATCHER = threading.Thread(
+            target=_watch_changes, args=(cache,), name="mongo-cache-watch", daemon=True
+        )
+    _WATCHER.start()
+
+
+def _watch_changes(cache: TTLCache) -> None:
+    """Drop cached documents as the change stream reports writes to them."""
+    global _WATCH_ERROR
+
+    try:
+        with get_collection().watch() as stream:
+            # Anything written before the stream opened was missed.
+            cache.clear()
+            for change in stream:
+                document_key = change.get("documentKey")
+                if document_key:
+                    cache.discard(document_key["_id"])
+                else:
+                    # drop, rename and invalidate events affect every document
+                    cache.clear()
+    except Exception as exc:
+        # Standalone servers have no change streams; the TTL still bounds how
+        # stale a document written elsewhere can be.
+        _WATCH_ERROR = str(exc)
+
+
+def warm_up() -> None:
+    """Connect, ensure indexes and check the server, so the first request does not.
+
+    The driver fills the pool up to ``minPoolSize`` in the background once the
+    client has connected.
+    """
+    get_collection()
+    get_client().admin.command("ping")
+
+
+def reset(close: bool = True) -> None:
+    """Forget the cached client and collection so the next call reconnects.
+
+    MongoClient is not fork-safe, so a forked child must call this with
+    ``close=False`` before its first query: it then opens its own connections and
+    leaves the parent's sockets alone. Indexes are server-side and stay ensured.
+    """
+    global _CLIENT, _COLLECTION, _WATCHER
+
+    with _LOCK:
+        client = _CLIENT
+        _CLIENT = None
+        _COLLECTION = None
+        # The change stream belonged to the old client (and is not running at
+        # all in a forked child), so writes may have been missed.
+        _WATCHER = None
+        if _ITEM_CACHE is not None:
+            _ITEM_CACHE.clear()
+    if client is not None and close:
+        client.close()
+
+
+def status() -> Dict[str, Any]:
+    options = client_options()
+    result = {
+        "connected": _CLIENT is not None,
+        "indexes_ready": _INDEXES_READY,
+        "pool": {
+            option: value
+            for option, value in options.items()
+            if option != "readPreference"
+        },
+        "read_preference": options.get("readPreference", "primary"),
+    }
+
+    cache = _configured_cache()
+    if cache is not None:
+        watcher = _WATCHER
+        result["item_cache"] = {
+            **cache.stats(),
+            "watching": watcher is not None and watcher.is_alive(),
+        }
+        if _WATCH_ERROR:
+            result["item_cache"]["watch_error"] = _WATCH_ERROR
+    return result
@@ -0,0 +1,140 @@
+"""Opt-in request profiling and ``Server-Timing`` breakdowns.
+
+- ``CRUD_PROFILE=1`` profiles every request with cProfile.
+- ``CRUD_PROFILE_SAMPLE=0.01`` profiles that fraction of requests instead.
+- ``CRUD_PROFILE_DIR`` is where profiles are written (default
+  ``<tempdir>/crud-profiles``).
+- ``CRUD_SERVER_TIMING=1`` adds the header without writing any profiles.
+
+When any of these is set, every response carries a ``Server-Timing`` header
+with the time spent in storage (``app.crud`` calls), serialization, and in
+total. Each profiled request leaves a ``.prof`` file for ``pstats`` or
+snakeviz, and a ``.txt`` file with the breakdown and the slowest functions.
+The settings are read once at import, and with none of them set nothing here
+runs.
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.config import env_flag
+
+
+T = TypeVar("T")
+
+PHASES = ("storage", "serialize")
+# Functions listed in each text report, by cumulative time.
+TOP_FUNCTIONS = 40
+
+
+def _sample_rate() -> float:
+    if env_flag("CRUD_PROFILE"):
+        return 1.0
+    value = os.environ.get("CRUD_PROFILE_SAMPLE")
+    if not value:
+        return 0.0
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except ValueError:
+        raise RuntimeError("CRUD_PROFILE_SAMPLE must be a number") from None
+
+
+SAMPLE_RATE = _sample_rate()
+PROFILE_DIR = os.environ.get("CRUD_PROFILE_DIR") or str(
+    Path(tempfile.gettempdir()) / "crud-profiles"
+)
+ENABLED = SAMPLE_RATE > 0 or env_flag("CRUD_SERVER_TIMING")
+
+_PHASES: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "crud_request_phases", default=None
+)
+# Only one cProfile profiler may run at a time; other requests go unprofiled.
+_PROFILER_LOCK = threading.Lock()
+
+
+def add(phase: str, seconds: float) -> None:
+    """Charge ``seconds`` to ``phase`` of the request being measured, if any."""
+    phases = _PHASES.get()
+    if phases is not None:
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+
+def sampled() -> bool:
+    """Whether to profile the next request."""
+    return SAMPLE_RATE >= 1.0 or random.random() < SAMPLE_RATE
+
+
+def measure(
+    call: Callable[[], T], label: str, profile: bool = False
+) -> Tuple[T, Dict[str, float]]:
+    """Run ``call`` and return its result with seconds spent in each phase.
+
+    With ``profile``, the call also runs under cProfile and the profile is
+    written to ``PROFILE_DIR``.
+    """
+    phases = dict.fromkeys(PHASES, 0.0)
+    token = _PHASES.set(phases)
+    profiler = _start_profiler() if profile else None
+    started = time.perf_counter()
+    try:
+        result = call()
+    finally:
+        phases["total"] = time.perf_counter() - started
+        if profiler is not None:
+            profiler.disable()
+            _PROFILER_LOCK.release()
+        _PHASES.reset(token)
+
+    if profiler is not None:
+        try:
+            write_profile(profiler, label, phases)
+        except OSError as exc:
+            # A full or read-only disk must not fail the request it measured.
+            print(f"Could not write profile: {exc}", file=sys.stderr)
+    return result, phases
+
+
+def _start_profiler() -> Any:
+    if not _PROFILER_LOCK.acquire(blocking=False):
+        return None
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def server_timing(phases: Dict[str, float]) -> str:
+    """Format phases as a ``Server-Timing`` header value in milliseconds."""
+    return ", ".join(
+        f"{name};dur={seconds * 1000:.3f}" for name, seconds in phases.items()
+    )
+
+
+def write_profile(profiler: Any, label: str, phases: Dict[str, float]) -> str:
+    """Write ``<base>.prof`` and ``<base>.txt`` for one request; return ``<base>``."""
+    import pstats
+
+    directory = Path(PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-")[:80]
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    base = str(directory / f"{stamp}-{slug}-{os.getpid()}-{time.perf_counter_ns()}")
+
+    profiler.dump_stats(base + ".prof")
+    with open(base + ".txt", "w", encoding="utf-8") as file:
+        file.write(f"{label}\n")
+        for name, seconds in phases.items():
+            file.write(f"{name:>10}: {seconds * 1000:9.3f} ms\n")
+        file.write("\n")
+        stats = pstats.Stats(profiler, stream=file)
+        stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    return base
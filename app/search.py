@@ -0,0 +1,198 @@
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.utils import generate_slug
+
+
+NAME = 1
+DESCRIPTION = 2
+
+GRAM_SIZE = 3
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def _grams(token: str) -> Set[str]:
+    return {token[i : i + GRAM_SIZE] for i in range(len(token) - GRAM_SIZE + 1)}
+
+
+class SearchIndex:
+    """Inverted index over item names and descriptions with substring matching.
+
+    Each token maps to the items containing it, tagged with the fields it was
+    seen in. A second index from trigrams to tokens finds every token that
+    contains a query term without scanning the items. Terms shorter than a
+    trigram fall back to scanning the vocabulary, which is far smaller than the
+    store.
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._grams: Dict[str, Set[str]] = {}
+        self._documents: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, item_id: str, name: str, description: str) -> None:
+        """Index an item, replacing whatever was indexed for it before."""
+        self.remove(item_id)
+
+        fields: Dict[str, int] = {}
+        for token in tokenize(name):
+            fields[token] = fields.get(token, 0) | NAME
+        for token in tokenize(description):
+            fields[token] = fields.get(token, 0) | DESCRIPTION
+
+        for token, mask in fields.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                for gram in _grams(token):
+                    self._grams.setdefault(gram, set()).add(token)
+            postings[item_id] = mask
+
+        self._documents[item_id] = fields
+
+    def remove(self, item_id: str) -> None:
+        fields = self._documents.pop(item_id, None)
+        if not fields:
+            return
+
+        for token in fields:
+            postings = self._postings[token]
+            postings.pop(item_id, None)
+            if postings:
+                continue
+
+            del self._postings[token]
+            for gram in _grams(token):
+                tokens = self._grams[gram]
+                tokens.discard(token)
+                if not tokens:
+                    del self._grams[gram]
+
+    def _tokens_containing(self, term: str) -> Iterable[str]:
+        if len(term) < GRAM_SIZE:
+            return [token for token in self._postings if term in token]
+
+        # Intersect the rarest trigrams first so the candidate set shrinks fast.
+        grams = sorted(_grams(term), key=lambda gram: len(self._grams.get(gram, ())))
+        candidates: Optional[Set[str]] = None
+        for gram in grams:
+            tokens = self._grams.get(gram)
+            if not tokens:
+                return []
+            candidates = set(tokens) if candidates is None else candidates & tokens
+            if not candidates:
+                return []
+
+        # Sharing every trigram does not guarantee the grams are contiguous.
+        return [token for token in candidates if term in token]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """Return IDs of items matching every query term, best matches first.
+
+        A term matches any token it is a substring of. A hit in the name outranks
+        a hit in the description, and a whole-word hit outranks a partial one.
+        """
+        scores: Optional[Dict[str, int]] = None
+
+        for term in dict.fromkeys(tokenize(query)):
+            term_scores: Dict[str, int] = {}
+            for token in self._tokens_containing(term):
+                exact = 1 if token == term else 0
+                for item_id, mask in self._postings[token].items():
+                    if scores is not None and item_id not in scores:
+                        continue
+                    if mask & NAME:
+                        score = 10 + (1 if mask & DESCRIPTION else 0) + exact * 5
+                    else:
+                        score = 1 + exact
+                    if score > term_scores.get(item_id, 0):
+                        term_scores[item_id] = score
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    item_id: scores[item_id] + score
+                    for item_id, score in term_scores.items()
+                }
+            if not scores:
+                return []
+
+        if not scores:
+            return []
+
+        ranked = sorted(scores, key=lambda item_id: (-scores[item_id], item_id))
+        return ranked if limit is None else ranked[:limit]
+
+
+class SlugIndex:
+    """Item IDs sorted by the slug of their name, for prefix lookups.
+
+    A lookup is a binary search to the first slug with the prefix followed by a
+    walk over the next ``limit`` entries.
+    """
+
+    def __init__(self) -> None:
+        self._entries: List[Tuple[str, str]] = []
+        self._slugs: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._slugs)
+
+    @classmethod
+    def build(cls, names: Iterable[Tuple[str, str]]) -> "SlugIndex":
+        """Build an index from ``(item_id, name)`` pairs with a single sort."""
+        index = cls()
+        index._slugs = {item_id: generate_slug(name) for item_id, name in names}
+        index._entries = sorted(
+            (slug, item_id) for item_id, slug in index._slugs.items()
+        )
+        return index
+
+    def add(self, item_id: str, name: str) -> None:
+        """Index an item's name, moving it if the item was renamed."""
+        slug = generate_slug(name)
+        previous = self._slugs.get(item_id)
+        if previous == slug:
+            return
+        if previous is not None:
+            self._discard(previous, item_id)
+
+        insort(self._entries, (slug, item_id))
+        self._slugs[item_id] = slug
+
+    def remove(self, item_id: str) -> None:
+        slug = self._slugs.pop(item_id, None)
+        if slug is not None:
+            self._discard(slug, item_id)
+
+    def _discard(self, slug: str, item_id: str) -> None:
+        index = bisect_left(self._entries, (slug, item_id))
+        if index < len(self._entries) and self._entries[index] == (slug, item_id):
+            del self._entries[index]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[str]:
+        """Return IDs of up to ``limit`` items whose slug starts with ``prefix``."""
+        prefix = generate_slug(prefix)
+        if not prefix:
+            return []
+
+        matches = []
+        index = bisect_left(self._entries, (prefix, ""))
+        while index < len(self._entries) and len(matches) < limit:
+            slug, item_id = self._entries[index]
+            if not slug.startswith(prefix):
+                break
+            matches.append(item_id)
+            index += 1
+        return matches
@@ -0,0 +1,530 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app import metrics
+from app.search import GRAM_SIZE, tokenize
+from app.utils import generate_slug
+
+
+_COLUMNS = ("id", "name", "description", "created_at", "updated_at")
+
+# Current time in milliseconds; julianday() works on every SQLite version,
+# unlike unixepoch().
+_NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+
+# ``seq`` is an explicit INTEGER PRIMARY KEY, so the search index's row keys
+# survive VACUUM, which may renumber an implicit rowid.
+_CREATE_ITEMS = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        seq INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        name TEXT NOT NULL,
+        description TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT,
+        slug TEXT
+    )
+    """
+
+_SCHEMA = (
+    _CREATE_ITEMS.format(table="items"),
+    # The composite index serves both created_at lookups and keyset pages.
+    "DROP INDEX IF EXISTS items_created_at",
+    "CREATE INDEX IF NOT EXISTS items_created_at_id ON items (created_at, id)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    # Keep the item count up to date so totals never need a full COUNT(*).
+    """
+    CREATE TRIGGER IF NOT EXISTS items_count_insert AFTER INSERT ON items BEGIN
+        UPDATE meta SET value = value + 1 WHERE key = 'item_count';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_count_delete AFTER DELETE ON items BEGIN
+        UPDATE meta SET value = value - 1 WHERE key = 'item_count';
+    END
+    """,
+    # Every change bumps the store version and records when it happened, in
+    # milliseconds since the epoch, for conditional requests.
+    *(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS items_version_{event.lower()}
+        AFTER {event} ON items BEGIN
+            UPDATE meta SET value = value + 1 WHERE key = 'version';
+            UPDATE meta SET value = {_NOW_MS} WHERE key = 'modified_at';
+        END
+        """
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ),
+)
+
+# Full-text search over an external-content FTS5 table with the trigram
+# tokenizer, which matches substrings of three or more characters. Triggers keep
+# it in step with the items table.
+_FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE items_fts USING fts5(
+        name, description, content='items', content_rowid='seq', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER items_fts_insert AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts (rowid, name, description)
+        VALUES (new.seq, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER items_fts_delete AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name, description)
+        VALUES ('delete', old.seq, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER items_fts_update AFTER UPDATE OF name, description ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name, description)
+        VALUES ('delete', old.seq, old.name, old.description);
+        INSERT INTO items_fts (rowid, name, description)
+        VALUES (new.seq, new.name, new.description);
+    END
+    """,
+    "INSERT INTO items_fts (items_fts) VALUES ('rebuild')",
+)
+
+_SELECT_COLUMNS = (
+    "SELECT items.id, items.name, items.description, items.created_at, "
+    "items.updated_at"
+)
+_LIKE_CONDITION = (
+    "(items.name LIKE ? ESCAPE '\\' OR items.description LIKE ? ESCAPE '\\')"
+)
+
+# Statements are kept as constants so sqlite3's per-connection statement cache
+# reuses the prepared form instead of compiling them on every call.
+_SELECT_ONE = (
+    "SELECT id, name, description, created_at, updated_at FROM items WHERE id = ?"
+)
+_SELECT_ALL = (
+    "SELECT id, name, description, created_at, updated_at FROM items "
+    "ORDER BY seq LIMIT ? OFFSET ?"
+)
+_SELECT_BATCH = (
+    "SELECT seq, id, name, description, created_at, updated_at FROM items "
+    "WHERE seq > ? ORDER BY seq LIMIT ?"
+)
+_SELECT_PAGE = (
+    "SELECT id, name, description, created_at, updated_at FROM items "
+    "ORDER BY created_at, id LIMIT ?"
+)
+_SELECT_PAGE_AFTER = (
+    "SELECT id, name, description, created_at, updated_at FROM items "
+    "WHERE (created_at, id) > (?, ?) ORDER BY created_at, id LIMIT ?"
+)
+_SELECT_COUNT = "SELECT value FROM meta WHERE key = 'item_count'"
+_SELECT_VERSION = "SELECT key, value FROM meta WHERE key IN ('version', 'modified_at')"
+_SELECT_SLUG_RANGE = (
+    "SELECT id, name, description, created_at, updated_at FROM items "
+    "WHERE slug >= ? AND slug < ? ORDER BY slug, id LIMIT ?"
+)
+_INSERT = (
+    "INSERT INTO items (id, name, description, created_at, updated_at, slug) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_UPDATE = (
+    "UPDATE items SET name = ?, description = ?, updated_at = ?, slug = ? "
+    "WHERE id = ?"
+)
+_UPDATE_IF_VERSION = (
+    "UPDATE items SET name = ?, description = ?, updated_at = ?, slug = ? "
+    "WHERE id = ? AND COALESCE(updated_at, created_at) = ?"
+)
+_DELETE = "DELETE FROM items WHERE id = ?"
+
+# Per-row insert triggers that a bulk import replaces with one statement each.
+_SELECT_INSERT_TRIGGERS = (
+    "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN "
+    "('items_count_insert', 'items_version_insert', 'items_fts_insert')"
+)
+_INDEX_ROWS_AFTER = (
+    "INSERT INTO items_fts (rowid, name, description) "
+    "SELECT seq, name, description FROM items WHERE seq > ?"
+)
+# Rebuilds a table from before ``seq`` existed, keeping every row's rowid.
+_REBUILD_ITEMS = (
+    _CREATE_ITEMS.format(table="items_rebuilt"),
+    "INSERT INTO items_rebuilt (seq, id, name, description, created_at, "
+    "updated_at, slug) SELECT rowid, id, name, description, created_at, "
+    "updated_at, slug FROM items",
+    "DROP TABLE items",
+    "ALTER TABLE items_rebuilt RENAME TO items",
+)
+# Page cache for a bulk import, in KiB; the default 2 MiB thrashes on the
+# indexes once a table holds a few hundred thousand rows.
+BULK_CACHE_KIB = 256 * 1024
+
+
+def _record(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    return dict(zip(_COLUMNS, row))
+
+
+def _insert_row(record: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(record[column] for column in _COLUMNS) + (
+        generate_slug(record["name"]),
+    )
+
+
+class SqliteStore:
+    """Item storage in an SQLite database running in WAL mode.
+
+    Each thread gets its own connection, opened on first use and reused for the
+    life of the thread. WAL lets readers proceed while a writer commits.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self.full_text = False
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+            connection = sqlite3.connect(self.path, timeout=30, cached_statements=64)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._ensure_schema(connection)
+            self._local.connection = connection
+        return connection
+
+    def _ensure_schema(self, connection: sqlite3.Connection) -> None:
+        # One write transaction, so two processes opening a fresh database cannot
+        # both seed the item counter or build the search index.
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self._ensure_slugs(connection)
+            self._ensure_seq(connection)
+            if connection.execute(_SELECT_COUNT).fetchone() is None:
+                connection.execute(
+                    "INSERT INTO meta (key, value) "
+                    "SELECT 'item_count', COUNT(*) FROM items"
+                )
+            connection.execute(
+                "INSERT OR IGNORE INTO meta (key, value) "
+                f"VALUES ('version', 0), ('modified_at', {_NOW_MS})"
+            )
+
+            exists = connection.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'items_fts'"
+            ).fetchone()
+            if not exists:
+                try:
+                    for statement in _FTS_SCHEMA:
+                        connection.execute(statement)
+                    exists = True
+                except sqlite3.OperationalError:
+                    # SQLite older than 3.34 has no trigram tokenizer; search
+                    # falls back to LIKE scans.
+                    exists = False
+            self.full_text = bool(exists)
+        except Exception:
+            connection.rollback()
+            raise
+        connection.commit()
+
+    @staticmethod
+    def _ensure_slugs(connection: sqlite3.Connection) -> None:
+        # Databases created before autocomplete existed lack the slug column.
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(items)")}
+        if "slug" not in columns:
+            connection.execute("ALTER TABLE items ADD COLUMN slug TEXT")
+            rows = connection.execute("SELECT rowid, name FROM items").fetchall()
+            connection.executemany(
+                "UPDATE items SET slug = ? WHERE rowid = ?",
+                [(generate_slug(name), rowid) for rowid, name in rows],
+            )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS items_slug_id ON items (slug, id)"
+        )
+
+    @staticmethod
+    def _ensure_seq(connection: sqlite3.Connection) -> None:
+        # Databases created before the seq column keyed the search index on the
+        # implicit rowid. Rebuild the table around an explicit key and drop the
+        # index, which is rebuilt against it below.
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(items)")}
+        if "seq" in columns:
+            return
+        connection.execute("DROP TABLE IF EXISTS items_fts")
+        for statement in _REBUILD_ITEMS:
+            connection.execute(statement)
+        # Dropping the old table took its indexes and triggers with it.
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS items_slug_id ON items (slug, id)"
+        )
+
+    def close(self) -> None:
+        """Close the calling thread's connection, if it has one."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "get")
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        row = self.connection().execute(_SELECT_ONE, (str(item_id),)).fetchone()
+        return _record(row) if row else None
+
+    def records(
+        self, limit: Optional[int] = None, offset: int = 0
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over records in insertion order, fetching rows as needed."""
+        # SQLite treats a negative LIMIT as "no limit".
+        rows = self.connection().execute(
+            _SELECT_ALL, (-1 if limit is None else limit, offset)
+        )
+        return (_record(row) for row in rows)
+
+    def iter_records(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Iterate over every record in insertion order, one batch at a time.
+
+        Each batch is a separate query on the calling thread's connection, so
+        the iterator may be resumed from another thread, and no read transaction
+        is held open between batches to stall WAL checkpoints.
+        """
+        last_seq = 0
+        while True:
+            rows = (
+                self.connection()
+                .execute(_SELECT_BATCH, (last_seq, batch_size))
+                .fetchall()
+            )
+            for row in rows:
+                yield _record(row[1:])
+            if len(rows) < batch_size:
+                return
+            last_seq = rows[-1][0]
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "insert")
+    def insert(self, record: Dict[str, Any]) -> None:
+        connection = self.connection()
+        with connection:
+            connection.execute(_INSERT, _insert_row(record))
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "page")
+    def page(
+        self, limit: int, after: Optional[Tuple[str, str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, str]]]:
+        """Return up to ``limit`` records ordered by ``(created_at, id)``.
+
+        Only records sorting after ``after`` are returned. The second value is
+        the key to resume from, or None when there are no more records.
+        """
+        # Fetch one extra row to learn whether another page exists.
+        if after is None:
+            parameters: Tuple[Any, ...] = (limit + 1,)
+            rows = self.connection().execute(_SELECT_PAGE, parameters).fetchall()
+        else:
+            parameters = (after[0], after[1], limit + 1)
+            rows = self.connection().execute(_SELECT_PAGE_AFTER, parameters).fetchall()
+
+        records = [_record(row) for row in rows[:limit]]
+        if len(rows) > limit:
+            return records, (records[-1]["created_at"], records[-1]["id"])
+        return records, None
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "search")
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return records matching every term of ``query``, best matches first.
+
+        Terms of three or more characters go through the trigram index and are
+        ranked with name matches weighted above description matches. Shorter
+        terms can only be checked with LIKE.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        long_terms = [term for term in terms if len(term) >= GRAM_SIZE]
+        short_terms = [term for term in terms if len(term) < GRAM_SIZE]
+        if not self.full_text:
+            long_terms, short_terms = [], terms
+
+        conditions = []
+        parameters: List[Any] = []
+        if long_terms:
+            # Tokens are word characters only, so quoting them is always safe.
+            conditions.append("items_fts MATCH ?")
+            parameters.append(" AND ".join(f'"{term}"' for term in long_terms))
+        for term in short_terms:
+            conditions.append(_LIKE_CONDITION)
+            pattern = "%" + term.replace("_", "\\_") + "%"
+            parameters.extend([pattern, pattern])
+
+        where = " AND ".join(conditions)
+        if long_terms:
+            sql = (
+                f"{_SELECT_COLUMNS} FROM items_fts "
+                f"JOIN items ON items.seq = items_fts.rowid WHERE {where} "
+                "ORDER BY bm25(items_fts, 10.0, 1.0) LIMIT ?"
+            )
+        else:
+            # Put items whose name holds the first term ahead of the rest.
+            sql = (
+                f"{_SELECT_COLUMNS} FROM items WHERE {where} "
+                "ORDER BY items.name LIKE ? ESCAPE '\\' DESC, items.seq LIMIT ?"
+            )
+            parameters.append(parameters[0])
+
+        parameters.append(-1 if limit is None else limit)
+        return [_record(row) for row in self.connection().execute(sql, parameters)]
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "suggest")
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` records whose name slug starts with ``prefix``."""
+        prefix = generate_slug(prefix)
+        if not prefix:
+            return []
+
+        # Slugs only hold [a-z0-9-], so bumping the last character gives the
+        # smallest string past every slug with this prefix.
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = self.connection().execute(_SELECT_SLUG_RANGE, (prefix, upper, limit))
+        return [_record(row) for row in rows]
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "count")
+    def count(self) -> int:
+        row = self.connection().execute(_SELECT_COUNT).fetchone()
+        return row[0] if row else 0
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "version")
+    def version(self) -> Tuple[int, Optional[str]]:
+        """Return the change counter and the ISO time of the last change."""
+        meta = dict(self.connection().execute(_SELECT_VERSION).fetchall())
+        modified_at = meta.get("modified_at")
+        if modified_at is not None:
+            modified_at = datetime.fromtimestamp(
+                modified_at / 1000, timezone.utc
+            ).isoformat()
+        return meta.get("version", 0), modified_at
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "insert_many")
+    def insert_many(self, records: List[Dict[str, Any]]) -> None:
+        """Insert several records in one transaction."""
+        connection = self.connection()
+        with connection:
+            connection.executemany(
+                _INSERT,
+                [_insert_row(record) for record in records],
+            )
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "bulk_insert")
+    def bulk_insert(self, records: List[Dict[str, Any]]) -> None:
+        """Insert one batch of a bulk import in its own transaction.
+
+        The per-row insert triggers are dropped inside the transaction and their
+        work is done once for the batch: the item count and version are bumped
+        by the number of rows, and the new rows are added to the search index
+        in a single statement. Other connections see nothing until the commit,
+        triggers included, and the write lock is held only for this batch.
+        """
+        if not records:
+            return
+
+        connection = self.connection()
+        previous_cache = connection.execute("PRAGMA cache_size").fetchone()[0]
+        connection.execute(f"PRAGMA cache_size = -{BULK_CACHE_KIB}")
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            triggers = connection.execute(_SELECT_INSERT_TRIGGERS).fetchall()
+            for name, _ in triggers:
+                connection.execute(f"DROP TRIGGER {name}")
+            last_seq = connection.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM items"
+            ).fetchone()[0]
+
+            connection.executemany(_INSERT, [_insert_row(record) for record in records])
+            connection.execute(
+                "UPDATE meta SET value = value + ? "
+                "WHERE key IN ('item_count', 'version')",
+                (len(records),),
+            )
+            connection.execute(
+                f"UPDATE meta SET value = {_NOW_MS} WHERE key = 'modified_at'"
+            )
+            if self.full_text:
+                connection.execute(_INDEX_ROWS_AFTER, (last_seq,))
+            for _, sql in triggers:
+                connection.execute(sql)
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            connection.execute(f"PRAGMA cache_size = {previous_cache}")
+        connection.commit()
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "update")
+    def update(
+        self, record: Dict[str, Any], expected_version: Optional[str] = None
+    ) -> bool:
+        """Update one record, optionally only if its version still matches.
+
+        The version is ``updated_at``, or ``created_at`` for a record that has
+        never been updated. Returns False when nothing was written.
+        """
+        if expected_version is None:
+            return self.update_many([record])[0]
+
+        connection = self.connection()
+        with connection:
+            cursor = connection.execute(
+                _UPDATE_IF_VERSION,
+                (
+                    record["name"],
+                    record["description"],
+                    record["updated_at"],
+                    generate_slug(record["name"]),
+                    record["id"],
+                    expected_version,
+                ),
+            )
+        return cursor.rowcount > 0
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "update_many")
+    def update_many(self, records: List[Dict[str, Any]]) -> List[bool]:
+        """Update several records in one transaction, reporting which ones existed."""
+        connection = self.connection()
+        updated = []
+        with connection:
+            for record in records:
+                cursor = connection.execute(
+                    _UPDATE,
+                    (
+                        record["name"],
+                        record["description"],
+                        record["updated_at"],
+                        generate_slug(record["name"]),
+                        record["id"],
+                    ),
+                )
+                updated.append(cursor.rowcount > 0)
+        return updated
+
+    def delete(self, item_id: str) -> bool:
+        return self.delete_many([item_id])[0]
+
+    @metrics.timed(metrics.STORAGE_SECONDS, "sqlite", "delete_many")
+    def delete_many(self, item_ids: List[str]) -> List[bool]:
+        """Delete several records in one transaction, reporting which ones existed."""
+        connection = self.connection()
+        deleted = []
+        with connection:
+            for item_id in item_ids:
+                cursor = connection.execute(_DELETE, (str(item_id),))
+                deleted.append(cursor.rowcount > 0)
+        return deleted
@@ -1,6 +1,9 @@
 from typing import Dict, Any, List, Optional
 import re
 
+from app import metrics
+
+@metrics.timed(metrics.STEP_SECONDS, "validate")
 def validate_item_data(data: Dict[str, Any]) -> List[str]:
     """
     Validate item data before creating or updating.
@@ -25,6 +28,26 @@ def validate_item_data(data: Dict[str, Any]) -> List[str]:
     
     return errors
 
+@metrics.timed(metrics.STEP_SECONDS, "validate")
+def validate_item_update(data: Dict[str, Any]) -> List[str]:
+    """
+    Validate only the fields present in a partial update.
+    Returns a list of error messages. Empty list means validation passed.
+    """
+    errors = []
+
+    if "name" in data:
+        if not isinstance(data["name"], str) or not data["name"].strip():
+            errors.append("Name cannot be empty")
+        elif len(data["name"]) > 100:
+            errors.append("Name must be less than 100 characters")
+
+    if "description" in data:
+        if not isinstance(data["description"], str) or not data["description"].strip():
+            errors.append("Description cannot be empty")
+
+    return errors
+
 def format_item_for_display(item_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Format an item dictionary for display (e.g., in an API response)."""
     # Create a copy to avoid modifying the original
@@ -0,0 +1,278 @@
+"""Measure what a cold start of the API costs.
+
+    python -m benchmarks.cold_start --runs 5 --backend json
+    python -m benchmarks.cold_start --no-bytecode --json
+    python -m benchmarks.cold_start --backend mongodb --mongodb-uri mongodb://localhost
+
+Every run starts a fresh interpreter, as a serverless cold start does. It
+imports the API's modules one at a time, then times the first requests, and
+then times the same requests again once the process is warm. Each figure is the
+median across runs, in milliseconds. With ``--no-bytecode`` the app's sources
+are compiled on every run, as on a read-only deployment shipped without
+``.pyc`` files; the standard library keeps its bytecode either way.
+
+The ``mongodb`` backend runs against ``--mongodb-uri`` when given, so the first
+requests include connecting and checking indexes. Without it each run seeds an
+in-memory mongomock database after the import timings, which needs mongomock
+installed and leaves out every network round trip.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SEED_ITEMS = 1000
+
+# In dependency order, so each figure is the cost that module adds on top of
+# the ones before it.
+MODULES = (
+    "app.codec",
+    "app.cache",
+    "app.models",
+    "app.mongo",
+    "app.crud",
+    "api.index",
+)
+
+# Runs in the fresh interpreter. It imports nothing beyond what the timings
+# need until they are taken, so its own imports do not hide the app's.
+_CHILD = """
+import importlib, sys, time
+
+timings = {}
+start = time.perf_counter()
+for name in sys.argv[1].split(","):
+    began = time.perf_counter()
+    importlib.import_module(name)
+    timings["import " + name] = time.perf_counter() - began
+timings["import total"] = time.perf_counter() - start
+
+if len(sys.argv) > 3:
+    # Store setup that has to happen in this process, after the imports are
+    # timed and before the first request.
+    exec(sys.argv[3])
+
+from api.index import Request, dispatch
+
+def request(target):
+    began = time.perf_counter()
+    response = dispatch(Request("GET", target))
+    if response.stream is not None:
+        for _ in response.stream:
+            pass
+    assert response.status == 200, (target, response.status)
+    return time.perf_counter() - began
+
+targets = {"get item": "/api/items/" + sys.argv[2], "list page": "/api/items?limit=100"}
+for label, target in targets.items():
+    timings["first " + label] = request(target)
+for label, target in targets.items():
+    timings["warm " + label] = request(target)
+
+import json
+print(json.dumps({key: value * 1000 for key, value in timings.items()}))
+"""
+
+
+# Child setup for the mongodb backend without a server: an in-memory database
+# seeded with documents shaped like the ones app.crud writes.
+_MONGOMOCK_SETUP = """
+from unittest import mock
+import mongomock
+from app import mongo
+
+database = mongomock.MongoClient()["crud_cold_start"]
+database["items"].insert_many(
+    {{
+        "_id": f"item-{{n}}",
+        "name": f"Item {{n}}",
+        "slug": f"item-{{n}}",
+        "description": "Seeded",
+        "created_at": "2024-01-01T00:00:00+00:00",
+    }}
+    for n in range({count})
+)
+mock.patch.object(mongo, "get_collection", return_value=database["items"]).start()
+mock.patch.object(mongo, "get_meta_collection", return_value=database["meta"]).start()
+"""
+MONGOMOCK_ITEM_ID = "item-0"
+
+
+def _copy_sources(target: str) -> None:
+    # A private copy, so bytecode written or skipped here never touches the tree.
+    for package in ("app", "api"):
+        shutil.copytree(
+            PROJECT_ROOT / package,
+            os.path.join(target, package),
+            ignore=shutil.ignore_patterns("__pycache__"),
+        )
+
+
+def _seed(env: Dict[str, str], count: int, cwd: str) -> str:
+    """Fill a fresh store in a separate process and return one item's ID."""
+    code = (
+        "from app import crud\n"
+        "records = [{'name': f'Item {n}', 'description': 'Seeded'}"
+        f" for n in range({count})]\n"
+        "print(crud.create_items(records)[0].id)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip()
+
+
+def _drop_database(env: Dict[str, str], cwd: str) -> None:
+    code = (
+        "import os\n"
+        "from app import mongo\n"
+        "mongo.get_client().drop_database(os.environ['MONGODB_DATABASE'])\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True)
+
+
+def _run_once(
+    env: Dict[str, str], item_id: str, cwd: str, setup: Optional[str] = None
+) -> Dict[str, float]:
+    arguments = [sys.executable, "-c", _CHILD, ",".join(MODULES), item_id]
+    if setup:
+        arguments.append(setup)
+    result = subprocess.run(
+        arguments,
+        cwd=cwd,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout)
+
+
+def measure(
+    runs: int = 5,
+    backend: str = "json",
+    bytecode: bool = True,
+    items: int = SEED_ITEMS,
+    mongodb_uri: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run the cold-start measurement and return median timings in ms."""
+    mongomock = backend == "mongodb" and not mongodb_uri
+    if mongomock and importlib.util.find_spec("mongomock") is None:
+        raise RuntimeError("the mongodb backend needs --mongodb-uri or mongomock")
+
+    work_dir = tempfile.mkdtemp(prefix="crud-cold-start-")
+    source_dir = os.path.join(work_dir, "src")
+    try:
+        _copy_sources(source_dir)
+        env = {
+            key: value
+            for key, value in os.environ.items()
+            if key not in ("MONGODB_URI", "CRUD_MONGODB_URI", "CRUD_WARM_UP")
+        }
+        env["CRUD_DB_PATH"] = os.path.join(work_dir, "db.json")
+        env["CRUD_SQLITE_PATH"] = os.path.join(work_dir, "db.sqlite3")
+        env["CRUD_STORAGE"] = "sqlite" if backend == "sqlite" else ""
+        env.pop("PYTHONPYCACHEPREFIX", None)
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        if not bytecode:
+            env["PYTHONDONTWRITEBYTECODE"] = "1"
+        setup = None
+        if mongomock:
+            env["MONGODB_URI"] = "mongodb://mongomock"
+            setup = _MONGOMOCK_SETUP.format(count=items)
+        elif backend == "mongodb":
+            env["MONGODB_URI"] = mongodb_uri
+            env["MONGODB_DATABASE"] = f"crud_cold_start_{os.getpid()}"
+
+        # With bytecode, the seeding run compiles the copy once and the measured
+        # runs reuse it; without, every run compiles the sources again. The
+        # mongomock database lives in each run's process, so it seeds there.
+        if mongomock:
+            item_id = MONGOMOCK_ITEM_ID
+        else:
+            item_id = _seed(env, items, source_dir)
+
+        try:
+            samples = [
+                _run_once(env, item_id, source_dir, setup) for _ in range(runs)
+            ]
+        finally:
+            if backend == "mongodb" and not mongomock:
+                _drop_database(env, source_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "backend": "mongomock" if mongomock else backend,
+        "bytecode": bytecode,
+        "items": items,
+        "runs": runs,
+        "python": sys.version.split()[0],
+        "median_ms": {
+            key: round(statistics.median(sample[key] for sample in samples), 3)
+            for key in samples[0]
+        },
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"Cold start: {report['backend']} backend, {report['items']} items, "
+        f"{'with' if report['bytecode'] else 'without'} bytecode, "
+        f"median of {report['runs']} runs",
+    ]
+    width = max(len(key) for key in report["median_ms"])
+    for key, value in report["median_ms"].items():
+        lines.append(f"  {key:<{width}}  {value:9.2f} ms")
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Measure API cold-start time.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--backend", choices=("json", "sqlite", "mongodb"), default="json"
+    )
+    parser.add_argument(
+        "--mongodb-uri", help="Run the mongodb backend against this server"
+    )
+    parser.add_argument("--items", type=int, default=SEED_ITEMS)
+    parser.add_argument(
+        "--no-bytecode",
+        action="store_true",
+        help="Compile the sources on every run, as without shipped .pyc files",
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON instead")
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        report = measure(
+            args.runs, args.backend, not args.no_bytecode, args.items, args.mongodb_uri
+        )
+    except RuntimeError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
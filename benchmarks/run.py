@@ -0,0 +1,447 @@
+"""Throughput and latency of the CRUD operations, per backend and store size.
+
+    python -m benchmarks.run --backends json,sqlite --sizes 1000,10000 --output a.json
+    python -m benchmarks.run --sizes 100000,1000000 --ops 500 --output big.json
+    python -m benchmarks.run --compare a.json b.json --threshold 0.15
+
+Each backend is seeded with every size in turn, then create, get-by-id,
+update, delete, list-page and search are timed one call at a time. The HTTP
+suite then times GET and POST requests against ``api.index.handler``, served
+on a local socket. Results are written as JSON. ``--compare`` reads two result
+files and exits non-zero when an operation's p50 latency grows, or its
+throughput drops, by more than the threshold.
+
+The ``mongodb`` backend runs against ``--mongodb-uri`` (a local mongod) when
+given, or else against mongomock when it is installed. With neither it is
+skipped. mongomock has no text index, so its search figures are not meaningful.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from unittest import mock
+
+from app import cache, crud, mongo
+
+
+DEFAULT_SIZES = (1000, 10000)
+ALL_SIZES = (1000, 10000, 100000, 1000000)
+DEFAULT_OPS = 200
+DEFAULT_THRESHOLD = 0.2
+# Large batches keep seeding a million items into the JSON store to a few
+# snapshot rewrites.
+SEED_BATCH = 50000
+BACKENDS = ("json", "sqlite", "mongodb")
+
+_WORDS = (
+    "apple banana cherry delta echo fruit garden harbor island jungle kettle "
+    "lemon mango nectar orange pepper quartz river silver timber umber violet "
+    "walnut yellow zephyr"
+).split()
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``samples``, which must be sorted."""
+    rank = math.ceil(fraction * len(samples))
+    return samples[max(0, min(len(samples), rank) - 1)]
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "ops": len(ordered),
+        "throughput": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+    }
+
+
+def time_calls(calls: Iterable[Callable[[], Any]]) -> Dict[str, float]:
+    """Run each call once, timing every call and the whole run."""
+    latencies = []
+    started = time.perf_counter()
+    for call in calls:
+        began = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - began)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def _record(rng: random.Random, number: int) -> Dict[str, str]:
+    words = rng.sample(_WORDS, 4)
+    return {
+        "name": f"{words[0].title()} {words[1]} {number}",
+        "description": f"A {words[2]} item for the {words[3]} benchmark",
+    }
+
+
+def _mongomock_collections():
+    import mongomock
+
+    database = mongomock.MongoClient()["crud_benchmark"]
+    return database["items"], database["meta"]
+
+
+@contextmanager
+def backend_store(backend: str, mongodb_uri: Optional[str] = None) -> Iterator[None]:
+    """Point ``app.crud`` at an empty store for ``backend`` while active."""
+    work_dir = tempfile.mkdtemp(prefix="crud-bench-")
+    env = {
+        "CRUD_DB_PATH": os.path.join(work_dir, "db.json"),
+        "CRUD_SQLITE_PATH": os.path.join(work_dir, "db.sqlite3"),
+        "CRUD_STORAGE": "sqlite" if backend == "sqlite" else "",
+        "MONGODB_URI": "",
+        "CRUD_MONGODB_URI": "",
+    }
+    patches = []
+    if backend == "mongodb":
+        if mongodb_uri:
+            env["MONGODB_URI"] = mongodb_uri
+            env["MONGODB_DATABASE"] = f"crud_benchmark_{os.getpid()}"
+        else:
+            items, meta = _mongomock_collections()
+            env["MONGODB_URI"] = "mongodb://mongomock"
+            patches = [
+                mock.patch.object(mongo, "get_collection", return_value=items),
+                mock.patch.object(mongo, "get_meta_collection", return_value=meta),
+            ]
+
+    original_db_path = crud.DB_PATH
+    crud.DB_PATH = env["CRUD_DB_PATH"]
+    cache.responses.clear()
+    try:
+        with mock.patch.dict(os.environ, env):
+            for patch in patches:
+                patch.start()
+            try:
+                if backend == "mongodb" and mongodb_uri:
+                    mongo.reset()
+                    mongo.get_collection()
+                yield
+            finally:
+                for patch in patches:
+                    patch.stop()
+                if backend == "mongodb" and mongodb_uri:
+                    mongo.get_client().drop_database(env["MONGODB_DATABASE"])
+                    mongo.reset()
+                if backend == "sqlite":
+                    crud._sqlite_store().close()
+    finally:
+        crud.DB_PATH = original_db_path
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def seed(size: int, rng: random.Random) -> List[str]:
+    """Create ``size`` items in batches and return their IDs."""
+    ids: List[str] = []
+    for start in range(0, size, SEED_BATCH):
+        stop = min(size, start + SEED_BATCH)
+        records = [_record(rng, number) for number in range(start, stop)]
+        ids.extend(result.id for result in crud.create_items(records))
+    return ids
+
+
+Results = Dict[str, Dict[str, float]]
+
+
+def crud_suite(ids: List[str], ops: int, rng: random.Random) -> Results:
+    """Time each CRUD operation ``ops`` times against a seeded store."""
+    results = {}
+    picks = [rng.choice(ids) for _ in range(ops)]
+    created: List[str] = []
+
+    def create(number: int) -> None:
+        created.append(crud.create_item(**_record(rng, number)).id)
+
+    results["create"] = time_calls(
+        lambda number=number: create(number) for number in range(ops)
+    )
+    results["get"] = time_calls(
+        lambda item_id=item_id: crud.get_item_by_id(item_id) for item_id in picks
+    )
+    results["update"] = time_calls(
+        lambda item_id=item_id: crud.update_item(item_id, description="Updated")
+        for item_id in picks
+    )
+
+    def list_pages() -> Iterator[Callable[[], Any]]:
+        cursor = None
+
+        def call() -> None:
+            nonlocal cursor
+            _, cursor = crud.get_items_page(100, cursor)
+
+        for _ in range(ops):
+            yield call
+
+    results["list"] = time_calls(list_pages())
+    results["search"] = time_calls(
+        lambda word=rng.choice(_WORDS): crud.search_items(word, 20) for _ in range(ops)
+    )
+
+    # Deleting what "create" added keeps the seeded IDs valid for later suites
+    # and the store at its nominal size.
+    results["delete"] = time_calls(
+        lambda item_id=item_id: crud.delete_item(item_id) for item_id in created
+    )
+    return results
+
+
+def http_suite(ids: List[str], ops: int, rng: random.Random) -> Results:
+    """Time requests through ``api.index.handler`` over a local socket."""
+    from api.index import handler
+
+    class QuietHandler(handler):
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def request(method: str, path: str, body: Optional[Dict[str, str]] = None) -> None:
+        # The handler speaks HTTP/1.0, as under Vercel: one connection per request.
+        connection = HTTPConnection(*server.server_address)
+        payload = None if body is None else json.dumps(body)
+        headers = {"Content-Type": "application/json"} if body else {}
+        connection.request(method, path, body=payload, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        if response.status >= 400:
+            raise RuntimeError(f"{method} {path} returned {response.status}")
+
+    try:
+        picks = [rng.choice(ids) for _ in range(ops)]
+        return {
+            "http get": time_calls(
+                lambda item_id=item_id: request("GET", f"/api/items/{item_id}")
+                for item_id in picks
+            ),
+            "http list": time_calls(
+                lambda: request("GET", "/api/items?limit=100") for _ in range(ops)
+            ),
+            "http create": time_calls(
+                lambda number=number: request(
+                    "POST", "/api/items", _record(rng, number)
+                )
+                for number in range(ops)
+            ),
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _backend_available(backend: str, mongodb_uri: Optional[str]) -> Optional[str]:
+    """Return why ``backend`` cannot run here, or None if it can."""
+    if backend != "mongodb" or mongodb_uri:
+        return None
+    try:
+        import mongomock  # noqa: F401
+    except ImportError:
+        return "needs --mongodb-uri or the mongomock package"
+    return None
+
+
+def run(
+    backends: Iterable[str],
+    sizes: Iterable[int],
+    ops: int = DEFAULT_OPS,
+    http: bool = True,
+    mongodb_uri: Optional[str] = None,
+    seed_value: int = 0,
+    progress: Callable[[str], None] = lambda message: None,
+) -> Dict[str, Any]:
+    """Run the suites and return the report written by ``--output``."""
+    results = []
+    skipped = []
+    for backend in backends:
+        reason = _backend_available(backend, mongodb_uri)
+        if reason:
+            skipped.append({"backend": backend, "reason": reason})
+            progress(f"{backend}: skipped, {reason}")
+            continue
+
+        for size in sizes:
+            rng = random.Random(seed_value)
+            with backend_store(backend, mongodb_uri):
+                started = time.perf_counter()
+                ids = seed(size, rng)
+                seconds = time.perf_counter() - started
+                progress(f"{backend} {size}: seeded in {seconds:.1f}s")
+
+                suites = [crud_suite]
+                if http:
+                    suites.append(http_suite)
+                for suite in suites:
+                    for operation, stats in suite(ids, ops, rng).items():
+                        key = {"backend": backend, "size": size, "operation": operation}
+                        results.append({**key, **stats})
+                        progress(
+                            f"{backend} {size} {operation}: "
+                            f"{stats['throughput']:.0f}/s p50 {stats['p50_ms']:.3f} ms "
+                            f"p99 {stats['p99_ms']:.3f} ms"
+                        )
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "ops": ops,
+            "seed": seed_value,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def _key(result: Dict[str, Any]) -> Tuple[str, int, str]:
+    return result["backend"], result["size"], result["operation"]
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """Pair up results by backend, size and operation and flag regressions.
+
+    A result regresses when its p50 latency is more than ``threshold`` (a
+    fraction) above the baseline, or its throughput more than that below it.
+    """
+    previous = {_key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = previous.get(_key(result))
+        if before is None:
+            continue
+        latency = result["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] else 0.0
+        throughput = 0.0
+        if before["throughput"]:
+            throughput = result["throughput"] / before["throughput"] - 1
+        rows.append(
+            {
+                "backend": result["backend"],
+                "size": result["size"],
+                "operation": result["operation"],
+                "p50_change": round(latency, 4),
+                "throughput_change": round(throughput, 4),
+                "regression": latency > threshold or throughput < -threshold,
+            }
+        )
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'backend':<8} {'size':>8} {'operation':<12} {'p50':>8} {'ops/s':>8}"]
+    for row in rows:
+        lines.append(
+            f"{row['backend']:<8} {row['size']:>8} {row['operation']:<12} "
+            f"{row['p50_change']:>+8.1%} {row['throughput_change']:>+8.1%}"
+            + ("  REGRESSION" if row["regression"] else "")
+        )
+    return "\n".join(lines)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the CRUD operations.")
+    parser.add_argument(
+        "--backends",
+        default="json,sqlite,mongodb",
+        help=f"Comma-separated, from {', '.join(BACKENDS)} (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=_int_list,
+        default=list(DEFAULT_SIZES),
+        help="Comma-separated store sizes, e.g. "
+        + ",".join(str(size) for size in ALL_SIZES),
+    )
+    parser.add_argument(
+        "--ops", type=int, default=DEFAULT_OPS, help="Calls per operation"
+    )
+    parser.add_argument("--no-http", action="store_true", help="Skip the HTTP suite")
+    parser.add_argument(
+        "--mongodb-uri", help="Run the mongodb backend against this server"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the data")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("BASELINE", "CURRENT"),
+        help="Compare two reports instead of running",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Slowdown allowed before --compare fails, as a fraction "
+        "(default: %(default)s)",
+    )
+    return parser
+
+
+def main(argv: Optional[Iterable[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path, "r", encoding="utf-8") as file:
+                reports.append(json.load(file))
+        rows = compare(reports[0], reports[1], args.threshold)
+        print(format_comparison(rows))
+        regressions = sum(row["regression"] for row in rows)
+        print(f"{regressions} regression(s) past {args.threshold:.0%}")
+        return 1 if regressions else 0
+
+    backends = [name for name in args.backends.split(",") if name]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(sorted(unknown))}")
+    if args.ops < 1:
+        parser.error("--ops must be at least 1")
+
+    report = run(
+        backends,
+        args.sizes,
+        ops=args.ops,
+        http=not args.no_http,
+        mongodb_uri=args.mongodb_uri,
+        seed_value=args.seed,
+        progress=lambda message: print(message, file=sys.stderr, flush=True),
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app import acrud, crud
+
+
+class TestAsyncCrud(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        """Point the CRUD functions at a temporary JSON database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_db_path = crud.DB_PATH
+        crud.DB_PATH = os.path.join(self.temp_dir, "db.json")
+
+    def tearDown(self):
+        """Restore the default pool and clean up."""
+        acrud.configure(acrud.DEFAULT_MAX_IN_FLIGHT)
+        shutil.rmtree(self.temp_dir)
+        crud.DB_PATH = self.original_db_path
+
+    async def test_round_trip(self):
+        """Test the async wrappers against the synchronous store."""
+        item = await acrud.create_item("Item", "Description")
+        self.assertEqual((await acrud.get_item_by_id(item.id)).name, "Item")
+
+        updated = await acrud.update_item(item.id, name="Renamed")
+        self.assertEqual(updated.name, "Renamed")
+        self.assertEqual(await acrud.count_items(), 1)
+
+        self.assertTrue(await acrud.delete_item(item.id))
+        self.assertEqual(await acrud.get_items(), [])
+
+    async def test_iter_items_in_batches(self):
+        """Test that iteration yields every item across several batches."""
+        crud.create_items(
+            [{"name": f"Item {number}", "description": "D"} for number in range(5)]
+        )
+
+        names = [item.name async for item in acrud.iter_items(batch_size=2)]
+        self.assertEqual(names, [f"Item {number}" for number in range(5)])
+
+    async def test_in_flight_operations_are_capped(self):
+        """Test that no more than the configured number of calls run at once."""
+        acrud.configure(2)
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_lookup(item_id):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return None
+
+        with mock.patch.object(crud, "get_item_by_id", slow_lookup):
+            results = await asyncio.gather(
+                *(acrud.get_item_by_id(str(number)) for number in range(10))
+            )
+
+        self.assertEqual(results, [None] * 10)
+        self.assertEqual(peak, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
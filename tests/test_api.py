@@ -0,0 +1,306 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.client import HTTPConnection
+from unittest import mock
+from http.server import HTTPServer
+
+from api.index import handler
+from app import cache, crud
+
+
+class TestApi(unittest.TestCase):
+    def setUp(self):
+        """Serve the API handler against a temporary JSON database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_db_path = crud.DB_PATH
+        crud.DB_PATH = os.path.join(self.temp_dir, "db.json")
+        cache.responses.clear()
+
+        self.server = HTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop the server and clean up."""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+        crud.DB_PATH = self.original_db_path
+
+    def request(self, method, path, payload=None, response_headers=None, headers=None):
+        connection = HTTPConnection(*self.server.server_address)
+        body = None if payload is None else json.dumps(payload)
+        headers = dict(headers or {})
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+        connection.close()
+        if response_headers is not None:
+            response_headers.update(response.getheaders())
+        return response.status, json.loads(data) if data else None
+
+    def test_list_items_streams_body(self):
+        """Test that the listing is streamed and still parses as one document."""
+        for number in range(3):
+            crud.create_item(f"Item {number}", "Description")
+
+        headers = {}
+        status, data = self.request("GET", "/api/items", response_headers=headers)
+        self.assertEqual(status, 200)
+        self.assertEqual(data["total"], 3)
+        self.assertEqual([item["name"] for item in data["items"]], ["Item 0", "Item 1", "Item 2"])
+        self.assertNotIn("Content-Length", headers)
+
+    def test_list_items_uses_chunked_encoding_on_http11(self):
+        """Test chunked transfer encoding when the server speaks HTTP/1.1."""
+        handler.protocol_version = "HTTP/1.1"
+        try:
+            headers = {}
+            status, data = self.request("GET", "/api/items", response_headers=headers)
+        finally:
+            handler.protocol_version = "HTTP/1.0"
+
+        self.assertEqual(status, 200)
+        self.assertEqual(data, {"items": [], "total": 0})
+        self.assertEqual(headers["Transfer-Encoding"], "chunked")
+
+    def test_item_round_trip(self):
+        """Test creating, reading and deleting an item over HTTP."""
+        status, data = self.request(
+            "POST", "/api/items", {"name": "Item", "description": "Description"}
+        )
+        self.assertEqual(status, 201)
+        item_id = data["item"]["id"]
+
+        status, data = self.request("GET", f"/api/items/{item_id}")
+        self.assertEqual(status, 200)
+        self.assertEqual(data["item"]["name"], "Item")
+
+        status, _ = self.request("DELETE", f"/api/items/{item_id}")
+        self.assertEqual(status, 200)
+        status, _ = self.request("GET", f"/api/items/{item_id}")
+        self.assertEqual(status, 404)
+
+    def test_list_items_by_page(self):
+        """Test cursor pagination on the listing route."""
+        for number in range(3):
+            crud.create_item(f"Item {number}", "Description")
+
+        status, data = self.request("GET", "/api/items?limit=2")
+        self.assertEqual(status, 200)
+        self.assertEqual(len(data["items"]), 2)
+        self.assertEqual(data["total"], 3)
+
+        status, data = self.request("GET", f"/api/items?limit=2&cursor={data['next_cursor']}")
+        self.assertEqual(status, 200)
+        self.assertEqual(len(data["items"]), 1)
+        self.assertIsNone(data["next_cursor"])
+
+        status, _ = self.request("GET", "/api/items?limit=0")
+        self.assertEqual(status, 400)
+        status, _ = self.request("GET", "/api/items?cursor=bogus")
+        self.assertEqual(status, 400)
+
+    def test_search_route(self):
+        """Test searching through the listing route."""
+        crud.create_item("Apple", "A fruit")
+        crud.create_item("Banana", "A yellow fruit")
+
+        status, data = self.request("GET", "/api/items?q=yellow+fruit")
+        self.assertEqual(status, 200)
+        self.assertEqual([item["name"] for item in data["items"]], ["Banana"])
+        self.assertEqual(data["total"], 1)
+
+    def test_suggest_route(self):
+        """Test the autocomplete route."""
+        item = crud.create_item("Hello World", "Description")
+        crud.create_item("Goodbye", "Description")
+
+        status, data = self.request("GET", "/api/items/suggest?prefix=hello&limit=5")
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            data["suggestions"], [{"id": item.id, "name": "Hello World", "slug": "hello-world"}]
+        )
+
+        status, _ = self.request("GET", "/api/items/suggest")
+        self.assertEqual(status, 400)
+
+    def test_update_conflict(self):
+        """Test that a stale expected_updated_at is rejected with 409."""
+        item = crud.create_item("Item", "Description")
+        payload = {"name": "Renamed", "expected_updated_at": item.created_at}
+
+        status, data = self.request("PATCH", f"/api/items/{item.id}", payload)
+        self.assertEqual(status, 200)
+        self.assertEqual(data["item"]["name"], "Renamed")
+
+        status, _ = self.request("PATCH", f"/api/items/{item.id}", payload)
+        self.assertEqual(status, 409)
+
+    def test_conditional_get_for_item(self):
+        """Test ETag and Last-Modified revalidation of a single item."""
+        item = crud.create_item("Item", "Description")
+        path = f"/api/items/{item.id}"
+
+        headers = {}
+        status, _ = self.request("GET", path, response_headers=headers)
+        self.assertEqual(status, 200)
+        etag = headers["ETag"]
+
+        status, data = self.request("GET", path, headers={"If-None-Match": etag})
+        self.assertEqual((status, data), (304, None))
+        status, _ = self.request(
+            "GET", path, headers={"If-Modified-Since": headers["Last-Modified"]}
+        )
+        self.assertEqual(status, 304)
+
+        crud.update_item(item.id, name="Renamed")
+        headers = {}
+        status, data = self.request(
+            "GET", path, headers={"If-None-Match": etag}, response_headers=headers
+        )
+        self.assertEqual((status, data["item"]["name"]), (200, "Renamed"))
+        self.assertNotEqual(headers["ETag"], etag)
+
+    def test_if_modified_since_edge_dates(self):
+        """Test -0000 zones, future dates and junk in If-Modified-Since."""
+        item = crud.create_item("Item", "Description")
+        for path in (f"/api/items/{item.id}", "/api/items?limit=10"):
+            for since in (
+                "Mon, 01 Jan 2024 00:00:00 -0000",
+                "Fri, 01 Jan 2100 00:00:00 -0000",
+                "Fri, 01 Jan 2100 00:00:00 GMT",
+                "not a date",
+            ):
+                status, _ = self.request(
+                    "GET", path, headers={"If-Modified-Since": since}
+                )
+                self.assertEqual(status, 200, (path, since))
+
+        headers = {}
+        self.request("GET", f"/api/items/{item.id}", response_headers=headers)
+        since = headers["Last-Modified"].replace("GMT", "-0000")
+        status, _ = self.request(
+            "GET", f"/api/items/{item.id}", headers={"If-Modified-Since": since}
+        )
+        self.assertEqual(status, 304)
+
+    def test_conditional_get_for_listing(self):
+        """Test that listings revalidate against the store version."""
+        crud.create_item("Item", "Description")
+
+        headers = {}
+        self.request("GET", "/api/items?limit=10", response_headers=headers)
+        etag = headers["ETag"]
+
+        # The store is not read for a 304
+        with mock.patch.object(crud, "get_items_page") as get_items_page:
+            status, _ = self.request(
+                "GET", "/api/items?limit=10", headers={"If-None-Match": etag}
+            )
+        self.assertEqual(status, 304)
+        get_items_page.assert_not_called()
+
+        crud.create_item("Another", "Description")
+        status, data = self.request(
+            "GET", "/api/items?limit=10", headers={"If-None-Match": etag}
+        )
+        self.assertEqual((status, data["total"]), (200, 2))
+
+    def test_listing_etag_changes_when_store_is_recreated(self):
+        """Test that a recreated store at the same version gets a new ETag."""
+        crud.create_item("Item", "Description")
+        headers = {}
+        self.request("GET", "/api/items?limit=10", response_headers=headers)
+        etag = headers["ETag"]
+
+        os.remove(crud.DB_PATH)
+        time.sleep(0.01)
+        crud.create_item("Different", "Description")
+        status, data = self.request(
+            "GET", "/api/items?limit=10", headers={"If-None-Match": etag}
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual([item["name"] for item in data["items"]], ["Different"])
+
+    def test_cached_item_response(self):
+        """Test that repeat item reads skip storage until the item changes."""
+        item = crud.create_item("Item", "Description")
+        path = f"/api/items/{item.id}"
+        self.request("GET", path)
+
+        with mock.patch.object(crud, "get_item_by_id") as get_item_by_id:
+            status, data = self.request("GET", path)
+        self.assertEqual((status, data["item"]["name"]), (200, "Item"))
+        get_item_by_id.assert_not_called()
+
+        self.request("PATCH", path, {"name": "Renamed"})
+        status, data = self.request("GET", path)
+        self.assertEqual((status, data["item"]["name"]), (200, "Renamed"))
+
+        self.request("DELETE", path)
+        status, _ = self.request("GET", path)
+        self.assertEqual(status, 404)
+
+    def test_uncached_item_read_fetches_once(self):
+        """Test that an uncached item GET takes its ETag from the fetched item."""
+        item = crud.create_item("Item", "Description")
+        cache.responses.clear()
+
+        with mock.patch.object(crud, "get_item_version") as get_item_version:
+            status, data = self.request("GET", f"/api/items/{item.id}")
+        self.assertEqual((status, data["item"]["name"]), (200, "Item"))
+        get_item_version.assert_not_called()
+
+    def test_cached_listing_is_invalidated_by_writes(self):
+        """Test that a cached page is dropped when an item is created."""
+        crud.create_item("Item", "Description")
+        self.request("GET", "/api/items?limit=10")
+
+        with mock.patch.object(crud, "get_items_page") as get_items_page:
+            status, data = self.request("GET", "/api/items?limit=10")
+        self.assertEqual((status, data["total"]), (200, 1))
+        get_items_page.assert_not_called()
+
+        self.request("POST", "/api/items", {"name": "Another", "description": "D"})
+        self.assertEqual(cache.responses.stats()["entries"], 0)
+        status, data = self.request("GET", "/api/items?limit=10")
+        self.assertEqual((status, data["total"]), (200, 2))
+
+    def test_batch_endpoint(self):
+        """Test that the batch endpoint reports a result for each record."""
+        existing = crud.create_item("Existing", "Description")
+
+        status, data = self.request(
+            "POST",
+            "/api/items/batch",
+            {
+                "create": [
+                    {"name": "New", "description": "Description"},
+                    {"name": "", "description": "Description"},
+                ],
+                "update": [{"id": existing.id, "name": "Renamed"}],
+                "delete": ["non-existent-id"],
+            },
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual([result["status"] for result in data["create"]], [201, 400])
+        self.assertEqual(data["update"][0]["item"]["name"], "Renamed")
+        self.assertEqual(data["delete"][0]["status"], 404)
+
+        status, data = self.request("POST", "/api/items/batch", {"create": {}})
+        self.assertEqual(status, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
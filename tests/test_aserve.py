@@ -0,0 +1,111 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from api.aserve import AsyncServer
+from app import crud
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding") == "chunked":
+        body = b""
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            chunk = await reader.readexactly(size + 2)
+            if size == 0:
+                break
+            body += chunk[:-2]
+    else:
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, json.loads(body) if body else None
+
+
+class TestAsyncServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        """Serve the API on an asyncio loop against a temporary JSON database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_db_path = crud.DB_PATH
+        crud.DB_PATH = os.path.join(self.temp_dir, "db.json")
+
+        self.server = AsyncServer("127.0.0.1", 0, quiet=True)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        """Stop the server and clean up."""
+        await self.server.stop()
+        shutil.rmtree(self.temp_dir)
+        crud.DB_PATH = self.original_db_path
+
+    async def send(self, writer, method, path, payload=None, headers=""):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: test\r\n{headers}"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1")
+            + body
+        )
+        await writer.drain()
+
+    async def test_requests_share_one_connection(self):
+        """Test create, read and streamed listing over one keep-alive connection."""
+        reader, writer = await asyncio.open_connection(*self.server.address)
+
+        await self.send(
+            writer, "POST", "/api/items", {"name": "Item", "description": "D"}
+        )
+        status, _, data = await read_response(reader)
+        self.assertEqual(status, 201)
+        item_id = data["item"]["id"]
+
+        # Pipelined: both requests are written before either response is read.
+        await self.send(writer, "GET", f"/api/items/{item_id}")
+        await self.send(writer, "GET", "/api/items")
+        status, _, data = await read_response(reader)
+        self.assertEqual((status, data["item"]["name"]), (200, "Item"))
+        status, headers, data = await read_response(reader)
+        self.assertEqual(headers["transfer-encoding"], "chunked")
+        self.assertEqual(data["total"], 1)
+
+        await self.send(
+            writer, "GET", "/api/items/missing", headers="Connection: close\r\n"
+        )
+        status, headers, _ = await read_response(reader)
+        self.assertEqual((status, headers["connection"]), (404, "close"))
+        self.assertEqual(await reader.read(), b"")
+        writer.close()
+
+    async def test_rejects_chunked_body(self):
+        """Test that a body without Content-Length is refused."""
+        reader, writer = await asyncio.open_connection(*self.server.address)
+        writer.write(
+            b"POST /api/items HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n0\r\n\r\n"
+        )
+        status, headers, _ = await read_response(reader)
+        writer.close()
+
+        self.assertEqual((status, headers["connection"]), (411, "close"))
+
+    async def test_stop_closes_idle_connections(self):
+        """Test that shutting down does not wait for idle keep-alive clients."""
+        reader, writer = await asyncio.open_connection(*self.server.address)
+        await self.send(writer, "GET", "/api/items?limit=1")
+        await read_response(reader)
+
+        await asyncio.wait_for(self.server.stop(), timeout=2)
+        self.assertEqual(await reader.read(), b"")
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from benchmarks import run
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        samples = [float(number) for number in range(1, 101)]
+        self.assertEqual(run.percentile(samples, 0.50), 50.0)
+        self.assertEqual(run.percentile(samples, 0.99), 99.0)
+        self.assertEqual(run.percentile([3.0], 0.99), 3.0)
+
+    def test_small_run_reports_every_operation(self):
+        """Test a tiny JSON-backend run end to end, HTTP suite included."""
+        report = run.run(["json"], [20], ops=3)
+
+        operations = {result["operation"] for result in report["results"]}
+        self.assertEqual(
+            operations,
+            {"create", "get", "update", "list", "search", "delete"}
+            | {"http get", "http list", "http create"},
+        )
+        self.assertTrue(all(result["ops"] == 3 for result in report["results"]))
+
+    def test_compare_flags_regressions(self):
+        """Test that a slower p50 or lower throughput past the threshold is flagged."""
+
+        def report(p50, throughput):
+            result = {"backend": "json", "size": 1000, "operation": "get"}
+            return {"results": [{**result, "p50_ms": p50, "throughput": throughput}]}
+
+        [row] = run.compare(report(1.0, 1000), report(1.1, 950), threshold=0.2)
+        self.assertFalse(row["regression"])
+        [row] = run.compare(report(1.0, 1000), report(1.5, 1000), threshold=0.2)
+        self.assertTrue(row["regression"])
+        [row] = run.compare(report(1.0, 1000), report(1.0, 700), threshold=0.2)
+        self.assertTrue(row["regression"])
+
+
+if __name__ == "__main__":
+    unittest.main()
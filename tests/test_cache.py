@@ -0,0 +1,86 @@
+import unittest
+
+from app.cache import ENTRY_OVERHEAD, ITEMS, LISTS, ByteCache, TTLCache
+
+
+class TestByteCache(unittest.TestCase):
+    def test_hit_and_version_mismatch(self):
+        """Test that an entry is only served for the version it was built from."""
+        cache = ByteCache(1024 * 1024)
+        cache.put((ITEMS, "a"), "v1", b"body")
+
+        self.assertEqual(cache.get((ITEMS, "a"), "v1"), b"body")
+        self.assertIsNone(cache.get((ITEMS, "a"), "v2"))
+        # The stale entry is dropped on the mismatch
+        self.assertIsNone(cache.get((ITEMS, "a"), "v1"))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_evicts_least_recently_used_past_the_cap(self):
+        """Test that the byte cap evicts the least recently used entries."""
+        body = b"x" * 100
+        cache = ByteCache(8 * 3 * (len(body) + ENTRY_OVERHEAD))
+        cache.max_bytes = 3 * (len(body) + ENTRY_OVERHEAD)
+        for name in "abc":
+            cache.put((ITEMS, name), 1, body)
+        cache.get((ITEMS, "a"), 1)
+        cache.put((ITEMS, "d"), 1, body)
+
+        self.assertIsNone(cache.get((ITEMS, "b"), 1))
+        self.assertEqual(cache.get((ITEMS, "a"), 1), body)
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["evictions"]), (3, 1))
+        self.assertLessEqual(stats["bytes"], stats["max_bytes"])
+
+    def test_skips_entries_too_large_to_share(self):
+        """Test that one body larger than an eighth of the cap is not stored."""
+        cache = ByteCache(8 * 1024)
+        cache.put((LISTS, "big"), 1, b"x" * 2048)
+        self.assertEqual(len(cache), 0)
+
+    def test_discard_group(self):
+        """Test that dropping a group leaves other groups in place."""
+        cache = ByteCache(1024 * 1024)
+        cache.put((ITEMS, "a"), 1, b"item")
+        cache.put((LISTS, ("/api/items", ())), 1, b"page")
+        cache.put((LISTS, ("/api/items", (("q", "x"),))), 1, b"search")
+
+        cache.discard_group(LISTS)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()["bytes"], len(b"item") + ENTRY_OVERHEAD)
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = TTLCache(2, ttl=10, clock=lambda: self.now)
+
+    def test_entries_expire(self):
+        """Test that an entry is served until its TTL runs out."""
+        self.cache.put("a", {"name": "A"})
+        self.now = 9.9
+        self.assertEqual(self.cache.get("a"), {"name": "A"})
+        self.now = 10.0
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.stats()["hit_ratio"], 0.5)
+
+    def test_evicts_least_recently_used(self):
+        """Test that the size limit evicts the least recently used entry."""
+        for key in "abc":
+            self.cache.put(key, key)
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.get("c"), "c")
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_put_after_invalidation_is_dropped(self):
+        """Test that a read started before a write cannot cache the old value."""
+        token = self.cache.token()
+        self.cache.discard("a")
+        self.cache.put("a", "old", token)
+        self.assertIsNone(self.cache.get("a"))
+
+        self.cache.put("a", "new", self.cache.token())
+        self.assertEqual(self.cache.get("a"), "new")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import sys
+import unittest
+from unittest import mock
+
+from app import codec
+
+
+class TestCodec(unittest.TestCase):
+    def tearDown(self):
+        codec.get_codec.cache_clear()
+
+    def test_default_codec_is_compact(self):
+        """Test that the default codec writes no whitespace and keeps UTF-8."""
+        self.assertEqual(codec.dumps({"a": [1, "é"]}), '{"a":[1,"é"]}'.encode("utf-8"))
+        self.assertEqual(codec.loads(b'{"a": [1, 2]}'), {"a": [1, 2]})
+
+    def test_fast_codec_falls_back_without_orjson(self):
+        """Test that asking for the fast codec works when orjson is missing."""
+        codec.get_codec.cache_clear()
+        with mock.patch.dict(sys.modules, {"orjson": None}):
+            self.assertIs(codec.get_codec("fast"), codec.STDLIB)
+
+        with self.assertRaises(ValueError):
+            codec.get_codec("yaml")
+
+    def test_snapshot_formats_are_detected(self):
+        """Test that either snapshot format decodes, including indented JSON."""
+        snapshot = {"version": 3, "items": [{"id": "a", "updated_at": None}]}
+
+        binary = codec.encode_snapshot(snapshot, "binary")
+        self.assertTrue(binary.startswith(codec.BINARY_MAGIC))
+        self.assertEqual(codec.decode_snapshot(binary), snapshot)
+
+        self.assertEqual(codec.decode_snapshot(codec.encode_snapshot(snapshot)), snapshot)
+        legacy = json.dumps(snapshot, indent=2).encode("utf-8")
+        self.assertEqual(codec.decode_snapshot(legacy), snapshot)
+
+    def test_unknown_store_format(self):
+        """Test that a misspelt store format is reported."""
+        with mock.patch.dict("os.environ", {"CRUD_STORE_FORMAT": "xml"}):
+            with self.assertRaises(ValueError):
+                codec.store_format()
+
+
+if __name__ == "__main__":
+    unittest.main()
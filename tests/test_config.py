@@ -0,0 +1,23 @@
+import os
+import unittest
+from unittest import mock
+
+from app.config import env_flag
+
+
+class TestConfig(unittest.TestCase):
+    def test_env_flag(self):
+        """Test that on/off words are recognised and anything else is the default."""
+        for value, expected in (("1", True), (" Yes ", True), ("OFF", False)):
+            with mock.patch.dict(os.environ, {"CRUD_TEST_FLAG": value}):
+                flag = env_flag("CRUD_TEST_FLAG", default=not expected)
+                self.assertIs(flag, expected)
+
+        for value in ("", "maybe"):
+            with mock.patch.dict(os.environ, {"CRUD_TEST_FLAG": value}):
+                self.assertFalse(env_flag("CRUD_TEST_FLAG"))
+                self.assertTrue(env_flag("CRUD_TEST_FLAG", default=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
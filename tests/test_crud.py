@@ -1,13 +1,25 @@
 import os
 import json
+import subprocess
+import sys
+import threading
+import time
 import unittest
 from datetime import datetime
 import tempfile
 import shutil
+import sqlite3
+from unittest import mock
 
-from app import crud
+from app import codec, crud
+from app.json_store import JsonStore
 from app.models import Item
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 class TestCrud(unittest.TestCase):
     def setUp(self):
         """Set up test environment."""
@@ -61,6 +73,20 @@ class TestCrud(unittest.TestCase):
         self.assertEqual(items[0].name, "Item 1")
         self.assertEqual(items[1].name, "Item 2")
     
+    def test_iter_records_match_items(self):
+        """Test that raw records have the same shape as Item.to_dict()."""
+        item = crud.create_item("Item 1", "Description 1")
+        crud.update_item(item.id, name="Renamed")
+
+        records = list(crud.iter_records())
+        self.assertEqual(records, [item.to_dict() for item in crud.iter_items()])
+        self.assertEqual(records[0]["name"], "Renamed")
+
+    def test_item_has_no_instance_dict(self):
+        """Test that Item is slotted."""
+        item = crud.create_item("Item 1", "Description 1")
+        self.assertFalse(hasattr(item, "__dict__"))
+
     def test_get_item_by_id(self):
         """Test getting an item by ID."""
         # Create a test item
@@ -103,6 +129,22 @@ class TestCrud(unittest.TestCase):
         non_existent = crud.update_item("non-existent-id", name="New Name")
         self.assertIsNone(non_existent)
     
+    def test_update_item_with_expected_updated_at(self):
+        """Test optimistic concurrency on updates."""
+        item = crud.create_item("Original Name", "Original Description")
+
+        # A never-updated item is matched on its created_at
+        updated = crud.update_item(item.id, name="First", expected_updated_at=item.created_at)
+        self.assertEqual(updated.name, "First")
+
+        with self.assertRaises(crud.ConflictError):
+            crud.update_item(item.id, name="Second", expected_updated_at=item.created_at)
+        self.assertEqual(crud.get_item_by_id(item.id).name, "First")
+
+        updated = crud.update_item(item.id, name="Second", expected_updated_at=updated.updated_at)
+        self.assertEqual(updated.name, "Second")
+        self.assertIsNone(crud.update_item("non-existent-id", name="New", expected_updated_at="x"))
+
     def test_delete_item(self):
         """Test deleting an item."""
         # Create a test item
@@ -121,5 +163,566 @@ class TestCrud(unittest.TestCase):
         success = crud.delete_item("non-existent-id")
         self.assertFalse(success)
 
+    def test_update_and_delete_keep_listing_order(self):
+        """Test that indexed updates and deletes preserve insertion order."""
+        item1 = crud.create_item("Item 1", "Description 1")
+        item2 = crud.create_item("Item 2", "Description 2")
+        item3 = crud.create_item("Item 3", "Description 3")
+
+        crud.update_item(item1.id, name="Item 1 renamed")
+        self.assertTrue(crud.delete_item(item2.id))
+
+        items = crud.get_items()
+        self.assertEqual([item.id for item in items], [item1.id, item3.id])
+        self.assertEqual(items[0].name, "Item 1 renamed")
+        self.assertIsNone(crud.get_item_by_id(item2.id))
+
+    def test_reads_are_served_from_cache(self):
+        """Test that repeated reads do not re-parse the database file."""
+        item = crud.create_item("Cached Item", "Description")
+
+        original_read = JsonStore._read
+        calls = []
+
+        def counting_read(store):
+            calls.append(store.path)
+            return original_read(store)
+
+        JsonStore._read = counting_read
+        try:
+            crud.get_item_by_id(item.id)
+            crud.get_items()
+        finally:
+            JsonStore._read = original_read
+
+        self.assertEqual(calls, [])
+
+    def test_external_write_invalidates_cache(self):
+        """Test that a write by another process is picked up."""
+        crud.create_item("Item 1", "Description 1")
+
+        # Simulate another process rewriting the file
+        with open(crud.DB_PATH, "w") as f:
+            json.dump({"items": []}, f)
+
+        self.assertEqual(crud.get_items(), [])
+
+    def test_create_items_in_bulk(self):
+        """Test creating several items with one save."""
+        results = crud.create_items(
+            [
+                {"name": "Item 1", "description": "Description 1"},
+                {"name": "", "description": "Description 2"},
+                {"name": "Item 3", "description": "Description 3"},
+            ]
+        )
+
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertIn("Name cannot be empty", results[1].error)
+
+        with open(crud.DB_PATH, "r") as f:
+            db = json.load(f)
+        self.assertEqual([record["name"] for record in db["items"]], ["Item 1", "Item 3"])
+
+    def test_import_items_writes_once(self):
+        """Test that a streamed import reports per batch and saves one snapshot."""
+        records = ({"name": f"Item {n}", "description": "Imported"} for n in range(5))
+        with mock.patch.object(
+            JsonStore, "save", autospec=True, wraps=JsonStore.save
+        ) as save:
+            batches = list(crud.import_items(records, batch_size=2))
+
+        self.assertEqual([len(results) for results in batches], [2, 2, 1])
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(crud.count_items(), 5)
+
+    def test_update_and_delete_items_in_bulk(self):
+        """Test bulk updates and deletes, including unknown IDs."""
+        item1 = crud.create_item("Item 1", "Description 1")
+        item2 = crud.create_item("Item 2", "Description 2")
+
+        results = crud.update_items(
+            [
+                {"id": item1.id, "name": "Renamed"},
+                {"id": item2.id, "description": ""},
+                {"id": "non-existent-id", "name": "New Name"},
+                {"id": item2.id},
+            ]
+        )
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[0].item.name, "Renamed")
+        self.assertIn("Description cannot be empty", results[1].error)
+        self.assertTrue(results[2].not_found)
+        self.assertFalse(results[3].ok)
+        self.assertEqual(crud.get_item_by_id(item1.id).name, "Renamed")
+        self.assertEqual(crud.get_item_by_id(item2.id).description, "Description 2")
+
+        results = crud.delete_items([item1.id, "non-existent-id"])
+        self.assertTrue(results[0].ok)
+        self.assertTrue(results[1].not_found)
+        self.assertEqual([item.id for item in crud.get_items()], [item2.id])
+
+    def test_get_items_page_walks_all_items(self):
+        """Test keyset pagination across pages, with a delete in between."""
+        items = [crud.create_item(f"Item {number}", "Description") for number in range(5)]
+        expected = sorted(items, key=lambda item: (item.created_at, item.id))
+
+        page, cursor = crud.get_items_page(2)
+        self.assertEqual([item.id for item in page], [item.id for item in expected[:2]])
+        self.assertIsNotNone(cursor)
+
+        # Deleting an item on a later page does not disturb the cursor
+        crud.delete_item(expected[3].id)
+        seen = [item.id for item in page]
+        while cursor:
+            page, cursor = crud.get_items_page(2, cursor)
+            seen.extend(item.id for item in page)
+
+        self.assertEqual(seen, [item.id for i, item in enumerate(expected) if i != 3])
+        self.assertEqual(crud.count_items(), 4)
+
+        with self.assertRaises(ValueError):
+            crud.get_items_page(2, "not-a-cursor")
+
+    def test_search_items_follows_writes(self):
+        """Test that search results track creates, updates and deletes."""
+        apple = crud.create_item("Apple", "A fruit")
+        crud.create_item("Banana", "A yellow fruit")
+
+        self.assertEqual([item.id for item in crud.search_items("app")], [apple.id])
+
+        crud.update_item(apple.id, name="Green grape")
+        self.assertEqual(crud.search_items("apple"), [])
+        self.assertEqual([item.name for item in crud.search_items("grape")], ["Green grape"])
+
+        crud.delete_item(apple.id)
+        self.assertEqual(crud.search_items("grape"), [])
+        self.assertEqual(len(crud.search_items("fruit")), 1)
+
+    def test_suggest_items_follows_renames(self):
+        """Test that autocomplete tracks creates, renames and deletes."""
+        world = crud.create_item("Hello World", "Description")
+        crud.create_item("Help Desk", "Description")
+
+        self.assertEqual([item.name for item in crud.suggest_items("hel")], ["Hello World", "Help Desk"])
+
+        crud.update_item(world.id, name="Goodbye World")
+        self.assertEqual([item.name for item in crud.suggest_items("hel")], ["Help Desk"])
+        self.assertEqual([item.id for item in crud.suggest_items("good")], [world.id])
+
+        crud.delete_item(world.id)
+        self.assertEqual(crud.suggest_items("good"), [])
+
+    def test_journal_mode_appends_and_replays(self):
+        """Test that journal mode appends mutations and replays them on load."""
+        with mock.patch.dict(os.environ, {"CRUD_JOURNAL": "1"}):
+            item1 = crud.create_item("Item 1", "Description 1")
+            item2 = crud.create_item("Item 2", "Description 2")
+            crud.update_item(item1.id, name="Item 1 renamed")
+            crud.delete_item(item2.id)
+
+            # The snapshot is untouched; every mutation is one journal line
+            with open(crud.DB_PATH, "r") as f:
+                self.assertEqual(json.load(f), {"items": []})
+            with open(crud.DB_PATH + ".journal", "r") as f:
+                self.assertEqual(len(f.readlines()), 4)
+
+            # A torn trailing line from an interrupted append is ignored
+            with open(crud.DB_PATH + ".journal", "a") as f:
+                f.write('{"op": "put", "it')
+
+            crud._json_store().invalidate()
+            items = crud.get_items()
+
+        self.assertEqual([item.name for item in items], ["Item 1 renamed"])
+
+    def test_write_after_torn_journal_tail(self):
+        """Test that a write after a torn journal line survives a fresh load."""
+        with mock.patch.dict(os.environ, {"CRUD_JOURNAL": "1"}):
+            for number in range(3):
+                crud.create_item(f"Item {number}", "Description")
+            with open(crud.DB_PATH + ".journal", "a") as f:
+                f.write('{"op": "put", "it')
+
+            crud._json_store().invalidate()
+            item = crud.create_item("After crash", "Description")
+
+            fresh = JsonStore(crud.DB_PATH, journal=True).load()
+            self.assertEqual(len(fresh), 4)
+            self.assertEqual(fresh.get(item.id)["name"], "After crash")
+
+            # A complete last entry that lost its newline is kept as well
+            with open(crud.DB_PATH + ".journal", "rb+") as f:
+                f.truncate(os.path.getsize(crud.DB_PATH + ".journal") - 1)
+            crud._json_store().invalidate()
+            crud.create_item("Another", "Description")
+            self.assertEqual(len(JsonStore(crud.DB_PATH, journal=True).load()), 5)
+
+    def test_binary_snapshot_format(self):
+        """Test that the store reads back a binary snapshot and old JSON alike."""
+        item = crud.create_item("Item 1", "Description 1")
+
+        with mock.patch.dict(os.environ, {"CRUD_STORE_FORMAT": "binary"}):
+            crud.create_item("Item 2", "Description 2")
+            with open(crud.DB_PATH, "rb") as f:
+                self.assertTrue(f.read().startswith(codec.BINARY_MAGIC))
+
+            crud._json_store().invalidate()
+            self.assertEqual(crud.get_item_by_id(item.id).name, "Item 1")
+
+        # Switching back to JSON still opens the binary file
+        self.assertEqual([item.name for item in crud.get_items()], ["Item 1", "Item 2"])
+        crud.delete_item(item.id)
+        with open(crud.DB_PATH, "r") as f:
+            self.assertEqual(len(json.load(f)["items"]), 1)
+
+    def test_journal_compaction_writes_snapshot(self):
+        """Test that a journal past its size threshold is folded into the snapshot."""
+        env = {"CRUD_JOURNAL": "1", "CRUD_JOURNAL_COMPACT_BYTES": "1"}
+        with mock.patch.dict(os.environ, env):
+            item = crud.create_item("Item 1", "Description 1")
+
+        self.assertFalse(os.path.exists(crud.DB_PATH + ".journal"))
+        with open(crud.DB_PATH, "r") as f:
+            db = json.load(f)
+        self.assertEqual([record["id"] for record in db["items"]], [item.id])
+
+    def test_store_version_moves_on_every_write(self):
+        """Test that the store version grows with writes and survives a reload."""
+        version, _ = crud.get_store_version()
+        item = crud.create_item("Item", "Description")
+        crud.update_item(item.id, name="Renamed")
+        crud.delete_item(item.id)
+
+        latest, modified_at = crud.get_store_version()
+        self.assertEqual(latest, version + 3)
+        self.assertIsNotNone(modified_at)
+
+        crud._json_store().invalidate()
+        self.assertEqual(crud.get_store_version()[0], latest)
+
+        with mock.patch.dict(os.environ, {"CRUD_JOURNAL": "1"}):
+            crud.create_item("Journaled", "Description")
+            crud._json_store().invalidate()
+            self.assertEqual(crud.get_store_version()[0], latest + 1)
+
+    def test_item_version(self):
+        """Test that an item's version is its latest timestamp."""
+        item = crud.create_item("Item", "Description")
+        self.assertEqual(crud.get_item_version(item.id), item.created_at)
+
+        updated = crud.update_item(item.id, name="Renamed")
+        self.assertEqual(crud.get_item_version(item.id), updated.updated_at)
+        self.assertIsNone(crud.get_item_version("missing"))
+
+    def test_group_commit_batches_concurrent_writes(self):
+        """Test that concurrent creates are all kept and share saves."""
+        saves = []
+        original_save = JsonStore.save
+
+        def counting_save(store):
+            saves.append(len(store._pending))
+            original_save(store)
+
+        def create_many(thread):
+            for number in range(10):
+                crud.create_item(f"Item {thread}-{number}", "Description")
+
+        with mock.patch.dict(os.environ, {"CRUD_GROUP_COMMIT_MS": "20"}), \
+                mock.patch.object(JsonStore, "save", counting_save):
+            threads = [
+                threading.Thread(target=create_many, args=(thread,))
+                for thread in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sum(saves), 80)
+        self.assertLess(len(saves), 80)
+        with open(crud.DB_PATH, "r") as f:
+            self.assertEqual(len(json.load(f)["items"]), 80)
+
+    @unittest.skipIf(fcntl is None, "needs fcntl file locks")
+    def test_reads_do_not_wait_on_another_writer(self):
+        """Test that a writer blocked on the file lock does not hold up reads."""
+        item = crud.create_item("Item", "Description")
+        lock_file = open(crud.DB_PATH + ".lock", "a")
+        self.addCleanup(lock_file.close)
+        # Stands in for another process that is busy writing.
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        release = threading.Timer(
+            1.0, fcntl.flock, (lock_file.fileno(), fcntl.LOCK_UN)
+        )
+        release.start()
+
+        writer = threading.Thread(target=crud.create_item, args=("Blocked", "D"))
+        writer.start()
+        time.sleep(0.1)
+        started = time.perf_counter()
+        self.assertEqual(crud.get_item_by_id(item.id).name, "Item")
+        elapsed = time.perf_counter() - started
+
+        writer.join()
+        release.join()
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(crud.count_items(), 2)
+
+    def test_concurrent_processes_do_not_lose_writes(self):
+        """Test that processes sharing the file serialize their writes."""
+        script = (
+            "from app import crud\n"
+            "for number in range(20):\n"
+            "    crud.create_item(f'Item {number}', 'Description')\n"
+        )
+        env = dict(os.environ, CRUD_DB_PATH=crud.DB_PATH)
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        processes = [
+            subprocess.Popen([sys.executable, "-c", script], cwd=root, env=env)
+            for _ in range(4)
+        ]
+        for process in processes:
+            self.assertEqual(process.wait(timeout=60), 0)
+
+        self.assertEqual(crud.count_items(), 80)
+
+
+class TestSqliteCrud(unittest.TestCase):
+    def setUp(self):
+        """Point the CRUD functions at a temporary SQLite database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.sqlite_path = os.path.join(self.temp_dir, "db.sqlite3")
+        self.env = mock.patch.dict(os.environ, {"CRUD_SQLITE_PATH": self.sqlite_path})
+        self.env.start()
+
+    def tearDown(self):
+        """Clean up after tests."""
+        crud._sqlite_store().close()
+        self.env.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def test_storage_status(self):
+        """Test that the SQLite backend reports itself."""
+        status = crud.get_storage_status()
+        self.assertEqual(status["backend"], "sqlite")
+        self.assertEqual(status["path"], self.sqlite_path)
+
+    def test_crud_round_trip(self):
+        """Test create, read, update and delete against SQLite."""
+        item1 = crud.create_item("Item 1", "Description 1")
+        item2 = crud.create_item("Item 2", "Description 2")
+
+        self.assertEqual([item.id for item in crud.get_items()], [item1.id, item2.id])
+        self.assertEqual([item.id for item in crud.get_items(limit=1, offset=1)], [item2.id])
+        self.assertEqual(crud.get_item_by_id(item1.id).name, "Item 1")
+
+        updated = crud.update_item(item1.id, description="Changed")
+        self.assertEqual(updated.name, "Item 1")
+        self.assertEqual(crud.get_item_by_id(item1.id).description, "Changed")
+        self.assertIsNone(crud.update_item("non-existent-id", name="New Name"))
+
+        self.assertTrue(crud.delete_item(item1.id))
+        self.assertFalse(crud.delete_item(item1.id))
+        self.assertEqual([item.id for item in crud.get_items()], [item2.id])
+
+    def test_update_item_with_expected_updated_at(self):
+        """Test optimistic concurrency on updates in SQLite."""
+        item = crud.create_item("Original Name", "Original Description")
+
+        updated = crud.update_item(item.id, name="First", expected_updated_at=item.created_at)
+        self.assertEqual(updated.name, "First")
+        with self.assertRaises(crud.ConflictError):
+            crud.update_item(item.id, name="Second", expected_updated_at=item.created_at)
+        self.assertEqual(crud.get_item_by_id(item.id).name, "First")
+
+    def test_iter_records_match_items(self):
+        """Test that raw SQLite records have the same shape as Item.to_dict()."""
+        for number in range(3):
+            crud.create_item(f"Item {number}", "Description")
+
+        records = list(crud.iter_records())
+        self.assertEqual(records, [item.to_dict() for item in crud.get_items()])
+
+    def test_bulk_operations(self):
+        """Test bulk create, update and delete against SQLite."""
+        results = crud.create_items(
+            [{"name": "Item 1", "description": "D1"}, {"name": "Item 2", "description": "D2"}]
+        )
+        ids = [result.id for result in results]
+
+        results = crud.update_items(
+            [
+                {"id": ids[0], "name": "Renamed"},
+                {"id": ids[0], "description": "Changed"},
+                {"id": "non-existent-id", "name": "New Name"},
+            ]
+        )
+        self.assertEqual([result.ok for result in results], [True, True, False])
+        item = crud.get_item_by_id(ids[0])
+        self.assertEqual((item.name, item.description), ("Renamed", "Changed"))
+
+        results = crud.delete_items([ids[1], ids[1]])
+        self.assertEqual([result.ok for result in results], [True, False])
+        self.assertEqual([item.id for item in crud.get_items()], [ids[0]])
+
+    def test_import_items(self):
+        """Test a bulk import keeps the count, version and search index."""
+        crud.create_item("Existing", "Before the import")
+        version = crud.get_store_version()[0]
+        records = [
+            {"name": "Apple", "description": "Imported"},
+            {"name": "", "description": "Invalid"},
+            {"name": "Banana", "description": "Imported"},
+        ]
+
+        batches = list(crud.import_items(records, batch_size=2))
+
+        outcomes = [[result.ok for result in results] for results in batches]
+        self.assertEqual(outcomes, [[True, False], [True]])
+        self.assertEqual(crud.count_items(), 3)
+        self.assertEqual(crud.get_store_version()[0], version + 2)
+        self.assertEqual([item.name for item in crud.search_items("banana")], ["Banana"])
+
+        # The insert triggers are back for ordinary writes.
+        crud.create_item("Cherry", "After the import")
+        self.assertEqual(crud.count_items(), 4)
+        self.assertEqual([item.name for item in crud.search_items("cherry")], ["Cherry"])
+
+    def test_interrupted_import_keeps_committed_batches(self):
+        """Test that each batch commits on its own and releases the write lock."""
+        records = ({"name": f"Item {n}", "description": "Imported"} for n in range(4))
+        batches = crud.import_items(records, batch_size=2)
+        next(batches)
+
+        # Another connection can write while the import waits for more input.
+        other = sqlite3.connect(self.sqlite_path, timeout=0)
+        with other:
+            other.execute("UPDATE meta SET value = value WHERE key = 'version'")
+        other.close()
+        batches.close()
+
+        self.assertEqual(crud.count_items(), 2)
+        crud.create_item("Item after", "After")
+        self.assertEqual(
+            [item.name for item in crud.search_items("after")], ["Item after"]
+        )
+
+    def test_get_items_page_and_count(self):
+        """Test keyset pagination and the maintained item count in SQLite."""
+        results = crud.create_items(
+            [{"name": f"Item {number}", "description": "D"} for number in range(5)]
+        )
+        expected = sorted(
+            (result.item for result in results),
+            key=lambda item: (item.created_at, item.id),
+        )
+        self.assertEqual(crud.count_items(), 5)
+
+        seen = []
+        page, cursor = crud.get_items_page(2)
+        seen.extend(item.id for item in page)
+        while cursor:
+            page, cursor = crud.get_items_page(2, cursor)
+            seen.extend(item.id for item in page)
+        self.assertEqual(seen, [item.id for item in expected])
+
+        crud.delete_item(expected[0].id)
+        self.assertEqual(crud.count_items(), 4)
+
+    def test_search_items(self):
+        """Test full-text search against SQLite."""
+        crud.create_items(
+            [
+                {"name": "Apple", "description": "A fruit"},
+                {"name": "Orange", "description": "A citrus fruit, not an apple"},
+                {"name": "Banana", "description": "A yellow fruit"},
+            ]
+        )
+
+        self.assertEqual([item.name for item in crud.search_items("apple")], ["Apple", "Orange"])
+        self.assertEqual([item.name for item in crud.search_items("yellow fru")], ["Banana"])
+        self.assertEqual([item.name for item in crud.search_items("ye")], ["Banana"])
+
+        banana = crud.search_items("banana")[0]
+        crud.update_item(banana.id, name="Plantain")
+        self.assertEqual(crud.search_items("banana"), [])
+        crud.delete_item(banana.id)
+        self.assertEqual(crud.search_items("plantain"), [])
+
+    def test_suggest_items(self):
+        """Test slug prefix autocomplete against SQLite."""
+        results = crud.create_items(
+            [
+                {"name": "Hello World", "description": "D"},
+                {"name": "Help Desk", "description": "D"},
+                {"name": "Goodbye", "description": "D"},
+            ]
+        )
+
+        self.assertEqual([item.name for item in crud.suggest_items("hel")], ["Hello World", "Help Desk"])
+        self.assertEqual(len(crud.suggest_items("hel", limit=1)), 1)
+
+        crud.update_item(results[2].id, name="Helium")
+        self.assertEqual([item.name for item in crud.suggest_items("heli")], ["Helium"])
+        self.assertEqual(crud.suggest_items("good"), [])
+
+    def test_store_version(self):
+        """Test that triggers keep the SQLite store version moving."""
+        version, _ = crud.get_store_version()
+        item = crud.create_item("Item", "Description")
+        crud.update_item(item.id, name="Renamed")
+        crud.delete_items([item.id])
+
+        latest, modified_at = crud.get_store_version()
+        self.assertEqual(latest, version + 3)
+        self.assertIsNotNone(modified_at)
+
+    def test_reset_after_fork_reopens_store(self):
+        """Test that a forked worker gets its own SQLite connections."""
+        store = crud._sqlite_store()
+        store.connection()
+
+        crud.reset_after_fork()
+
+        self.assertIsNot(crud._sqlite_store(), store)
+        store.close()
+
+    def test_uses_wal_journal(self):
+        """Test that the database runs in WAL mode."""
+        crud.create_item("Item", "Description")
+        mode = crud._sqlite_store().connection().execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(mode[0], "wal")
+
+    def test_old_schema_is_rebuilt_with_explicit_key(self):
+        """Test that a table keyed on the implicit rowid is migrated and reindexed."""
+        connection = sqlite3.connect(self.sqlite_path)
+        connection.execute(
+            "CREATE TABLE items (id TEXT PRIMARY KEY, name TEXT NOT NULL, "
+            "description TEXT NOT NULL, created_at TEXT NOT NULL, updated_at TEXT)"
+        )
+        connection.executemany(
+            "INSERT INTO items (id, name, description, created_at) VALUES (?, ?, ?, ?)",
+            [
+                ("b", "Yellow Banana", "Fruit", "2024-01-02T00:00:00+00:00"),
+                ("a", "Green Apple", "Fruit", "2024-01-01T00:00:00+00:00"),
+            ],
+        )
+        connection.commit()
+        connection.close()
+
+        self.assertEqual([item.id for item in crud.get_items()], ["b", "a"])
+        columns = crud._sqlite_store().connection().execute("PRAGMA table_info(items)")
+        self.assertIn("seq", [column[1] for column in columns])
+        self.assertEqual([item.id for item in crud.search_items("banana")], ["b"])
+
+        item = crud.create_item("Banana Bread", "Baked")
+        crud._sqlite_store().connection().execute("VACUUM")
+        self.assertCountEqual(
+            [result.id for result in crud.search_items("banana")], ["b", item.id]
+        )
+        self.assertEqual(crud.suggest_items("green")[0].id, "a")
+        self.assertEqual(crud.count_items(), 3)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
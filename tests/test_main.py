@@ -0,0 +1,82 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from app import crud, main
+
+
+class TestImportExport(unittest.TestCase):
+    def setUp(self):
+        """Point the CLI at a temporary JSON database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_db_path = crud.DB_PATH
+        crud.DB_PATH = os.path.join(self.temp_dir, "db.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        crud.DB_PATH = self.original_db_path
+
+    def path(self, name, content=None):
+        path = os.path.join(self.temp_dir, name)
+        if content is not None:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(content)
+        return path
+
+    def run_main(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = main.main(list(argv))
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_import_jsonl_reports_failed_lines(self):
+        """Test a JSONL import in batches with bad lines reported by number."""
+        source = self.path(
+            "items.jsonl",
+            '{"name": "A", "description": "First"}\n'
+            "not json\n"
+            "\n"
+            '{"name": "", "description": "Empty name"}\n'
+            '{"name": "B", "description": "Second"}\n',
+        )
+
+        code, out, err = self.run_main("import", "--file", source, "--batch-size", "2")
+
+        self.assertEqual(code, 1)
+        self.assertIn("Imported 2 items, 2 failed", out)
+        self.assertIn("line 2: Invalid JSON", err)
+        self.assertIn("line 4: Name cannot be empty", err)
+        self.assertEqual([item.name for item in crud.iter_items()], ["A", "B"])
+
+    def test_csv_round_trip(self):
+        """Test that an exported CSV file imports back into an empty store."""
+        crud.create_item("Comma, name", 'Quoted "description"')
+        crud.create_item("Plain", "Second line")
+        exported = self.path("items.csv")
+
+        code, out, _ = self.run_main("export", "--file", exported)
+        self.assertEqual((code, out.strip()), (0, "Exported 2 items"))
+
+        crud.DB_PATH = os.path.join(self.temp_dir, "copy.json")
+        code, out, _ = self.run_main("import", "--file", exported, "--quiet")
+        self.assertEqual((code, out.strip()), (0, "Imported 2 items, 0 failed"))
+        self.assertEqual(
+            [(item.name, item.description) for item in crud.iter_items()],
+            [("Comma, name", 'Quoted "description"'), ("Plain", "Second line")],
+        )
+
+    def test_export_jsonl(self):
+        """Test that JSONL export writes one record per line."""
+        item = crud.create_item("Item", "Description")
+        stream = io.BytesIO()
+
+        self.assertEqual(main.export_items(stream, "jsonl"), 1)
+        self.assertEqual(stream.getvalue().count(b"\n"), 1)
+        self.assertIn(item.id.encode(), stream.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
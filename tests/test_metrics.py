@@ -0,0 +1,99 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from api.index import Request, dispatch
+from app import cache, crud, metrics
+
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        """Point the JSON store at a temporary file."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_db_path = crud.DB_PATH
+        crud.DB_PATH = os.path.join(self.temp_dir, "db.json")
+        cache.responses.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        crud.DB_PATH = self.original_db_path
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test the Prometheus text for a histogram series."""
+        metrics.STEP_SECONDS.observe(0.003, "test-buckets")
+        metrics.STEP_SECONDS.observe(20.0, "test-buckets")
+        lines = metrics.render().splitlines()
+
+        series = 'crud_step_seconds_bucket{step="test-buckets",le="%s"} %d'
+        self.assertIn(series % ("0.0025", 0), lines)
+        self.assertIn(series % ("0.005", 1), lines)
+        self.assertIn(series % ("+Inf", 2), lines)
+        self.assertIn('crud_step_seconds_count{step="test-buckets"} 2', lines)
+
+    def test_operations_and_storage_are_measured(self):
+        """Test that CRUD calls record latency, errors and bytes written."""
+        calls = metrics.OPERATION_SECONDS.count("create_item")
+        errors = metrics.OPERATION_ERRORS.value("create_item")
+        written = metrics.STORAGE_BYTES.value("json", "written")
+
+        crud.create_item("Metered", "Description")
+        with self.assertRaises(ValueError):
+            crud.create_item("", "Description")
+
+        self.assertEqual(metrics.OPERATION_SECONDS.count("create_item"), calls + 2)
+        self.assertEqual(metrics.OPERATION_ERRORS.value("create_item"), errors + 1)
+        self.assertGreater(metrics.STORAGE_BYTES.value("json", "written"), written)
+
+    def test_metrics_endpoint(self):
+        """Test that /api/metrics serves requests, routes and cache counters."""
+        item = crud.create_item("Metered", "Description")
+        dispatch(Request("GET", f"/api/items/{item.id}"))
+        dispatch(Request("GET", f"/api/items/{item.id}"))
+
+        response = dispatch(Request("GET", "/api/metrics"))
+        self.assertEqual(response.status, 200)
+        content_type = dict(response.headers)["Content-Type"]
+        self.assertTrue(content_type.startswith("text/plain"))
+        body = response.body.decode("utf-8")
+        self.assertIn("# TYPE crud_http_request_seconds histogram", body)
+        self.assertIn(
+            'crud_http_requests_total{method="GET",route="/api/items/{id}",'
+            'status="200"}',
+            body,
+        )
+        hits = cache.responses.hits
+        self.assertGreater(hits, 0)
+        self.assertIn(f'crud_cache_hits_total{{cache="responses"}} {hits}', body)
+        self.assertIn(
+            'crud_operation_seconds_count{operation="get_item_by_id"}', body
+        )
+
+    def test_disabled_metrics_leave_functions_undecorated(self):
+        """Test that CRUD_METRICS=0 removes the wrappers and the endpoint."""
+        code = (
+            "from api.index import Request, dispatch\n"
+            "from app import crud\n"
+            "assert not hasattr(crud.create_item, '__wrapped__')\n"
+            "print(dispatch(Request('GET', '/api/metrics')).status)\n"
+        )
+        env = dict(os.environ, CRUD_METRICS="0", CRUD_DB_PATH=crud.DB_PATH)
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "404")
+
+
+if __name__ == "__main__":
+    unittest.main()
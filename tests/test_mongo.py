@@ -0,0 +1,368 @@
+import importlib.util
+import os
+import unittest
+from unittest import mock
+
+from app import crud, mongo
+
+
+class FakeCollection:
+    def __init__(self, documents=()):
+        self.indexes = []
+        self.listed = 0
+        self.documents = list(documents)
+        self.writes = []
+        self.finds = 0
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        return [document for document in self.documents if "slug" not in document]
+
+    def bulk_write(self, requests, ordered=True):
+        self.writes.append(requests)
+
+    def index_information(self):
+        self.listed += 1
+        return {name: {} for name in self.indexes}
+
+    def create_index(self, keys, name, **options):
+        self.indexes.append(name)
+
+
+class FakeItems:
+    def __init__(self, documents, failing_writes=()):
+        self.documents = {document["_id"]: document for document in documents}
+        self.reads = 0
+        # Positions within a bulk write that the fake server rejects.
+        self.failing_writes = set(failing_writes)
+        self.bulk_writes = []
+        self.deleted = []
+
+    def find(self, query, projection=None):
+        ids = query["_id"]["$in"]
+        return [dict(self.documents[i]) for i in ids if i in self.documents]
+
+    def insert_many(self, documents, ordered=True):
+        for document in documents:
+            self.documents.setdefault(document["_id"], document)
+        self._raise_failures()
+
+    def bulk_write(self, requests, ordered=True):
+        self.bulk_writes.append(requests)
+        self._raise_failures()
+
+    def delete_many(self, query):
+        self.deleted.append(sorted(query["_id"]["$in"]))
+        for item_id in query["_id"]["$in"]:
+            self.documents.pop(item_id, None)
+
+    def _raise_failures(self):
+        if self.failing_writes:
+            from pymongo.errors import BulkWriteError
+
+            errors = [
+                {"index": index, "errmsg": f"rejected {index}"}
+                for index in sorted(self.failing_writes)
+            ]
+            raise BulkWriteError({"writeErrors": errors})
+
+    def find_one(self, query, projection=None):
+        self.reads += 1
+        document = self.documents.get(query["_id"])
+        return dict(document) if document else None
+
+    def find_one_and_update(self, query, update, projection=None, **options):
+        document = self.documents.get(query["_id"])
+        if document is None or not any(
+            all(document.get(field) == value for field, value in clause.items())
+            for clause in query.get("$or", [{}])
+        ):
+            return None
+        document.update(update["$set"])
+        return dict(document)
+
+    def delete_one(self, query):
+        deleted = self.documents.pop(query["_id"], None) is not None
+        return mock.Mock(deleted_count=int(deleted))
+
+
+class FakeClient:
+    def __init__(self):
+        self.collection = FakeCollection()
+
+    def __getitem__(self, name):
+        return {"items": self.collection}
+
+
+class TestMongo(unittest.TestCase):
+    def tearDown(self):
+        mongo.reset(close=False)
+        mongo._INDEXES_READY = False
+
+    def test_client_options_from_environment(self):
+        """Test that pool settings are read from the environment."""
+        env = {
+            "CRUD_MONGODB_MAX_POOL_SIZE": "50",
+            "CRUD_MONGODB_READ_PREFERENCE": "secondaryPreferred",
+        }
+        with mock.patch.dict(os.environ, env):
+            options = mongo.client_options()
+
+        self.assertEqual(options["maxPoolSize"], 50)
+        self.assertEqual(options["readPreference"], "secondaryPreferred")
+        self.assertEqual(options["serverSelectionTimeoutMS"], 5000)
+
+        with mock.patch.dict(os.environ, {"CRUD_MONGODB_MIN_POOL_SIZE": "many"}):
+            with self.assertRaises(RuntimeError):
+                mongo.client_options()
+
+    def test_indexes_are_ensured_once(self):
+        """Test that the collection is cached and indexes created only once."""
+        client = FakeClient()
+        mongo._CLIENT = client
+
+        with mock.patch.dict(os.environ, {"MONGODB_DATABASE": "test"}):
+            first = mongo.get_collection()
+            second = mongo.get_collection()
+
+            self.assertIs(first, second)
+            created = len(client.collection.indexes)
+            self.assertGreater(created, 0)
+
+            # A forked child reconnects but does not repeat index creation
+            mongo.reset(close=False)
+            mongo._CLIENT = client
+            mongo.get_collection()
+            self.assertEqual(len(client.collection.indexes), created)
+
+            # A new process only lists the indexes that already exist
+            mongo.reset(close=False)
+            mongo._INDEXES_READY = False
+            mongo._CLIENT = client
+            mongo.get_collection()
+            self.assertEqual(len(client.collection.indexes), created)
+            self.assertEqual(client.collection.listed, 2)
+            # Slugs are only backfilled by the migrate-slugs command
+            self.assertEqual(client.collection.finds, 0)
+
+    @unittest.skipUnless(importlib.util.find_spec("pymongo"), "needs pymongo")
+    def test_missing_slugs_are_backfilled(self):
+        """Test that only documents without a slug are given one, in batches."""
+        from pymongo import UpdateOne
+
+        collection = FakeCollection(
+            [
+                {"_id": "a", "name": "Hello World"},
+                {"_id": "b", "name": "Kept", "slug": "kept"},
+                {"_id": "c", "name": "Second Item"},
+            ]
+        )
+        with mock.patch.object(mongo, "SLUG_BATCH_SIZE", 1):
+            self.assertEqual(mongo.backfill_slugs(collection), 2)
+
+        self.assertEqual(
+            collection.writes,
+            [
+                [UpdateOne({"_id": "a"}, {"$set": {"slug": "hello-world"}})],
+                [UpdateOne({"_id": "c"}, {"$set": {"slug": "second-item"}})],
+            ],
+        )
+        self.assertEqual(mongo.backfill_slugs(FakeCollection()), 0)
+
+    def test_migrate_slugs_skips_complete_collections(self):
+        """Test that migrate_slugs writes nothing when every item has a slug."""
+        collection = FakeCollection([{"_id": "a", "name": "A", "slug": "a"}])
+        meta = mock.Mock()
+        env = {"MONGODB_URI": "mongodb://example"}
+        with mock.patch.dict(os.environ, env), mock.patch.object(
+            mongo, "get_collection", return_value=collection
+        ), mock.patch.object(mongo, "get_meta_collection", return_value=meta):
+            self.assertEqual(crud.migrate_slugs(), 0)
+
+        self.assertEqual((collection.finds, collection.writes), (1, []))
+        meta.update_one.assert_not_called()
+
+
+class TestMongoItemCache(unittest.TestCase):
+    def setUp(self):
+        self.items = FakeItems(
+            [
+                {
+                    "_id": "a",
+                    "name": "A",
+                    "description": "D",
+                    "created_at": "2024-01-01T00:00:00+00:00",
+                }
+            ]
+        )
+        env = {"MONGODB_URI": "mongodb://example", "CRUD_MONGODB_CACHE_SIZE": "10"}
+        patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(mongo, "get_collection", return_value=self.items),
+            mock.patch.object(mongo, "get_meta_collection"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(setattr, mongo, "_ITEM_CACHE", None)
+
+    def test_reads_are_served_from_cache(self):
+        """Test that repeat reads of an item cost one round trip."""
+        self.assertEqual(crud.get_item_by_id("a").name, "A")
+        self.assertEqual(crud.get_item_by_id("a").name, "A")
+        self.assertEqual(crud.get_item_version("a"), "2024-01-01T00:00:00+00:00")
+        self.assertEqual(self.items.reads, 1)
+
+        stats = mongo.status()["item_cache"]
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 1))
+        self.assertFalse(stats["watching"])
+
+    def test_local_delete_invalidates(self):
+        """Test that deleting an item drops its cached document."""
+        crud.get_item_by_id("a")
+        self.assertTrue(crud.delete_item("a"))
+        self.assertIsNone(crud.get_item_by_id("a"))
+        self.assertEqual(self.items.reads, 2)
+
+
+@unittest.skipUnless(importlib.util.find_spec("pymongo"), "needs pymongo")
+class TestMongoUpdate(unittest.TestCase):
+    def setUp(self):
+        self.items = FakeItems(
+            [
+                {
+                    "_id": "a",
+                    "name": "A",
+                    "description": "D",
+                    "created_at": "2024-01-01T00:00:00+00:00",
+                }
+            ]
+        )
+        env = {"MONGODB_URI": "mongodb://example"}
+        patches = [
+            mock.patch.dict(os.environ, env),
+            mock.patch.object(mongo, "get_collection", return_value=self.items),
+            mock.patch.object(mongo, "get_meta_collection"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_update_with_matching_version(self):
+        """Test that an update applies while its precondition still holds."""
+        item = crud.update_item(
+            "a", name="Renamed", expected_updated_at="2024-01-01T00:00:00+00:00"
+        )
+        self.assertEqual((item.name, item.description), ("Renamed", "D"))
+        self.assertEqual(self.items.documents["a"]["slug"], "renamed")
+
+        crud.update_item("a", description="New", expected_updated_at=item.updated_at)
+        self.assertEqual(self.items.documents["a"]["description"], "New")
+
+    def test_stale_version_conflicts(self):
+        """Test that a stale expected_updated_at raises ConflictError."""
+        with self.assertRaises(crud.ConflictError):
+            crud.update_item("a", name="Renamed", expected_updated_at="stale")
+        self.assertEqual(self.items.documents["a"]["name"], "A")
+
+    def test_missing_item_returns_none(self):
+        """Test that updating an unknown ID returns None, with or without a version."""
+        self.assertIsNone(crud.update_item("missing", name="Renamed"))
+        self.assertIsNone(
+            crud.update_item("missing", name="Renamed", expected_updated_at="stale")
+        )
+
+
+@unittest.skipUnless(importlib.util.find_spec("pymongo"), "needs pymongo")
+class TestMongoBatches(unittest.TestCase):
+    def use_items(self, failing_writes=()):
+        """Serve the items collection from a fake holding items a and b."""
+        self.items = FakeItems(
+            [
+                {
+                    "_id": item_id,
+                    "name": item_id.upper(),
+                    "description": "D",
+                    "created_at": "2024-01-01T00:00:00+00:00",
+                }
+                for item_id in ("a", "b")
+            ],
+            failing_writes,
+        )
+        self.meta = mock.Mock()
+        patches = [
+            mock.patch.dict(os.environ, {"MONGODB_URI": "mongodb://example"}),
+            mock.patch.object(mongo, "get_collection", return_value=self.items),
+            mock.patch.object(mongo, "get_meta_collection", return_value=self.meta),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_create_items_maps_write_errors(self):
+        """Test that a rejected insert is reported on the record it came from."""
+        self.use_items(failing_writes={1})
+        results = crud.create_items(
+            [
+                {"name": "First", "description": "D"},
+                {"name": "", "description": "Invalid"},
+                {"name": "Second", "description": "D"},
+            ]
+        )
+
+        self.assertTrue(results[0].ok)
+        self.assertIn("Name", results[1].error)
+        self.assertEqual(results[2].error, "rejected 1")
+        self.assertEqual(self.items.documents[results[0].id]["slug"], "first")
+        self.meta.update_one.assert_called_once()
+
+    def test_update_items_merges_repeats_and_maps_write_errors(self):
+        """Test repeated IDs, unknown IDs and a rejected update in one batch."""
+        from pymongo import UpdateOne
+
+        self.use_items(failing_writes={2})
+        results = crud.update_items(
+            [
+                {"id": "a", "name": "Renamed"},
+                {"id": "missing", "name": "Nobody"},
+                {"id": "a", "description": "New"},
+                {"id": "b", "name": "Rejected"},
+            ]
+        )
+
+        first, missing, repeat, rejected = results
+        self.assertEqual(first.item.name, "Renamed")
+        self.assertTrue(missing.not_found)
+        self.assertEqual(
+            (repeat.item.name, repeat.item.description), ("Renamed", "New")
+        )
+        self.assertEqual((rejected.item, rejected.error), (None, "rejected 2"))
+
+        def expected(item):
+            changes = {
+                "name": item.name,
+                "description": item.description,
+                "slug": "renamed",
+                "updated_at": item.updated_at,
+            }
+            return UpdateOne({"_id": "a"}, {"$set": changes})
+
+        operations = self.items.bulk_writes[0]
+        self.assertEqual(len(operations), 3)
+        self.assertEqual(operations[:2], [expected(first.item), expected(repeat.item)])
+
+    def test_delete_items_reports_missing_and_repeated_ids(self):
+        """Test that each existing ID is deleted once and reported once."""
+        self.use_items()
+        results = crud.delete_items(["a", "missing", "a"])
+
+        self.assertEqual(
+            [result.not_found for result in results], [False, True, True]
+        )
+        self.assertEqual(self.items.deleted, [["a"]])
+        self.assertEqual(list(self.items.documents), ["b"])
+        self.meta.update_one.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from api.index import Request, dispatch
+from app import cache, crud, profiling
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        """Point the store and the profile directory at temporary paths."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_db_path = crud.DB_PATH
+        crud.DB_PATH = os.path.join(self.temp_dir, "db.json")
+        self.profile_dir = os.path.join(self.temp_dir, "profiles")
+        cache.responses.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+        crud.DB_PATH = self.original_db_path
+
+    def settings(self, sample_rate):
+        return mock.patch.multiple(
+            profiling,
+            ENABLED=True,
+            SAMPLE_RATE=sample_rate,
+            PROFILE_DIR=self.profile_dir,
+        )
+
+    def test_server_timing_header(self):
+        """Test that storage, serialization and total time are reported."""
+        item = crud.create_item("Timed", "Description")
+        with self.settings(0.0):
+            response = dispatch(Request("GET", f"/api/items/{item.id}"))
+
+        self.assertEqual(response.status, 200)
+        header = dict(response.headers)["Server-Timing"]
+        names = [part.split(";")[0] for part in header.split(", ")]
+        self.assertEqual(names, ["storage", "serialize", "total"])
+        self.assertFalse(os.path.exists(self.profile_dir))
+
+    def test_sampled_request_writes_profile(self):
+        """Test that a profiled request leaves a .prof and a text report."""
+        with self.settings(1.0):
+            response = dispatch(Request("GET", "/api/items?limit=5"))
+
+        self.assertEqual(response.status, 200)
+        files = sorted(os.listdir(self.profile_dir))
+        self.assertEqual([name.rsplit(".", 1)[1] for name in files], ["prof", "txt"])
+        self.assertIn("GET-api-items", files[0])
+        with open(os.path.join(self.profile_dir, files[1]), encoding="utf-8") as file:
+            report = file.read()
+        self.assertTrue(report.startswith("GET /api/items\n"))
+        self.assertIn("storage:", report)
+        self.assertIn("cumulative", report)
+
+    def test_disabled_profiling_adds_no_header(self):
+        """Test that responses are untouched when profiling is off."""
+        with mock.patch.object(profiling, "ENABLED", False):
+            response = dispatch(Request("GET", "/api/items?limit=5"))
+        self.assertNotIn("Server-Timing", dict(response.headers))
+
+    def test_phases_outside_a_request_are_ignored(self):
+        """Test that time charged with no request being measured is dropped."""
+        profiling.add("storage", 1.0)
+        result, phases = profiling.measure(lambda: "done", "label")
+        self.assertEqual(result, "done")
+        self.assertEqual(phases["storage"], 0.0)
+        self.assertGreaterEqual(phases["total"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from app.search import SearchIndex, SlugIndex, tokenize
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.add("1", "Apple", "A fruit")
+        self.index.add("2", "Banana", "A yellow fruit")
+        self.index.add("3", "Orange", "A citrus fruit, not an apple")
+
+    def test_tokenize(self):
+        """Test splitting text into lowercase tokens."""
+        self.assertEqual(tokenize("Hello, World-42"), ["hello", "world", "42"])
+        self.assertEqual(tokenize(""), [])
+
+    def test_substring_match(self):
+        """Test that terms match anywhere inside a word."""
+        self.assertEqual(self.index.search("nan"), ["2"])
+        self.assertEqual(self.index.search("itru"), ["3"])
+        self.assertEqual(sorted(self.index.search("fru")), ["1", "2", "3"])
+
+    def test_short_terms(self):
+        """Test terms shorter than a trigram."""
+        self.assertEqual(sorted(self.index.search("ye")), ["2"])
+        self.assertEqual(self.index.search("zz"), [])
+
+    def test_all_terms_must_match(self):
+        """Test multi-term AND queries."""
+        self.assertEqual(self.index.search("yellow fruit"), ["2"])
+        self.assertEqual(self.index.search("yellow citrus"), [])
+
+    def test_name_matches_rank_first(self):
+        """Test that a name match outranks a description match."""
+        self.assertEqual(self.index.search("apple"), ["1", "3"])
+
+    def test_update_and_remove(self):
+        """Test that re-adding and removing items keeps the index in sync."""
+        self.index.add("1", "Grape", "A small fruit")
+        self.assertEqual(self.index.search("apple"), ["3"])
+        self.assertEqual(self.index.search("grape"), ["1"])
+
+        self.index.remove("3")
+        self.assertEqual(self.index.search("apple"), [])
+        self.assertEqual(self.index.search("citrus"), [])
+        self.assertEqual(len(self.index), 2)
+
+class TestSlugIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SlugIndex.build(
+            [("1", "Hello World"), ("2", "Help Desk"), ("3", "Goodbye")]
+        )
+
+    def test_prefix_lookup(self):
+        """Test finding names by slug prefix."""
+        self.assertEqual(self.index.suggest("hel"), ["1", "2"])
+        self.assertEqual(self.index.suggest("Hello W"), ["1"])
+        self.assertEqual(self.index.suggest("hel", limit=1), ["1"])
+        self.assertEqual(self.index.suggest("xyz"), [])
+        self.assertEqual(self.index.suggest("!!"), [])
+
+    def test_rename_and_remove(self):
+        """Test that renames move an item and removals drop it."""
+        self.index.add("3", "Helium")
+        self.assertEqual(self.index.suggest("go"), [])
+        self.assertEqual(self.index.suggest("heli"), ["3"])
+
+        self.index.remove("1")
+        self.assertEqual(self.index.suggest("hel"), ["3", "2"])
+        self.assertEqual(len(self.index), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from http.client import HTTPConnection
+
+from api import serve
+from app import crud
+
+
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        """Run the pooled keep-alive server against a temporary JSON database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_db_path = crud.DB_PATH
+        crud.DB_PATH = os.path.join(self.temp_dir, "db.json")
+
+        self.server = serve.make_server("127.0.0.1", 0, threads=2, quiet=True)
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.thread.start()
+
+    def tearDown(self):
+        """Stop the server and clean up."""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+        crud.DB_PATH = self.original_db_path
+
+    def test_requests_share_one_connection(self):
+        """Test that consecutive requests reuse the same persistent connection."""
+        connection = HTTPConnection(*self.server.server_address)
+        connection.request(
+            "POST",
+            "/api/items",
+            body=json.dumps({"name": "Item", "description": "Description"}),
+            headers={"Content-Type": "application/json"},
+        )
+        response = connection.getresponse()
+        item_id = json.loads(response.read())["item"]["id"]
+        self.assertEqual(response.status, 201)
+        self.assertEqual(response.version, 11)
+        sock = connection.sock
+
+        for path in (f"/api/items/{item_id}", "/api/items"):
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            self.assertEqual(response.status, 200)
+            self.assertIsNone(response.getheader("Connection"))
+
+        self.assertIs(connection.sock, sock)
+        connection.close()
+
+    def test_ignored_body_keeps_connection(self):
+        """Test that a body the route ignores does not leak into the next request."""
+        connection = HTTPConnection(*self.server.server_address)
+        connection.request("DELETE", "/api/items/missing", body=b'{"junk": true}')
+        response = connection.getresponse()
+        response.read()
+        self.assertEqual(response.status, 404)
+
+        connection.request("GET", "/api/items/missing")
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        self.assertEqual(response.status, 404)
+
+    def test_chunked_body_closes_connection(self):
+        """Test that a chunked body is refused and the connection closed."""
+        connection = HTTPConnection(*self.server.server_address)
+        connection.request(
+            "POST", "/api/items", body=iter([b'{"name": "x"}']), encode_chunked=True
+        )
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+
+        self.assertEqual(response.status, 411)
+        self.assertEqual(response.getheader("Connection"), "close")
+
+    def test_rejects_empty_pool(self):
+        """Test that a server needs at least one thread."""
+        with self.assertRaises(ValueError):
+            serve.make_server("127.0.0.1", 0, threads=0)
+
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "pre-fork mode needs os.fork")
+class TestPreforkServe(unittest.TestCase):
+    def setUp(self):
+        """Start a pre-fork server in a subprocess against a temporary database."""
+        self.temp_dir = tempfile.mkdtemp()
+        env = dict(os.environ, CRUD_DB_PATH=os.path.join(self.temp_dir, "db.json"))
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "api.serve",
+                "--port",
+                "0",
+                "--workers",
+                "2",
+                "--max-requests",
+                "3",
+                "--quiet",
+            ],
+            cwd=root,
+            env=env,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        banner = self.process.stdout.readline()
+        self.address = banner.split("http://", 1)[1].split()[0].rsplit(":", 1)
+
+    def tearDown(self):
+        """Stop the supervisor and clean up."""
+        if self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
+        shutil.rmtree(self.temp_dir)
+
+    def request(self, method, path, payload=None):
+        connection = HTTPConnection(self.address[0], int(self.address[1]), timeout=10)
+        body = None if payload is None else json.dumps(payload)
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        data = json.loads(response.read())
+        connection.close()
+        return response.status, data
+
+    def test_workers_share_storage_and_are_recycled(self):
+        """Test that recycled workers keep serving and see each other's writes."""
+        created = []
+        for number in range(5):
+            status, data = self.request(
+                "POST", "/api/items", {"name": f"Item {number}", "description": "D"}
+            )
+            self.assertEqual(status, 201)
+            created.append(data["item"]["id"])
+
+        # Far more requests than two workers may serve before being replaced.
+        for item_id in created:
+            status, data = self.request("GET", f"/api/items/{item_id}")
+            self.assertEqual(status, 200)
+        status, data = self.request("GET", "/api/items")
+        self.assertEqual(data["total"], 5)
+
+        self.process.send_signal(signal.SIGTERM)
+        self.assertEqual(self.process.wait(timeout=15), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from app.utils import validate_item_data, format_item_for_display, search_items, generate_slug
+from app.utils import validate_item_data, validate_item_update, format_item_for_display, search_items, generate_slug
 
 class TestUtils(unittest.TestCase):
     def test_validate_item_data(self):
@@ -33,6 +33,14 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(len(errors), 1)
         self.assertIn("Name must be less than 100 characters", errors)
     
+    def test_validate_item_update(self):
+        """Test validating only the fields present in an update."""
+        self.assertEqual(validate_item_update({}), [])
+        self.assertEqual(validate_item_update({"name": "New Name"}), [])
+        self.assertEqual(validate_item_update({"description": "   "}), ["Description cannot be empty"])
+        self.assertEqual(validate_item_update({"name": "x" * 101}), ["Name must be less than 100 characters"])
+        self.assertEqual(validate_item_update({"name": 42}), ["Name cannot be empty"])
+    
     def test_format_item_for_display(self):
         """Test formatting item for display."""
         item = {